@@ -0,0 +1,176 @@
+"""Application factory.
+
+``create_app()`` builds the Flask app and registers one blueprint per business
+area (see views/). By default it also runs the startup work: create missing
+tables, apply the simple schema migrations, normalize legacy enum values and
+load exchange rates. Scripts and tools that only need an app object (URL
+building, template rendering) can pass ``startup=False`` to skip the database.
+"""
+import os
+
+from flask import Flask, flash
+
+from database import db_session, init_db, engine, read_engine
+from template_cache import configure_templates
+from static_assets import init_static
+from query_stats import init_query_stats
+from metrics import init_metrics
+from profiling import init_profiling
+
+
+def normalize_enums():
+    """Normalize enum strings in DB to match SQLAlchemy Enum definitions"""
+    from models import quotation, Inventory, FinancialRecord
+
+    # Normalize quotation.status to uppercase values
+    try:
+        quotations = db_session.query(quotation).all()
+        changed = 0
+        for inv in quotations:
+            if isinstance(inv.status, str):
+                val = inv.status.strip()
+                upper = val.upper()
+                if upper in ("PENDING", "PAID", "OVERDUE", "CANCELLED") and val != upper:
+                    inv.status = upper
+                    changed += 1
+            # Normalize payment_method
+            if inv.payment_method and isinstance(inv.payment_method, str):
+                val = inv.payment_method.strip().upper()
+                if val in ("CASH", "ECOCASH", "SWIPE", "TRANSFER", "CREDIT"):
+                    inv.payment_method = val
+                    changed += 1
+        if changed:
+            db_session.commit()
+    except Exception:
+        db_session.rollback()
+
+
+    # Normalize Inventory.payment_type
+    try:
+        inventories = db_session.query(Inventory).all()
+        changed = 0
+        for inv in inventories:
+            if inv.payment_type and isinstance(inv.payment_type, str):
+                val = inv.payment_type.strip().upper()
+                if val in ("CASH", "ECOCASH", "SWIPE", "TRANSFER", "CREDIT"):
+                    inv.payment_type = val
+                    changed += 1
+        if changed:
+            db_session.commit()
+    except Exception:
+        db_session.rollback()
+
+    # Normalize FinancialRecord.payment_method
+    try:
+        financial_records = db_session.query(FinancialRecord).all()
+        changed = 0
+        for fr in financial_records:
+            if fr.payment_method and isinstance(fr.payment_method, str):
+                val = fr.payment_method.strip().upper()
+                if val in ("CASH", "ECOCASH", "SWIPE", "TRANSFER", "CREDIT"):
+                    fr.payment_method = val
+                    changed += 1
+        if changed:
+            db_session.commit()
+    except Exception:
+        db_session.rollback()
+
+
+def load_exchange_rates():
+    """Load new rows from the exchange rate file into the rate table"""
+    from currency_converter import load_rates_file
+
+    try:
+        if load_rates_file(db_session):
+            db_session.commit()
+    except Exception as e:
+        db_session.rollback()
+        print(f"Exchange rate load warning: {e}")
+
+
+# Auto-migration helper
+def check_db_schema():
+    """Checks for missing columns and adds them if necessary (Simple Migration)"""
+    from sqlalchemy import text
+    from database import engine
+    try:
+        # Check for payer_name in payments
+        with engine.connect() as conn:
+            try:
+                conn.execute(text("ALTER TABLE payments ADD COLUMN payer_name VARCHAR(100)"))
+                conn.commit()
+                print("Added column 'payer_name' to 'payments'")
+            except Exception:
+                pass
+
+            # Check for quotation_id in invoices
+            try:
+                conn.execute(text("ALTER TABLE invoices ADD COLUMN quotation_id INTEGER REFERENCES quotations(id)"))
+                conn.commit()
+                print("Added column 'quotation_id' to 'invoices'")
+            except Exception:
+                pass
+
+        # Indexes declared on tables that pre-date them (create_all skips existing tables)
+        from models import StockTransaction as _StockTransaction, Inventory as _Inventory
+        for table in (_StockTransaction.__table__, _Inventory.__table__):
+            for index in table.indexes:
+                index.create(bind=engine, checkfirst=True)
+    except Exception as e:
+        print(f"Schema check warning: {e}")
+
+
+def inject_db_type():
+    from database import engine
+    db_url = str(engine.url)
+    if 'sqlite' in db_url:
+        return dict(db_type='SQLite (Local/Ephemeral)')
+    elif 'postgres' in db_url:
+        return dict(db_type='PostgreSQL (Persistent)')
+    else:
+        return dict(db_type='Unknown Database')
+
+
+def flash_low_stock_alerts(response):
+    from low_stock import pop_alerts
+    for alert in pop_alerts(db_session):
+        flash(alert, 'warning')
+    return response
+
+
+def shutdown_session(exception=None):
+    db_session.remove()
+
+
+def create_app(startup=True):
+    """Build the Flask app; startup=False skips all database work"""
+    from views import BLUEPRINTS
+
+    # create the app
+    app = Flask(__name__)
+    configure_templates(app)
+    init_static(app)
+
+    # setup a secret key, required by sessions
+    app.secret_key = os.environ.get("FLASK_SECRET_KEY") or "solar_company_secret_key"
+
+    # invoices.html, payments.html and activities.html check enum values with hasattr()
+    app.add_template_global(hasattr)
+    app.context_processor(inject_db_type)
+    app.after_request(flash_low_stock_alerts)
+    app.teardown_appcontext(shutdown_session)
+    init_query_stats(app, *[e for e in (engine, read_engine) if e is not None])
+    init_metrics(app)
+    init_profiling(app)
+
+    for blueprint in BLUEPRINTS:
+        app.register_blueprint(blueprint)
+
+    if startup:
+        with app.app_context():
+            init_db()
+            check_db_schema()
+            normalize_enums()
+            load_exchange_rates()
+
+    return app
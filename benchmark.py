@@ -0,0 +1,171 @@
+"""Benchmark the hot routes against a generated database.
+
+Usage:
+    python generate_data.py --rows 100000              # once, fills instance/bench.db
+    python benchmark.py                                 # time the routes
+    python benchmark.py --save bench_baseline.json      # record a baseline
+    python benchmark.py --compare bench_baseline.json   # exit 1 on regressions
+
+Each route runs through the Flask test client (no network) ``--iterations``
+times after one warm-up request. By default application caches stay warm, as
+in production; ``--cold`` clears them before every request. A SQLite database
+is copied to a temporary file first, because ``convert_to_invoice`` writes.
+
+``--compare`` fails when a route's median is more than ``--tolerance``
+(default 25%) and ``--noise-ms`` (default 2 ms) slower than the baseline.
+"""
+import argparse
+import json
+import os
+import re
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_URL = f"sqlite:///{os.path.join(ROOT, 'instance', 'bench.db')}"
+
+SERVER_TIMING_DB = re.compile(r'db;dur=([\d.]+);desc="(\d+) queries"')
+
+
+def prepare_database(url):
+    """Work on a copy of a SQLite database; other databases are used as is"""
+    if not url.startswith('sqlite:///'):
+        print(f'Warning: benchmarking {url} directly; convert_to_invoice will add invoices to it')
+        return url, None
+    path = url.replace('sqlite:///', '', 1)
+    if not os.path.exists(path):
+        sys.exit(f'{path} not found; run python generate_data.py first')
+    directory = tempfile.mkdtemp(prefix='giebee_bench_')
+    # The backup API includes pages still in the -wal file; a file copy would not
+    source = sqlite3.connect(path)
+    target = sqlite3.connect(os.path.join(directory, 'bench.db'))
+    with target:
+        source.backup(target)
+    source.close()
+    target.close()
+    return f"sqlite:///{os.path.join(directory, 'bench.db')}", directory
+
+
+def build_cases(session):
+    """[(name, method, url factory)] for the hot routes, using ids from the data"""
+    from sqlalchemy import func
+    from models import Invoice, Inventory, quotation
+
+    invoice_id = session.query(func.max(Invoice.id)).scalar()
+    search = (session.query(Inventory.name).order_by(Inventory.id).first() or ('a',))[0].split()[0]
+    pending = [row.id for row in session.query(quotation.id).filter(quotation.status == 'PENDING')
+               .order_by(quotation.id.desc()).limit(500)]
+    if not invoice_id or not pending:
+        sys.exit('The database has no invoices or pending quotations; run python generate_data.py first')
+
+    def next_pending():
+        return f'/quotations/{pending.pop()}/convert' if pending else None
+
+    return [
+        ('dashboard', 'GET', lambda: '/'),
+        ('financial', 'GET', lambda: '/financial'),
+        ('inventory_search', 'GET', lambda: f'/inventory?search={search}'),
+        ('invoices', 'GET', lambda: '/invoices'),
+        ('invoice_pdf', 'GET', lambda: f'/invoice/{invoice_id}/pdf'),
+        ('income_statement_pdf', 'GET', lambda: '/financial/generate_income_statement/1/%d' % time.localtime().tm_year),
+        ('convert_to_invoice', 'POST', next_pending),
+    ]
+
+
+def run_case(client, method, url_for_run, iterations, cold):
+    from cache import cache
+
+    timings, queries, sql_ms, statuses = [], [], [], set()
+    for run in range(iterations + 1):
+        url = url_for_run()
+        if url is None:
+            break
+        if cold:
+            cache.clear()
+        started = time.perf_counter()
+        response = client.open(url, method=method)
+        elapsed = (time.perf_counter() - started) * 1000
+        statuses.add(response.status_code)
+        if run == 0:
+            continue  # warm-up
+        timings.append(elapsed)
+        match = SERVER_TIMING_DB.search(', '.join(response.headers.getlist('Server-Timing')))
+        if match:
+            sql_ms.append(float(match.group(1)))
+            queries.append(int(match.group(2)))
+    return timings, queries, sql_ms, statuses
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Hot route benchmarks')
+    parser.add_argument('--database-url', default=os.environ.get('BENCH_DATABASE_URL', DEFAULT_URL))
+    parser.add_argument('--iterations', type=int, default=10)
+    parser.add_argument('--cold', action='store_true', help='clear application caches before every request')
+    parser.add_argument('--only', help='comma-separated case names')
+    parser.add_argument('--save', help='write medians to this JSON file')
+    parser.add_argument('--compare', help='baseline JSON written by --save')
+    parser.add_argument('--tolerance', type=float, default=0.25)
+    parser.add_argument('--noise-ms', type=float, default=2.0)
+    args = parser.parse_args()
+
+    url, scratch = prepare_database(args.database_url)
+    # database.py reads DATABASE_URL at import time
+    os.environ['DATABASE_URL'] = url
+    os.environ.setdefault('SLOW_REQUEST_MS', '1000000')
+    sys.path.append(ROOT)
+    if scratch:
+        # database.py backs SQLite files up into ./backups on import; keep those in the scratch dir
+        os.chdir(scratch)
+    from application import create_app
+    from database import db_session
+
+    try:
+        app = create_app()
+        client = app.test_client()
+        with app.app_context():
+            cases = build_cases(db_session)
+            db_session.remove()
+        if args.only:
+            wanted = set(args.only.split(','))
+            cases = [case for case in cases if case[0] in wanted]
+
+        print(f"{'route':22} {'median':>9} {'p95':>9} {'min':>9} {'queries':>8} {'SQL ms':>8}  status")
+        medians = {}
+        for name, method, url_for_run in cases:
+            timings, queries, sql_ms, statuses = run_case(client, method, url_for_run, args.iterations, args.cold)
+            if not timings:
+                print(f'{name:22} no runs')
+                continue
+            medians[name] = statistics.median(timings)
+            p95 = statistics.quantiles(timings, n=20)[18] if len(timings) > 1 else timings[0]
+            print(f'{name:22} {medians[name]:8.1f}ms {p95:8.1f}ms {min(timings):8.1f}ms '
+                  f'{statistics.median(queries) if queries else 0:8.0f} {statistics.median(sql_ms) if sql_ms else 0:8.1f}'
+                  f"  {','.join(map(str, sorted(statuses)))}")
+    finally:
+        if scratch:
+            shutil.rmtree(scratch, ignore_errors=True)
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump({'iterations': args.iterations, 'cold': args.cold, 'median_ms': medians}, f, indent=2)
+        print(f'Saved baseline to {args.save}')
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)['median_ms']
+        regressions = [(name, baseline[name], median) for name, median in medians.items()
+                       if name in baseline and median > baseline[name] * (1 + args.tolerance)
+                       and median - baseline[name] > args.noise_ms]
+        for name, before, after in regressions:
+            print(f'REGRESSION: {name} {before:.1f} ms -> {after:.1f} ms ({after / before - 1:+.0%})')
+        if regressions:
+            sys.exit(1)
+        print('PASS: no route slower than the baseline')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""Build fingerprinted, compressed static assets.
+
+Usage:
+    python build_static.py
+
+Writes static/dist/ (hashed copies, .gz/.br variants and manifest.json).
+Run as part of the build (see render.yaml); see static_assets.py for how the
+app serves the result.
+"""
+import hashlib
+import io
+import json
+import os
+import shutil
+import sys
+
+from PIL import Image
+from whitenoise.compress import Compressor
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from static_assets import STATIC_DIR, BUILD_DIR
+
+# Logos are shown at most 100px tall; keep enough pixels for 2x displays
+LOGO_MAX_SIZE = (256, 256)
+
+
+def optimize_image(data, filename):
+    """Downscale logos and re-encode PNGs losslessly with maximum compression"""
+    image = Image.open(io.BytesIO(data))
+    if os.path.basename(filename).startswith('logo'):
+        image.thumbnail(LOGO_MAX_SIZE, Image.LANCZOS)
+    output = io.BytesIO()
+    image.save(output, format='PNG', optimize=True)
+    optimized = output.getvalue()
+    return optimized if len(optimized) < len(data) else data
+
+
+def source_files(static_dir):
+    for directory, dirnames, filenames in os.walk(static_dir):
+        if os.path.relpath(directory, static_dir) == '.':
+            dirnames[:] = [name for name in dirnames if name != BUILD_DIR]
+        for filename in sorted(filenames):
+            path = os.path.join(directory, filename)
+            yield os.path.relpath(path, static_dir).replace(os.sep, '/'), path
+
+
+def build(static_dir=STATIC_DIR):
+    build_dir = os.path.join(static_dir, BUILD_DIR)
+    shutil.rmtree(build_dir, ignore_errors=True)
+    compressor = Compressor(quiet=True)
+
+    manifest = {}
+    variants = []
+    original_size = built_size = 0
+    for name, path in source_files(static_dir):
+        with open(path, 'rb') as f:
+            data = f.read()
+        original_size += len(data)
+        if name.lower().endswith('.png'):
+            data = optimize_image(data, name)
+        built_size += len(data)
+
+        stem, ext = os.path.splitext(name)
+        hashed_name = f'{BUILD_DIR}/{stem}.{hashlib.sha256(data).hexdigest()[:12]}{ext}'
+        target = os.path.join(static_dir, *hashed_name.split('/'))
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with open(target, 'wb') as f:
+            f.write(data)
+        if compressor.should_compress(target):
+            variants.extend(compressor.compress(target))
+        manifest[name] = hashed_name
+
+    with open(os.path.join(build_dir, 'manifest.json'), 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest, variants, original_size, built_size
+
+
+def main():
+    manifest, variants, original_size, built_size = build()
+    print(f'Built {len(manifest)} assets ({original_size / 1024:.0f} KB -> {built_size / 1024:.0f} KB) '
+          f'and {len(variants)} compressed variants')
+    for name, hashed_name in sorted(manifest.items()):
+        print(f'  {name} -> {hashed_name}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,267 @@
+"""Application cache.
+
+A small cache abstraction with per-entry TTLs and explicit invalidation,
+backed by either:
+
+* ``local``  - a per-process LRU (default)
+* ``sqlite`` - a shared SQLite file, so every gunicorn worker sees the same
+  entries and the same invalidations
+
+Choose the backend with ``CACHE_BACKEND`` and the SQLite file with
+``CACHE_PATH``. Values stored in the shared backend are pickled, so cache plain
+data (dicts, tuples, strings) rather than ORM objects.
+
+``data_versions()`` exposes a version stamp per table that changes on every
+committed write, for caches keyed on data rather than explicitly invalidated.
+The stamps live in the database (``data_versions`` table), not in the cache
+backend, so every worker and host sees a write as soon as it commits.
+"""
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from flask import g, has_request_context
+from sqlalchemy import event
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+MISSING = object()
+
+DEFAULT_TTL = int(os.environ.get('CACHE_DEFAULT_TTL', 300))
+
+
+class LocalCache:
+    """Thread-safe in-process LRU cache with per-entry expiry"""
+
+    def __init__(self, max_entries=1024, default_ttl=DEFAULT_TTL):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=MISSING):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            value, expires = entry
+            if expires < time.monotonic():
+                del self._entries[key]
+                return default
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        expires = time.monotonic() + (self.default_ttl if ttl is None else ttl)
+        with self._lock:
+            self._entries[key] = (value, expires)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class SQLiteCache:
+    """Cache shared by all processes on a host through one SQLite file"""
+
+    def __init__(self, path, default_ttl=DEFAULT_TTL):
+        self.path = path
+        self.default_ttl = default_ttl
+        self._local = threading.local()
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory, exist_ok=True)
+        self._connection().execute(
+            'CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value BLOB NOT NULL, expires REAL NOT NULL)')
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def get(self, key, default=MISSING):
+        row = self._connection().execute('SELECT value, expires FROM cache WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            return default
+        if row[1] < time.time():
+            self.delete(key)
+            return default
+        return pickle.loads(row[0])
+
+    def set(self, key, value, ttl=None):
+        expires = time.time() + (self.default_ttl if ttl is None else ttl)
+        self._connection().execute('INSERT OR REPLACE INTO cache (key, value, expires) VALUES (?, ?, ?)',
+                                   (key, pickle.dumps(value), expires))
+
+    def delete(self, *keys):
+        if keys:
+            self._connection().executemany('DELETE FROM cache WHERE key = ?', [(key,) for key in keys])
+
+    def clear(self):
+        self._connection().execute('DELETE FROM cache')
+
+
+def create_cache(backend=None):
+    backend = (backend or os.environ.get('CACHE_BACKEND', 'local')).lower()
+    if backend == 'sqlite':
+        return SQLiteCache(os.environ.get('CACHE_PATH', os.path.join('instance', 'cache.db')))
+    if backend == 'local':
+        return LocalCache(max_entries=int(os.environ.get('CACHE_MAX_ENTRIES', 1024)))
+    raise ValueError(f'Unknown CACHE_BACKEND {backend!r}')
+
+
+cache = create_cache()
+
+
+def get_or_set(key, loader, ttl=None):
+    """Return the cached value for key, calling loader() to fill it on a miss"""
+    value = cache.get(key)
+    if value is MISSING:
+        value = loader()
+        cache.set(key, value, ttl)
+    return value
+
+
+_DIRTY_KEY = 'cache_dirty_keys'
+
+
+def invalidate_on(models, *keys, events=('after_insert', 'after_update', 'after_delete')):
+    """Delete ``keys`` whenever rows of ``models`` are written.
+
+    Keys are dropped at flush time and again after commit, so a request that
+    reads between the flush and the commit cannot leave a stale entry behind.
+    """
+    def listener(mapper, connection, target):
+        cache.delete(*keys)
+        session = Session.object_session(target)
+        if session is not None:
+            session.info.setdefault(_DIRTY_KEY, set()).update(keys)
+
+    for model in models:
+        for name in events:
+            event.listen(model, name, listener)
+
+
+# Per-table data versions. Every committed write to a table gives it a new
+# stamp in the data_versions table; anything derived from that table (template
+# fragments, HTTP validators) can key on the stamp instead of tracking
+# invalidations. Stamps are nanosecond timestamps, so they double as
+# modification times.
+_TOUCHED_KEY = 'cache_touched_tables'
+_COMMITTED_KEY = 'cache_committed_tables'
+
+
+def _request_versions():
+    """Stamps already read in this request (one query per request, not per use)"""
+    if not has_request_context():
+        return {}
+    if 'data_versions' not in g:
+        g.data_versions = {}
+    return g.data_versions
+
+
+def bump_versions(*tables, bind=None):
+    """Give each table a new version stamp, in its own short transaction"""
+    from sqlalchemy import case, insert, update
+    from models import DataVersion
+
+    if bind is None:
+        from database import engine as bind
+    stamp = time.time_ns()
+    try:
+        with bind.begin() as connection:
+            # Fixed order, so concurrent bumps of overlapping tables cannot deadlock
+            for table in sorted(set(tables)):
+                result = connection.execute(
+                    update(DataVersion).where(DataVersion.table_name == table)
+                    .values(version=case((DataVersion.version >= stamp, DataVersion.version + 1), else_=stamp)))
+                if result.rowcount == 0:
+                    connection.execute(insert(DataVersion).values(table_name=table, version=stamp))
+    except SQLAlchemyError as e:
+        print(f"Data version bump warning: {e}")
+    _request_versions().clear()
+    return stamp
+
+
+def data_versions(*tables):
+    """Current version stamp of each table, as a tuple (0 if never written)"""
+    known = _request_versions()
+    missing = [table for table in tables if table not in known]
+    if missing:
+        from database import db_session
+        from models import DataVersion
+
+        found = dict(db_session.query(DataVersion.table_name, DataVersion.version)
+                     .filter(DataVersion.table_name.in_(missing)).all())
+        known.update({table: found.get(table, 0) for table in missing})
+    return tuple(known[table] for table in tables)
+
+
+def get_or_set_versioned(key, tables, loader, ttl=None):
+    """get_or_set() under a key that includes the data versions of ``tables``,
+    so a write to any of them makes the next call reload"""
+    stamps = ':'.join(str(stamp) for stamp in data_versions(*tables))
+    return get_or_set(f'{key}:{stamps}', loader, ttl)
+
+
+def _touch(session, tables):
+    if tables:
+        session.info.setdefault(_TOUCHED_KEY, set()).update(tables)
+
+
+@event.listens_for(Session, 'after_flush')
+def _touch_flushed(session, flush_context):
+    _touch(session, {obj.__table__.name
+                     for obj in (*session.new, *session.deleted, *session.dirty)
+                     if hasattr(obj, '__table__')})
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _touch_executed(orm_execute_state):
+    # Bulk INSERT/UPDATE/DELETE statements bypass the flush
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        table = getattr(orm_execute_state.statement, 'table', None)
+        if table is not None:
+            _touch(orm_execute_state.session, {table.name})
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_committed(session):
+    dirty = session.info.pop(_DIRTY_KEY, None)
+    if dirty:
+        cache.delete(*dirty)
+    touched = session.info.pop(_TOUCHED_KEY, None)
+    if touched:
+        session.info.setdefault(_COMMITTED_KEY, set()).update(touched)
+
+
+@event.listens_for(Session, 'after_transaction_end')
+def _bump_committed(session, transaction):
+    # After the commit, so no other connection can see the new stamp before the
+    # new rows, and after the session handed its connection back, so the bump
+    # never waits on a full pool for a second one
+    if transaction.parent is None:
+        committed = session.info.pop(_COMMITTED_KEY, None)
+        if committed:
+            bump_versions(*committed, bind=session.bind)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_dirty(session):
+    session.info.pop(_DIRTY_KEY, None)
+    session.info.pop(_TOUCHED_KEY, None)
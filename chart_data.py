@@ -0,0 +1,147 @@
+"""Chart datasets for the dashboard and financial pages.
+
+Each function returns a Chart.js-shaped ``{'labels': [...], 'datasets': [...]}``
+dict. The pages fetch them from the /api/v1/charts/* endpoints, and the results
+are cached keyed on the data versions of the tables they read.
+"""
+from datetime import datetime
+
+from sqlalchemy import extract, func
+
+from cache import get_or_set_versioned
+from dashboard_counters import top_locations
+from models import (Payment, FinancialRecord, FinancialType, StockTransaction, TransactionType,
+                    Invoice, InvoiceItem, Inventory)
+from rate_history import usd_amount_as_of
+
+MONTHS = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+
+# Tables each dataset reads, for cache keys and HTTP validators
+LOCATION_TABLES = ('journey_records',)
+MONTHLY_TABLES = ('payments', 'financial_records')
+ITEM_PROFIT_TABLES = ('invoices', 'invoice_items', 'stock_transactions', 'inventory', 'exchange_rates')
+BREAKDOWN_TABLES = ('payments', 'financial_records', 'stock_transactions', 'exchange_rates')
+
+
+def month_range(year, month):
+    """[start, end) datetimes of a calendar month"""
+    start = datetime(year, month, 1)
+    end = datetime(year + 1, 1, 1) if month == 12 else datetime(year, month + 1, 1)
+    return start, end
+
+
+def period_totals(session, start_date, end_date):
+    """Sales, other income, expenses and COGS (USD, negative) for a period"""
+    def total(column, *criteria):
+        return session.query(func.sum(column)).filter(*criteria).scalar() or 0
+
+    in_period = (FinancialRecord.date >= start_date, FinancialRecord.date < end_date)
+    return {
+        'total_sales': total(Payment.amount, Payment.payment_date >= start_date, Payment.payment_date < end_date),
+        'total_income': total(FinancialRecord.amount, FinancialRecord.type == FinancialType.INCOME, *in_period),
+        'total_expenses': total(FinancialRecord.amount, FinancialRecord.type == FinancialType.EXPENSE, *in_period),
+        'cogs': total(
+            usd_amount_as_of(StockTransaction.total_value, StockTransaction.currency, StockTransaction.date_created),
+            StockTransaction.transaction_type == 'STOCK_OUT',
+            StockTransaction.date_created >= start_date,
+            StockTransaction.date_created < end_date
+        ),
+    }
+
+
+def location_chart(session, year=None, month=None):
+    """Most visited locations, for all time or one month"""
+    def load():
+        if year and month:
+            rows = top_locations(session, *month_range(year, month))
+        else:
+            rows = top_locations(session)
+        return {
+            'labels': [row[0] for row in rows],
+            'datasets': [{'label': 'Visits', 'data': [row[1] for row in rows]}],
+        }
+    return get_or_set_versioned(f'chart:locations:{year}:{month}', LOCATION_TABLES, load)
+
+
+def monthly_chart(session, year):
+    """Payments received and expenses per month of a year"""
+    def load():
+        start, end = datetime(year, 1, 1), datetime(year + 1, 1, 1)
+        revenue = dict(session.query(extract('month', Payment.payment_date), func.sum(Payment.amount)).filter(
+            Payment.payment_date >= start, Payment.payment_date < end
+        ).group_by(extract('month', Payment.payment_date)).all())
+        expenses = dict(session.query(extract('month', FinancialRecord.date), func.sum(FinancialRecord.amount)).filter(
+            FinancialRecord.type == FinancialType.EXPENSE,
+            FinancialRecord.date >= start, FinancialRecord.date < end
+        ).group_by(extract('month', FinancialRecord.date)).all())
+        return {
+            'labels': MONTHS,
+            'datasets': [
+                {'label': 'Revenue', 'data': [revenue.get(m, 0) or 0 for m in range(1, 13)]},
+                {'label': 'Expenses', 'data': [expenses.get(m, 0) or 0 for m in range(1, 13)]},
+            ],
+        }
+    return get_or_set_versioned(f'chart:monthly:{year}', MONTHLY_TABLES, load)
+
+
+def item_profit_chart(session, year, month, limit=10):
+    """Invoice revenue minus the COGS recorded on each sale's STOCK_OUT rows"""
+    def load():
+        start_date, end_date = month_range(year, month)
+        period_invoices = session.query(Invoice.id).filter(
+            Invoice.date_created >= start_date,
+            Invoice.date_created < end_date
+        )
+        revenue_rows = session.query(
+            InvoiceItem.inventory_id, InvoiceItem.description, func.sum(InvoiceItem.amount)
+        ).filter(InvoiceItem.invoice_id.in_(period_invoices)).group_by(
+            InvoiceItem.inventory_id, InvoiceItem.description
+        ).all()
+        cost_by_item = dict(session.query(
+            StockTransaction.inventory_id,
+            func.sum(usd_amount_as_of(StockTransaction.total_value, StockTransaction.currency,
+                                      StockTransaction.date_created))
+        ).filter(
+            StockTransaction.reference_type == 'invoice',
+            StockTransaction.transaction_type == TransactionType.STOCK_OUT,
+            StockTransaction.reference_id.in_(period_invoices)
+        ).group_by(StockTransaction.inventory_id).all())
+        item_names = dict(session.query(Inventory.id, Inventory.name).filter(
+            Inventory.id.in_([row[0] for row in revenue_rows if row[0]])
+        ).all())
+
+        item_profits = {}
+        for inventory_id, description, revenue in revenue_rows:
+            if inventory_id:
+                item_name = item_names.get(inventory_id, "Unknown Item")
+                # COGS is negative on STOCK_OUT rows; take it once per item
+                cost = abs(cost_by_item.pop(inventory_id, 0) or 0)
+            else:
+                # Custom items (labour, services) have no stock and no tracked cost
+                item_name = description or "Custom Item"
+                cost = 0
+            item_profits[item_name] = item_profits.get(item_name, 0) + (revenue or 0) - cost
+
+        top_items = sorted(item_profits.items(), key=lambda x: x[1], reverse=True)[:limit]
+        return {
+            'labels': [item[0] for item in top_items],
+            'datasets': [{'label': 'Profit', 'data': [item[1] for item in top_items]}],
+        }
+    return get_or_set_versioned(f'chart:item_profits:{year}:{month}:{limit}', ITEM_PROFIT_TABLES, load)
+
+
+def profit_breakdown_chart(session, year, month):
+    """Payments, other income, expenses and COGS for one month"""
+    def load():
+        totals = period_totals(session, *month_range(year, month))
+        breakdown = {
+            'Payments Received': totals['total_sales'],
+            'Other Income': totals['total_income'],
+            'Expenses': -totals['total_expenses'],
+            'COGS': -abs(totals['cogs']),
+        }
+        return {
+            'labels': list(breakdown),
+            'datasets': [{'label': 'Amount', 'data': list(breakdown.values())}],
+        }
+    return get_or_set_versioned(f'chart:profit_breakdown:{year}:{month}', BREAKDOWN_TABLES, load)
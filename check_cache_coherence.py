@@ -0,0 +1,118 @@
+"""Check that data-versioned caches agree across worker processes.
+
+Starts two app processes on one throwaway SQLite database, as two gunicorn
+workers would run. Process A caches /inventory (ETag), a {% cache %} fragment
+and a get_or_set_versioned() value; process B then adds a stock item. A must
+answer the old ETag with a fresh 200 and re-render the fragment and value,
+even with the default per-process (local) cache backend.
+
+Usage:
+    python check_cache_coherence.py
+    CACHE_BACKEND=sqlite python check_cache_coherence.py
+"""
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+FRAGMENT = "{% cache 'coherence', 300, 'inventory' %}{{ count() }}{% endcache %}"
+
+
+def serve(directory, connection):
+    """One app process: run commands from the pipe until it closes"""
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(directory, 'coherence.db')}"
+    # database.py backs SQLite files up into ./backups on import; keep those in the temp dir
+    os.chdir(directory)
+    sys.path.insert(0, ROOT)
+    from application import create_app
+    from cache import get_or_set_versioned
+    from database import db_session
+    from models import Inventory
+
+    app = create_app()
+    client = app.test_client()
+
+    def count():
+        return db_session.query(Inventory).count()
+
+    while True:
+        try:
+            command, *args = connection.recv()
+        except EOFError:
+            return
+        if command == 'get':
+            path, etag = args
+            response = client.get(path, headers={'If-None-Match': etag} if etag else {})
+            connection.send((response.status_code, response.headers.get('ETag', '').strip('"'),
+                             response.get_data(as_text=True)))
+        elif command == 'post':
+            path, data = args
+            connection.send(client.post(path, data=data).status_code)
+        elif command == 'fragment':
+            with app.test_request_context('/'):
+                connection.send(app.jinja_env.from_string(FRAGMENT).render(count=count))
+            db_session.remove()
+        elif command == 'versioned':
+            with app.test_request_context('/'):
+                connection.send(get_or_set_versioned('coherence', ['inventory'], count))
+            db_session.remove()
+
+
+def main():
+    directory = tempfile.mkdtemp(prefix='giebee_coherence_')
+    context = multiprocessing.get_context('spawn')
+    workers = []
+    try:
+        for _ in range(2):
+            parent, child = context.Pipe()
+            process = context.Process(target=serve, args=(directory, child), daemon=True)
+            process.start()
+            workers.append((process, parent))
+            # Let the first process create the schema before the second starts
+            parent.send(('versioned',))
+            parent.recv()
+        (_, a), (_, b) = workers
+
+        def call(pipe, *command):
+            pipe.send(command)
+            return pipe.recv()
+
+        status, etag, _ = call(a, 'get', '/inventory', None)
+        fragment_before = call(a, 'fragment')
+        versioned_before = call(a, 'versioned')
+        cached_status, _, _ = call(a, 'get', '/inventory', etag)
+
+        added = call(b, 'post', '/inventory/add', dict(
+            name='Coherence Check Panel', brand='B', category='Solar', specifications='CC1',
+            quantity='3', unit_price='10', supplier_id=''))
+
+        after_status, after_etag, body = call(a, 'get', '/inventory', etag)
+        fragment_after = call(a, 'fragment')
+        versioned_after = call(a, 'versioned')
+    finally:
+        for process, pipe in workers:
+            pipe.close()
+            process.join(timeout=10)
+        shutil.rmtree(directory, ignore_errors=True)
+
+    checks = [
+        ('first GET is 200 with an ETag', status == 200 and bool(etag)),
+        ('repeat GET in the same process is 304', cached_status == 304),
+        ('add in the other process succeeded', added == 302),
+        ('old ETag now gets a 200 with the new item',
+         after_status == 200 and after_etag != etag and 'Coherence Check Panel' in body),
+        ('fragment re-rendered', int(fragment_after) == int(fragment_before) + 1),
+        ('versioned value reloaded', versioned_after == versioned_before + 1),
+    ]
+    for name, passed in checks:
+        print(f"  {'ok' if passed else 'FAIL':4}  {name}")
+    ok = all(passed for _, passed in checks)
+    print('PASS' if ok else 'FAIL: a process served stale cached data')
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,79 @@
+"""Fail if importing the app gets slower than the startup budget.
+
+Usage:
+    python check_import_time.py                # median of 3 runs vs the budget
+    python check_import_time.py --budget 800 --runs 5
+
+Each run is a fresh interpreter started with ``python -X importtime -c
+"import main"`` against an empty temporary SQLite database. The check fails
+(exit 1) when the median cumulative import time of ``main`` exceeds the budget
+(``IMPORT_TIME_BUDGET_MS``, default 1000 ms), or when a module that must stay
+lazy (ReportLab, pandas, ...) is imported at startup.
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# Only needed by PDF, spreadsheet and image code paths; import them inside the view
+LAZY_MODULES = ('reportlab', 'pandas', 'numpy', 'openpyxl', 'PIL')
+
+LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+
+def measure_once():
+    """{module: (self_us, cumulative_us)} for one cold import of main"""
+    with tempfile.TemporaryDirectory() as directory:
+        env = dict(os.environ, DATABASE_URL=f"sqlite:///{os.path.join(directory, 'import_check.db')}")
+        result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import main'],
+                                cwd=directory, env=dict(env, PYTHONPATH=ROOT),
+                                capture_output=True, text=True)
+    if result.returncode != 0:
+        sys.exit(f'import main failed:\n{result.stderr[-2000:]}')
+
+    modules = {}
+    for line in result.stderr.splitlines():
+        match = LINE.match(line)
+        if match:
+            modules[match.group(4)] = (int(match.group(1)), int(match.group(2)))
+    return modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Startup import-time budget check')
+    parser.add_argument('--budget', type=float, default=float(os.environ.get('IMPORT_TIME_BUDGET_MS', 1000)),
+                        help='maximum median import time of main in ms')
+    parser.add_argument('--runs', type=int, default=3)
+    args = parser.parse_args()
+
+    runs = [measure_once() for _ in range(args.runs)]
+    totals = [run['main'][1] / 1000 for run in runs]
+    median = statistics.median(totals)
+    last = runs[-1]
+
+    print(f"import main: median {median:.0f} ms over {args.runs} runs "
+          f"({', '.join(f'{t:.0f}' for t in totals)} ms), budget {args.budget:.0f} ms")
+    print('Slowest modules (self time, last run):')
+    for name, (self_us, cumulative_us) in sorted(last.items(), key=lambda item: -item[1][0])[:10]:
+        print(f'  {self_us / 1000:8.1f} ms  {name}')
+
+    failed = False
+    eager = sorted({name.split('.')[0] for name in last} & set(LAZY_MODULES))
+    if eager:
+        print(f"FAIL: imported at startup but should be lazy: {', '.join(eager)}")
+        failed = True
+    if median > args.budget:
+        print(f'FAIL: startup import time {median:.0f} ms exceeds budget {args.budget:.0f} ms')
+        failed = True
+    if not failed:
+        print('PASS')
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
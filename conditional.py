@@ -0,0 +1,70 @@
+"""Conditional GET for read-mostly pages and PDFs.
+
+``@conditional('invoices', 'customers')`` derives an ETag and Last-Modified
+from the data version stamps of the listed tables (see cache.data_versions)
+plus the deployed code. A matching ``If-None-Match`` (or ``If-Modified-Since``)
+is answered with 304 before the view runs, so browsers and the desktop shell
+skip both the queries and the download. The stamps are stored in the database,
+so a write in one gunicorn worker changes the validators in all of them.
+"""
+import glob
+import hashlib
+import os
+from datetime import datetime, timezone
+from functools import wraps
+
+from flask import current_app, make_response, request, session
+
+from cache import data_versions
+from db_routing import read_route
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+def _code_mtime():
+    """Newest template or module mtime, so a deploy changes every validator"""
+    paths = (glob.glob(os.path.join(ROOT, 'templates', '*.html')) + glob.glob(os.path.join(ROOT, '*.py'))
+             + glob.glob(os.path.join(ROOT, 'views', '*.py')))
+    return max((os.stat(path).st_mtime_ns for path in paths), default=0)
+
+
+CODE_MTIME = _code_mtime()
+
+
+def conditional(*tables):
+    """Answer conditional GETs for a view whose output depends only on the
+    request URL and the rows of ``tables``"""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            # Pending flash messages make the page differ from the cached copy
+            if request.method not in ('GET', 'HEAD') or session.get('_flashes'):
+                return view(*args, **kwargs)
+
+            # Read the stamps where a @read_only view reads its rows: a lagging
+            # replica may then give an old stamp for new rows, never the reverse
+            with read_route():
+                stamps = data_versions(*tables)
+            etag = hashlib.sha1(repr((CODE_MTIME, request.full_path, stamps)).encode()).hexdigest()
+            last_modified = datetime.fromtimestamp(max((CODE_MTIME, *stamps)) // 10**9, timezone.utc)
+
+            if request.if_none_match:
+                not_modified = request.if_none_match.contains(etag)
+            else:
+                not_modified = request.if_modified_since is not None and last_modified <= request.if_modified_since
+
+            if not_modified:
+                response = current_app.response_class(status=304)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            response.set_etag(etag)
+            response.last_modified = last_modified
+            # Keep the copy in the browser only, and revalidate on every use
+            response.cache_control.private = True
+            response.cache_control.no_cache = True
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,154 @@
+"""Inventory cost layers.
+
+Every receipt opens a cost lot (``CostLayer``) and every stock-out consumes
+lots oldest first. COGS is taken from the consumed lots (FIFO) or from the
+running average cost (AVERAGE), chosen with ``INVENTORY_COST_METHOD``.
+
+``InventoryCost`` keeps running quantity and cost totals per item, so stock
+valuation reads one row per item instead of replaying history. Callers hold
+the item's inventory row lock (taken by the UPDATE in inventory_service), which
+serializes cost updates for the same item.
+"""
+import os
+
+from sqlalchemy import select, func, bindparam, insert
+
+from models import Inventory, CostLayer, InventoryCost
+
+FIFO = 'FIFO'
+AVERAGE = 'AVERAGE'
+
+COST_METHOD = os.environ.get('INVENTORY_COST_METHOD', FIFO).upper()
+
+
+def _ensure_tracked(session, inventory_id, on_hand_before, fallback_cost):
+    """Load the item's running totals, opening them from current stock the
+    first time an item moves after cost tracking was introduced"""
+    # Reload (bulk_receive updates the row with Core), but flush first: db_session
+    # does not autoflush, and an earlier movement of the same item in this
+    # transaction may still hold unflushed totals that the reload would discard
+    session.flush()
+    tracked = session.get(InventoryCost, inventory_id, populate_existing=True, with_for_update=True)
+    if tracked is None:
+        on_hand = max(on_hand_before or 0, 0)
+        tracked = InventoryCost(inventory_id=inventory_id, quantity=on_hand, total_cost=on_hand * fallback_cost)
+        session.add(tracked)
+        if on_hand:
+            session.add(CostLayer(inventory_id=inventory_id, unit_cost=fallback_cost,
+                                  quantity_received=on_hand, quantity_remaining=on_hand))
+        session.flush()
+    return tracked
+
+
+def _average(tracked, fallback_cost):
+    if tracked.quantity and tracked.quantity > 0:
+        return tracked.total_cost / tracked.quantity
+    return fallback_cost
+
+
+def average_cost(session, inventory_id, fallback_cost=0.0):
+    """Current moving-average unit cost of an item"""
+    tracked = session.get(InventoryCost, inventory_id)
+    return _average(tracked, fallback_cost) if tracked else fallback_cost
+
+
+def receive(session, inventory_id, quantity, unit_cost, on_hand_before, fallback_cost=0.0, stock_transaction=None):
+    """Open a cost lot for a receipt and add it to the running totals"""
+    tracked = _ensure_tracked(session, inventory_id, on_hand_before, fallback_cost)
+    session.add(CostLayer(
+        inventory_id=inventory_id,
+        stock_transaction=stock_transaction,
+        unit_cost=unit_cost,
+        quantity_received=quantity,
+        quantity_remaining=quantity
+    ))
+    tracked.quantity += quantity
+    tracked.total_cost += quantity * unit_cost
+
+
+def consume(session, inventory_id, quantity, on_hand_before, fallback_cost=0.0, method=None):
+    """Consume ``quantity`` units from the open lots and return their cost (COGS)"""
+    method = (method or COST_METHOD).upper()
+    tracked = _ensure_tracked(session, inventory_id, on_hand_before, fallback_cost)
+    average = _average(tracked, fallback_cost)
+    session.flush()
+
+    layers = session.execute(
+        select(CostLayer)
+        .where(CostLayer.inventory_id == inventory_id, CostLayer.quantity_remaining > 0)
+        .order_by(CostLayer.id)
+        .with_for_update()
+    ).scalars()
+
+    remaining = quantity
+    fifo_cost = 0.0
+    for layer in layers:
+        if remaining <= 0:
+            break
+        taken = min(layer.quantity_remaining, remaining)
+        layer.quantity_remaining -= taken
+        fifo_cost += taken * layer.unit_cost
+        remaining -= taken
+    if remaining > 0:
+        # Stock with no lots left (e.g. counted in before tracking began)
+        fifo_cost += remaining * average
+
+    cost = quantity * average if method == AVERAGE else fifo_cost
+
+    tracked.quantity -= quantity
+    tracked.total_cost = tracked.total_cost - cost if tracked.quantity > 0 else 0.0
+    return cost
+
+
+def bulk_receive(session, lines):
+    """Cost lots and running totals for a whole delivery, written with executemany.
+
+    Must run before the inventory quantities are incremented, so items seen
+    for the first time are opened from their pre-delivery stock.
+    """
+    item_ids = {line['inventory_id'] for line in lines}
+    tracked_ids = set(session.execute(
+        select(InventoryCost.inventory_id).where(InventoryCost.inventory_id.in_(item_ids))
+    ).scalars())
+    untracked = item_ids - tracked_ids
+    if untracked:
+        for item_id, on_hand, unit_price in session.execute(
+                select(Inventory.id, Inventory.quantity, Inventory.unit_price)
+                .where(Inventory.id.in_(untracked)).with_for_update()):
+            _ensure_tracked(session, item_id, on_hand, unit_price or 0.0)
+
+    session.execute(
+        insert(CostLayer.__table__),
+        [{'inventory_id': line['inventory_id'],
+          'unit_cost': line['unit_price'],
+          'quantity_received': line['quantity'],
+          'quantity_remaining': line['quantity']} for line in lines]
+    )
+    costs = InventoryCost.__table__
+    session.execute(
+        costs.update()
+        .where(costs.c.inventory_id == bindparam('b_id'))
+        .values(quantity=costs.c.quantity + bindparam('b_quantity'),
+                total_cost=costs.c.total_cost + bindparam('b_cost')),
+        [{'b_id': line['inventory_id'], 'b_quantity': line['quantity'],
+          'b_cost': line['quantity'] * line['unit_price']} for line in lines]
+    )
+
+
+def item_valuations(session):
+    """{inventory_id: (quantity, total_cost)} from the running totals"""
+    return {row.inventory_id: (row.quantity, row.total_cost)
+            for row in session.query(InventoryCost.inventory_id, InventoryCost.quantity, InventoryCost.total_cost)}
+
+
+def inventory_valuation(session):
+    """Total cost of stock on hand.
+
+    Items that have not moved since cost tracking began are valued at
+    quantity * unit_price until their first movement opens their cost lots.
+    """
+    tracked = session.query(func.coalesce(func.sum(InventoryCost.total_cost), 0.0)).scalar()
+    untracked = session.query(func.coalesce(func.sum(Inventory.unit_price * Inventory.quantity), 0.0)).outerjoin(
+        InventoryCost, InventoryCost.inventory_id == Inventory.id
+    ).filter(InventoryCost.inventory_id.is_(None)).scalar()
+    return (tracked or 0.0) + (untracked or 0.0)
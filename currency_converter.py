@@ -1,7 +1,98 @@
+"""Exchange rates and currency conversion.
+
+Rates live in the ``exchange_rates`` table, dated by effective_date and
+loaded from a local file (``data/exchange_rates.csv`` by default, override
+with ``EXCHANGE_RATES_FILE``). The latest rate per currency is cached in the
+application cache, so looking rates up costs nothing per request.
+
+Reports convert whole result sets in one pass: ``usd_amount()`` builds a SQL
+expression so aggregates come back already in USD.
+"""
+import csv
+import os
+from datetime import datetime
+
+from sqlalchemy import case, func
+
+from cache import get_or_set, invalidate_on
+from models import ExchangeRate, Currency
+
+RATES_CACHE_KEY = 'fx:rates'
+RATES_TTL = int(os.environ.get('EXCHANGE_RATES_TTL', 3600))
+RATES_FILE = os.environ.get('EXCHANGE_RATES_FILE', os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                                  'data', 'exchange_rates.csv'))
+
+# Used until the rate table has been loaded
+DEFAULT_RATES = {
+    'USD': 1.0,
+    'ZWL': 0.0028,
+    'RAND': 0.053,
+}
+
+
+def _code(currency):
+    """Currency enum member or string -> 'USD' style code"""
+    return getattr(currency, 'value', currency)
+
+
+def load_rates_file(session, path=None):
+    """Insert rates from a CSV file (currency, effective_date, rate_to_usd)
+    that are not in the table yet. The caller commits. Returns rows added."""
+    path = path or RATES_FILE
+    if not os.path.exists(path):
+        return 0
+
+    existing = {(rate.currency, rate.effective_date)
+                for rate in session.query(ExchangeRate.currency, ExchangeRate.effective_date)}
+    added = 0
+    with open(path, newline='') as f:
+        for row in csv.DictReader(f):
+            currency = Currency(row['currency'].strip().upper())
+            effective_date = datetime.strptime(row['effective_date'].strip(), '%Y-%m-%d')
+            if (currency, effective_date) in existing:
+                continue
+            session.add(ExchangeRate(
+                currency=currency,
+                rate_to_usd=float(row['rate_to_usd']),
+                effective_date=effective_date,
+                source=os.path.basename(path)
+            ))
+            existing.add((currency, effective_date))
+            added += 1
+    return added
+
+
+def _fetch_exchange_rates():
+    """Latest rate per currency from the rate table"""
+    from database import db_session
+
+    latest = db_session.query(
+        ExchangeRate.currency, func.max(ExchangeRate.effective_date).label('effective_date')
+    ).group_by(ExchangeRate.currency).subquery()
+    rows = db_session.query(ExchangeRate.currency, ExchangeRate.rate_to_usd).join(
+        latest, (ExchangeRate.currency == latest.c.currency)
+        & (ExchangeRate.effective_date == latest.c.effective_date)
+    ).all()
+
+    rates = dict(DEFAULT_RATES)
+    rates.update({_code(currency): rate for currency, rate in rows})
+    return rates
+
+
 def get_exchange_rates():
-    """Simulates fetching exchange rates from an API."""
-    return {
-        'USD': 1.0,
-        'ZWL': 0.0028,  # Example rate
-        'RAND': 0.053,   # Example rate
-    }
\ No newline at end of file
+    """Current exchange rates to USD, keyed by currency code and cached."""
+    return get_or_set(RATES_CACHE_KEY, _fetch_exchange_rates, RATES_TTL)
+
+
+def usd_amount(amount_column, currency_column, rates=None):
+    """SQL expression converting amount_column to USD, for use inside
+    aggregates such as func.sum(usd_amount(...)). NULL currency means USD."""
+    rates = rates or get_exchange_rates()
+    multiplier = case(
+        *[(currency_column == Currency(code), rate) for code, rate in rates.items() if code != 'USD'],
+        else_=1.0
+    )
+    return amount_column * multiplier
+
+
+invalidate_on([ExchangeRate], RATES_CACHE_KEY)
@@ -0,0 +1,68 @@
+"""Cached counters for the dashboard.
+
+Per-table counts and the top-locations chart live in the application cache
+(see cache.py). SQLAlchemy ``after_insert``/``after_delete`` mapper events
+invalidate the affected entry, and invalidate it again once the transaction
+commits. When the cache is cold, all counts are read with a single SELECT of
+scalar subqueries.
+"""
+import os
+
+from sqlalchemy import func, select
+
+from cache import cache, get_or_set, invalidate_on
+from models import Supplier, Customer, Inventory, quotation, Activity, JourneyRecord
+
+CACHE_TTL = int(os.environ.get('DASHBOARD_CACHE_TTL', 60))
+
+COUNTED_MODELS = {
+    'suppliers_count': Supplier,
+    'customers_count': Customer,
+    'inventory_count': Inventory,
+    'quotations_count': quotation,
+    'activities_count': Activity,
+}
+
+COUNTS_KEY = 'dashboard:counts'
+LOCATIONS_KEY = 'dashboard:top_locations'
+
+
+def invalidate():
+    """Drop all cached dashboard entries"""
+    cache.delete(COUNTS_KEY, LOCATIONS_KEY)
+
+
+def dashboard_counts(session):
+    """{'suppliers_count': n, ...} for the dashboard cards"""
+    def load():
+        query = select(*[
+            select(func.count()).select_from(model).scalar_subquery().label(name)
+            for name, model in COUNTED_MODELS.items()
+        ])
+        return dict(session.execute(query).mappings().one())
+    return get_or_set(COUNTS_KEY, load, CACHE_TTL)
+
+
+def _location_query(session, start_date=None, end_date=None, limit=10):
+    location = func.coalesce(func.nullif(JourneyRecord.end_location, ''),
+                             func.nullif(JourneyRecord.start_location, ''))
+    visits = func.count(JourneyRecord.id)
+    query = session.query(location, visits).filter(location.isnot(None))
+    if start_date is not None:
+        query = query.filter(JourneyRecord.start_time >= start_date)
+    if end_date is not None:
+        query = query.filter(JourneyRecord.start_time < end_date)
+    return query.group_by(location).order_by(visits.desc(), location).limit(limit).all()
+
+
+def top_locations(session, start_date=None, end_date=None, limit=10):
+    """[(location, visits), ...] most visited first; cached when unfiltered"""
+    if start_date is None and end_date is None:
+        return get_or_set(LOCATIONS_KEY,
+                          lambda: [tuple(row) for row in _location_query(session, limit=limit)],
+                          CACHE_TTL)
+    return [tuple(row) for row in _location_query(session, start_date, end_date, limit)]
+
+
+invalidate_on(COUNTED_MODELS.values(), COUNTS_KEY, events=('after_insert', 'after_delete'))
+invalidate_on([JourneyRecord], LOCATIONS_KEY, events=('after_insert', 'after_delete'))
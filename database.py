@@ -1,3 +1,4 @@
+import atexit
 import os
 from datetime import datetime
 from sqlalchemy import create_engine
@@ -5,6 +6,9 @@ from sqlalchemy.orm import scoped_session, sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 from dotenv import load_dotenv
 
+from db_pool import pool_options, instrument_pool
+from db_routing import RoutingSession, create_read_engine
+
 # Load environment variables from .env file if it exists
 load_dotenv()
 
@@ -24,7 +28,7 @@ if database_url.startswith('sqlite:///'):
     
     # Create an automatic backup of the SQLite database if it exists
     if os.path.exists(db_path):
-        import shutil
+        import sqlite3
         backup_dir = os.path.join(os.getcwd(), 'backups')
         if not os.path.exists(backup_dir):
             os.makedirs(backup_dir)
@@ -32,7 +36,13 @@ if database_url.startswith('sqlite:///'):
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         backup_path = os.path.join(backup_dir, f"backup_{timestamp}_{os.path.basename(db_path)}")
         try:
-            shutil.copy2(db_path, backup_path)
+            # The backup API includes pages still in the -wal file; a file copy would not
+            source = sqlite3.connect(db_path)
+            target = sqlite3.connect(backup_path)
+            with target:
+                source.backup(target)
+            source.close()
+            target.close()
             # Keep only last 5 backups
             backups = sorted([os.path.join(backup_dir, f) for f in os.listdir(backup_dir) if f.startswith('backup_')], key=os.path.getmtime)
             while len(backups) > 5:
@@ -41,9 +51,30 @@ if database_url.startswith('sqlite:///'):
         except Exception as e:
             print(f"Failed to create database backup: {e}")
 
-# Configure engine with connection pooling for production
-engine = create_engine(database_url, pool_pre_ping=True, pool_recycle=300)
-db_session = scoped_session(sessionmaker(autocommit=False,
+# Pool type and sizing depend on the deployment target (see db_pool.py)
+engine = create_engine(database_url, **pool_options(database_url))
+instrument_pool(engine)
+
+if database_url.startswith('sqlite'):
+    from sqlite_tuning import tune_sqlite, enable_single_writer
+    tune_sqlite(engine)
+    # Closing the last connection checkpoints the WAL back into the database file
+    atexit.register(engine.dispose)
+    if os.environ.get('SQLITE_SINGLE_WRITER', '').lower() in ('1', 'true', 'yes'):
+        enable_single_writer()
+
+# Read-only views query read_engine (a replica, or a read-only SQLite connection);
+# None when routing is off (see db_routing.py)
+read_engine = create_read_engine(database_url, pool_options)
+if read_engine is not None:
+    instrument_pool(read_engine)
+    if read_engine.url.get_backend_name() == 'sqlite':
+        tune_sqlite(read_engine)
+        atexit.register(read_engine.dispose)
+RoutingSession.read_engine = read_engine
+
+db_session = scoped_session(sessionmaker(class_=RoutingSession,
+                                         autocommit=False,
                                          autoflush=False,
                                          bind=engine))
 Base = declarative_base()
@@ -0,0 +1,107 @@
+"""Connection pool settings per deployment target.
+
+``DB_POOL`` picks the pool:
+
+* ``queue``  - SQLAlchemy's QueuePool (default: Render, gunicorn, desktop_app.py).
+  Sized with ``DB_POOL_SIZE``, ``DB_MAX_OVERFLOW``, ``DB_POOL_TIMEOUT`` and
+  ``DB_POOL_RECYCLE``. Each session checks out its own connection; SQLite
+  connections may be reused by another thread after they are returned.
+* ``null``   - NullPool: open a connection per checkout and close it after.
+  For serverless (Vercel), where a pool cannot outlive the invocation; put an
+  external pooler (pgbouncer, Neon/Supabase pooler) in front of Postgres.
+  Chosen automatically when ``VERCEL`` is set.
+
+There is no shared single-connection mode: with threaded servers one thread's
+session close would roll back another thread's open transaction.
+
+``pool_status()`` reports the pool's current occupancy and lifetime counters.
+"""
+import os
+import threading
+
+from sqlalchemy import event
+from sqlalchemy.pool import NullPool
+
+POOL_MODES = ('queue', 'null')
+
+
+def pool_mode():
+    mode = os.environ.get('DB_POOL', '').strip().lower()
+    if not mode:
+        return 'null' if os.environ.get('VERCEL') else 'queue'
+    if mode == 'static':
+        print("DB_POOL=static is no longer supported (one connection shared by all threads), using queue")
+        return 'queue'
+    if mode not in POOL_MODES:
+        print(f"Unknown DB_POOL '{mode}', using queue")
+        return 'queue'
+    return mode
+
+
+def pool_options(database_url, mode=None):
+    """Keyword arguments for create_engine() for the given pool mode"""
+    mode = mode or pool_mode()
+    sqlite = database_url.startswith('sqlite')
+    if mode == 'null':
+        return {'poolclass': NullPool}
+    options = {
+        'pool_pre_ping': True,
+        'pool_recycle': int(os.environ.get('DB_POOL_RECYCLE', 300)),
+        'pool_size': int(os.environ.get('DB_POOL_SIZE', 5)),
+        'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 10)),
+        'pool_timeout': float(os.environ.get('DB_POOL_TIMEOUT', 30)),
+    }
+    if sqlite:
+        # A pooled connection is only ever used by one checkout at a time, but
+        # the next checkout may come from another server thread
+        options['connect_args'] = {'check_same_thread': False}
+    return options
+
+
+class PoolCounters:
+    """Lifetime connection counters, updated from pool events"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.invalidated = 0
+
+    def incr(self, name):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def snapshot(self):
+        with self._lock:
+            return {'connects': self.connects, 'checkouts': self.checkouts,
+                    'checkins': self.checkins, 'invalidated': self.invalidated}
+
+
+_counters = {}
+
+
+def instrument_pool(engine):
+    """Count connects, checkouts, checkins and invalidations on the engine's pool"""
+    counters = _counters[engine] = PoolCounters()
+    event.listen(engine, 'connect', lambda *args: counters.incr('connects'))
+    event.listen(engine, 'checkout', lambda *args: counters.incr('checkouts'))
+    event.listen(engine, 'checkin', lambda *args: counters.incr('checkins'))
+    event.listen(engine, 'invalidate', lambda *args: counters.incr('invalidated'))
+
+
+def pool_status(engine):
+    """Pool class, configured size and current usage, plus the lifetime counters"""
+    pool = engine.pool
+    status = {'pool': type(pool).__name__, 'mode': pool_mode()}
+    for name in ('size', 'checkedin', 'checkedout', 'overflow'):
+        method = getattr(pool, name, None)
+        if callable(method):
+            status[name] = method()
+    if hasattr(pool, '_max_overflow'):
+        status['max_overflow'] = pool._max_overflow
+    if hasattr(pool, '_timeout'):
+        status['timeout'] = pool._timeout
+    if engine in _counters:
+        status.update(_counters[engine].snapshot())
+    return status
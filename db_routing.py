@@ -0,0 +1,127 @@
+"""Read/write session routing.
+
+``db_session`` is a ``RoutingSession``: it normally uses the primary (write)
+engine, but while a ``@read_only`` view handles a GET its queries go to the
+read engine instead. Flushes always go to the primary.
+
+The read engine is:
+
+* ``DATABASE_READ_URL`` when set (a Postgres read replica), else
+* for a SQLite file, a second connection to the same file opened with
+  ``mode=ro``, so a read-only view cannot write by accident, else
+* nothing: routing is off and every query uses the primary.
+  ``DB_READ_ROUTING=1`` routes to a read-only connection to the primary
+  (``default_transaction_read_only``) instead; ``DB_READ_ROUTING=0``
+  turns routing off everywhere.
+
+A replica may lag behind the primary, so with ``DATABASE_READ_URL`` set, a
+browser whose request committed writes reads from the primary for the next
+``DB_READ_STICKY_SECONDS`` (default 5) and sees its own changes.
+"""
+import os
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+from flask import has_request_context, request, session as flask_session
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
+
+STICKY_SECONDS = float(os.environ.get('DB_READ_STICKY_SECONDS', 5))
+READ_ROUTE = 'db_read_route'
+WROTE = 'db_wrote'
+LAST_WRITE = '_db_write_at'
+
+
+def read_database_url(database_url):
+    """URL of the read engine, or None when routing is off"""
+    setting = os.environ.get('DB_READ_ROUTING', 'auto').strip().lower()
+    if setting in ('0', 'false', 'no', 'off'):
+        return None
+    if os.environ.get('DATABASE_READ_URL'):
+        url = os.environ['DATABASE_READ_URL']
+        return url.replace('postgres://', 'postgresql://', 1) if url.startswith('postgres://') else url
+    if database_url.startswith('sqlite:///'):
+        path = database_url.replace('sqlite:///', '', 1)
+        if not path or path == ':memory:':
+            return None
+        return f'sqlite:///file:{os.path.abspath(path)}?mode=ro&uri=true'
+    if setting in ('1', 'true', 'yes', 'on') and not database_url.startswith('sqlite'):
+        return database_url
+    return None
+
+
+def create_read_engine(database_url, pool_options):
+    """Engine for read-only views; None when routing is off"""
+    url = read_database_url(database_url)
+    if url is None:
+        return None
+    options = pool_options(url)
+    if url == database_url and url.startswith('postgresql'):
+        # Same server as the primary: make the connection refuse writes
+        options['connect_args'] = dict(options.get('connect_args', {}),
+                                       options='-c default_transaction_read_only=on')
+    return create_engine(url, **options)
+
+
+class RoutingSession(Session):
+    """Session that reads from ``read_engine`` while ``info[READ_ROUTE]`` is set"""
+
+    read_engine = None
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self.read_engine is not None and self.info.get(READ_ROUTE) and not self._flushing:
+            return self.read_engine
+        return super().get_bind(mapper=mapper, clause=clause, **kw)
+
+
+def _replica_lags():
+    return bool(os.environ.get('DATABASE_READ_URL')) and STICKY_SECONDS > 0
+
+
+def _recent_write():
+    return _replica_lags() and time.time() - flask_session.get(LAST_WRITE, 0) < STICKY_SECONDS
+
+
+@contextmanager
+def read_route():
+    """Send db_session's queries to the read engine inside the block, when a
+    @read_only view would"""
+    from database import db_session
+    session = db_session()
+    if session.read_engine is None or request.method not in ('GET', 'HEAD') or _recent_write():
+        yield
+        return
+    session.info[READ_ROUTE] = True
+    try:
+        yield
+    finally:
+        session.info.pop(READ_ROUTE, None)
+        # Hand the read connection back before after_request hooks run
+        if session.in_transaction() and not (session.new or session.dirty or session.deleted):
+            session.rollback()
+
+
+def read_only(view):
+    """Send the queries of a GET view to the read engine"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        with read_route():
+            return view(*args, **kwargs)
+    return wrapper
+
+
+@event.listens_for(Session, 'after_flush')
+def _mark_write(session, flush_context):
+    session.info[WROTE] = True
+
+
+@event.listens_for(Session, 'after_commit')
+def _remember_write(session):
+    if session.info.pop(WROTE, False) and _replica_lags() and has_request_context():
+        flask_session[LAST_WRITE] = time.time()
+
+
+@event.listens_for(Session, 'after_rollback')
+def _forget_write(session):
+    session.info.pop(WROTE, None)
@@ -1,6 +1,11 @@
+import os
 import threading
 import webview
 import socket
+
+# Writes from the in-process server threads queue instead of failing (see sqlite_tuning.py)
+os.environ.setdefault('SQLITE_SINGLE_WRITER', '1')
+
 from main import app
 
 def get_local_ip():
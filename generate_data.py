@@ -0,0 +1,437 @@
+"""Fill a database with realistic synthetic data for benchmarks.
+
+Usage:
+    python generate_data.py --rows 100000                       # instance/bench.db
+    python generate_data.py --rows 1000000 --database-url postgresql://...
+
+``--rows`` is the approximate total row count across all tables (10k to 1M is
+the intended range). Every model gets rows in proportions taken from a running
+business: customers, suppliers and inventory; quotations and invoices with
+their items; partial and full payments with the matching income records;
+stock-ins and FIFO stock-outs with cost layers, running costs and inventory
+quantities that reconcile; expenses; activities; journeys with fuel and
+mileage records; locations and pricing; custom fields on customers and items;
+the exchange rates file and a stock snapshot checkpoint from a year ago.
+Dates spread over the last two years.
+
+The target database must be empty (or pass ``--force`` to add to it). The same
+``--seed`` gives the same data, with dates relative to today.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from collections import defaultdict, deque
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_URL = f"sqlite:///{os.path.join(ROOT, 'instance', 'bench.db')}"
+
+# Share of --rows per table (items, transactions and payments follow from these)
+SHARES = {
+    'customers': 0.02,
+    'suppliers': 0.001,
+    'inventory': 0.005,
+    'activities': 0.02,
+    'quotations': 0.05,
+    'invoices': 0.05,
+    'expenses': 0.05,
+    'journeys': 0.02,
+    'locations': 0.002,
+    'pricing': 0.001,
+    'custom_fields': 0.01,
+}
+DAYS = 730
+BATCH = 5000
+
+FIRST_NAMES = ['Tendai', 'Rudo', 'Farai', 'Chipo', 'Tatenda', 'Nyasha', 'Kudzai', 'Tinashe', 'Rutendo', 'Blessing']
+LAST_NAMES = ['Moyo', 'Ncube', 'Dube', 'Sibanda', 'Chikwanha', 'Mutasa', 'Ndlovu', 'Banda', 'Phiri', 'Zhou']
+TOWNS = ['Harare', 'Bulawayo', 'Mutare', 'Gweru', 'Masvingo', 'Chinhoyi', 'Kwekwe', 'Kadoma', 'Marondera', 'Victoria Falls']
+PRODUCTS = [('Solar Panel', 'Solar', 120, 260), ('Inverter', 'Inverters', 300, 1400), ('Battery', 'Storage', 180, 1100),
+            ('Charge Controller', 'Controllers', 40, 220), ('Cable', 'Accessories', 2, 15), ('Mounting Kit', 'Accessories', 25, 90),
+            ('Geyser', 'Water Heating', 250, 700), ('Borehole Pump', 'Pumps', 350, 1600)]
+BRANDS = ['Jinko', 'Canadian Solar', 'Growatt', 'Deye', 'Pylontech', 'Victron', 'Kodak', 'Must']
+CUSTOM_FIELDS = {
+    'customer': [('Roof type', 'text', ('IBR', 'Tile', 'Flat concrete', 'Thatch')),
+                 ('Supply', 'text', ('ZESA', 'Off-grid', 'Generator'))],
+    'inventory': [('Warranty months', 'number', ('12', '24', '60', '120')),
+                  ('Rated power W', 'number', ('100', '330', '450', '3000', '5000'))],
+}
+EXPENSES = ['Fuel', 'Car Maintenance', 'Rent', 'Services', 'Employee Payments', 'Utilities', 'Equipment Purchase']
+
+
+def _name(rng):
+    return f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}'
+
+
+def _date(rng, start, days=DAYS):
+    return start + timedelta(days=rng.random() * days, seconds=rng.randint(0, 86399))
+
+
+class Generator:
+    def __init__(self, session, rows, seed, out=print):
+        self.session = session
+        self.rng = random.Random(seed)
+        self.counts = {table: max(5, int(rows * share)) for table, share in SHARES.items()}
+        self.start = datetime.now() - timedelta(days=DAYS)
+        self.inserted = defaultdict(int)
+        self.out = out
+
+    def insert(self, model, rows, returning=False):
+        """Bulk insert in batches; with returning=True, the new ids in row order"""
+        from sqlalchemy import insert
+
+        ids = []
+        for i in range(0, len(rows), BATCH):
+            chunk = rows[i:i + BATCH]
+            if returning:
+                result = self.session.execute(insert(model).returning(model.id, sort_by_parameter_order=True), chunk)
+                ids.extend(result.scalars())
+            else:
+                self.session.execute(insert(model), chunk)
+        self.inserted[model.__tablename__] += len(rows)
+        return ids
+
+    def run(self):
+        started = time.perf_counter()
+        self.reference_data()
+        self.parties_and_stock_items()
+        self.sales()
+        self.stock_ledger()
+        self.expenses()
+        self.field_work()
+        self.custom_fields()
+        self.rates_and_snapshots()
+        self.session.commit()
+        total = sum(self.inserted.values())
+        for table, count in sorted(self.inserted.items()):
+            self.out(f'  {table:22} {count:>9,}')
+        self.out(f'{total:,} rows in {time.perf_counter() - started:.1f} s')
+
+    def reference_data(self):
+        from models import ActivityType, FinancialCategory, FinancialType, Location, LocationCategory, Pricing
+
+        rng = self.rng
+        self.activity_type_ids = self.insert(ActivityType, [
+            {'name': name, 'description': f'{name} work', 'is_active': True}
+            for name in ('Installation', 'Site Survey', 'Maintenance', 'Repair', 'Consultation', 'Borehole Drilling')
+        ], returning=True)
+        self.insert(FinancialCategory, [{'name': 'Sales', 'type': FinancialType.INCOME, 'is_active': True}] + [
+            {'name': name, 'type': FinancialType.EXPENSE, 'is_active': True} for name in EXPENSES
+        ])
+        self.insert(Location, [
+            {'name': f'{rng.choice(TOWNS)} site {i}', 'address': f'{rng.randint(1, 999)} {rng.choice(LAST_NAMES)} Rd',
+             'latitude': -17.8 + rng.uniform(-3, 3), 'longitude': 31.0 + rng.uniform(-3, 3),
+             'category': rng.choice(list(LocationCategory)), 'visit_frequency': rng.randint(0, 40),
+             'last_visit': _date(rng, self.start)}
+            for i in range(self.counts['locations'])
+        ])
+        self.insert(Pricing, [
+            {'item_type': 'Service', 'item_name': f'{rng.choice(("Installation", "Call-out", "Labour"))} tier {i}',
+             'price': round(rng.uniform(20, 400), 2), 'unit': rng.choice(('job', 'hour', 'km')),
+             'effective_date': _date(rng, self.start)}
+            for i in range(self.counts['pricing'])
+        ])
+
+    def parties_and_stock_items(self):
+        from models import Customer, Supplier, Inventory, Currency
+
+        rng = self.rng
+        rows = []
+        for i in range(self.counts['customers']):
+            name = _name(rng)
+            rows.append({'name': name, 'identification_number': f'{rng.randint(10, 99)}-{1000000 + i}X{rng.randint(10, 99)}',
+                         'citizenship': 'Zimbabwean', 'address': f'{rng.randint(1, 999)} {rng.choice(TOWNS)}',
+                         'phone': f'+26377{rng.randint(1000000, 9999999)}', 'email': f'customer{i}@example.com',
+                         'date_created': _date(rng, self.start)})
+        self.customers = list(zip(self.insert(Customer, rows, returning=True), (row['name'] for row in rows)))
+
+        supplier_ids = self.insert(Supplier, [
+            {'name': f'{rng.choice(BRANDS)} Distributors {i}', 'contact_person': _name(rng),
+             'phone': f'+26371{rng.randint(1000000, 9999999)}', 'email': f'supplier{i}@example.com',
+             'address': rng.choice(TOWNS), 'payment_terms': rng.choice(('Cash', '30 days', '60 days')),
+             'currency': rng.choice([Currency.USD, Currency.USD, Currency.RAND])}
+            for i in range(self.counts['suppliers'])
+        ], returning=True)
+
+        rows = []
+        for i in range(self.counts['inventory']):
+            product, category, low, high = rng.choice(PRODUCTS)
+            rows.append({'name': f'{product} {rng.choice(BRANDS)} {i}', 'brand': rng.choice(BRANDS),
+                         'category': category, 'specifications': f'Model {rng.randint(100, 999)}',
+                         'quantity': 0, 'unit_price': round(rng.uniform(low, high), 2),
+                         'supplier_id': rng.choice(supplier_ids), 'minimum_stock_level': rng.randint(2, 10)})
+        ids = self.insert(Inventory, rows, returning=True)
+        self.items = [(item_id, row['name'], row['unit_price']) for item_id, row in zip(ids, rows)]
+
+    def _lines(self):
+        rng = self.rng
+        lines = []
+        for _ in range(rng.randint(1, 5)):
+            item_id, name, price = rng.choice(self.items)
+            lines.append((item_id, name, rng.randint(1, 4), round(price * rng.uniform(1.15, 1.4), 2)))
+        return lines
+
+    def sales(self):
+        from models import (quotation, quotationItem, Invoice, InvoiceItem, InvoiceStatus, Payment, PaymentType,
+                            FinancialRecord, FinancialType)
+
+        rng = self.rng
+        quotation_rows, quotation_lines = [], []
+        for _ in range(self.counts['quotations']):
+            customer_id, _name_ = rng.choice(self.customers)
+            lines = self._lines()
+            created = _date(rng, self.start)
+            quotation_rows.append({'customer_id': customer_id, 'total_amount': round(sum(q * p for _, _, q, p in lines), 2),
+                                   'status': rng.choice(('PENDING', 'PENDING', 'PAID', 'CANCELLED')),
+                                   'due_date': created + timedelta(days=14), 'date_created': created})
+            quotation_lines.append(lines)
+        quotation_ids = self.insert(quotation, quotation_rows, returning=True)
+        self.insert(quotationItem, [
+            {'quotation_id': qid, 'inventory_id': item_id, 'quantity': qty, 'unit_price': price,
+             'description': name, 'item_code': f'INV-{item_id}'}
+            for qid, lines in zip(quotation_ids, quotation_lines) for item_id, name, qty, price in lines
+        ])
+
+        invoice_rows, invoice_lines, invoice_payments = [], [], []
+        for _ in range(self.counts['invoices']):
+            customer_id, customer_name = rng.choice(self.customers)
+            lines = self._lines()
+            created = _date(rng, self.start + timedelta(days=30), DAYS - 30)
+            total = round(sum(q * p for _, _, q, p in lines), 2)
+            # Most invoices get paid in one or two instalments; some stay open
+            outcome = rng.random()
+            if outcome < 0.6:
+                amounts = [total]
+            elif outcome < 0.85:
+                first = round(total * rng.uniform(0.3, 0.7), 2)
+                amounts = [first, round(total - first, 2)] if rng.random() < 0.5 else [first]
+            else:
+                amounts = []
+            paid = round(sum(amounts), 2)
+            status = InvoiceStatus.PAID if paid >= total else InvoiceStatus.PARTIAL if paid else rng.choice(
+                [InvoiceStatus.SENT, InvoiceStatus.DRAFT, InvoiceStatus.OVERDUE])
+            invoice_rows.append({'customer_id': customer_id, 'total_amount': total, 'paid_amount': paid,
+                                 'balance_due': round(total - paid, 2), 'status': status,
+                                 'due_date': created + timedelta(days=30), 'date_created': created})
+            invoice_lines.append((created, customer_name, lines))
+            invoice_payments.append((created, customer_name, amounts))
+        invoice_ids = self.insert(Invoice, invoice_rows, returning=True)
+
+        self.insert(InvoiceItem, [
+            {'invoice_id': iid, 'inventory_id': item_id, 'item_code': f'INV-{item_id}', 'description': name,
+             'quantity': qty, 'unit_price': price, 'amount': round(qty * price, 2)}
+            for iid, (_, _, lines) in zip(invoice_ids, invoice_lines) for item_id, name, qty, price in lines
+        ])
+        self.sold = sorted((created, iid, customer_name, item_id, qty, price)
+                           for iid, (created, customer_name, lines) in zip(invoice_ids, invoice_lines)
+                           for item_id, _, qty, price in lines)
+
+        payments, income = [], []
+        for iid, (created, customer_name, amounts) in zip(invoice_ids, invoice_payments):
+            for n, amount in enumerate(amounts):
+                when = created + timedelta(days=n * rng.randint(3, 30), hours=rng.randint(0, 8))
+                method = rng.choice(list(PaymentType))
+                payments.append({'invoice_id': iid, 'amount': amount, 'payment_date': when, 'payment_method': method,
+                                 'payer_name': customer_name, 'reference_number': f'REF{rng.randint(100000, 999999)}'})
+                income.append({'type': FinancialType.INCOME, 'category': 'Sales', 'description': f'Payment for Invoice #{iid}',
+                               'amount': amount, 'date': when, 'reference_id': iid,
+                               'notes': f'Payer: {customer_name} | Method: {method.value}'})
+        self.insert(Payment, payments)
+        self.insert(FinancialRecord, income)
+
+    def stock_ledger(self):
+        """Receipts ahead of demand, then FIFO stock-outs for every invoiced line"""
+        from sqlalchemy import bindparam
+        from models import (StockTransaction, TransactionType, StockChangeReason, CostLayer, InventoryCost, Inventory)
+
+        rng = self.rng
+        demand = defaultdict(int)
+        for _, _, _, item_id, qty, _ in self.sold:
+            demand[item_id] += qty
+
+        receipts = []
+        for item_id, _, price in self.items:
+            needed = demand[item_id] + rng.randint(0, 20)
+            lots = max(1, min(6, needed // 50 + 1))
+            for lot in range(lots):
+                quantity = needed // lots + (needed % lots if lot == 0 else 0)
+                if quantity <= 0:
+                    continue
+                cost = round(price * rng.uniform(0.6, 0.85), 2)
+                received = self.start + timedelta(days=lot * 30 / lots, hours=rng.randint(0, 23))
+                receipts.append((item_id, quantity, cost, received))
+
+        receipt_ids = self.insert(StockTransaction, [
+            {'inventory_id': item_id, 'transaction_type': TransactionType.STOCK_IN, 'quantity': quantity,
+             'unit_price': cost, 'total_value': round(quantity * cost, 2), 'reference_type': 'receipt',
+             'notes': 'Generated receipt', 'created_by': 'generate_data', 'date_created': received}
+            for item_id, quantity, cost, received in receipts
+        ], returning=True)
+        layer_ids = self.insert(CostLayer, [
+            {'inventory_id': item_id, 'stock_transaction_id': txn_id, 'unit_cost': cost,
+             'quantity_received': quantity, 'quantity_remaining': quantity, 'date_received': received}
+            for txn_id, (item_id, quantity, cost, received) in zip(receipt_ids, receipts)
+        ], returning=True)
+
+        open_layers = defaultdict(deque)
+        for layer_id, (item_id, quantity, cost, _) in zip(layer_ids, receipts):
+            open_layers[item_id].append([layer_id, quantity, cost])
+
+        stock_outs = []
+        for created, invoice_id, customer_name, item_id, qty, price in self.sold:
+            remaining, cost_total = qty, 0.0
+            layers = open_layers[item_id]
+            while remaining:
+                layer = layers[0]
+                take = min(remaining, layer[1])
+                layer[1] -= take
+                cost_total += take * layer[2]
+                remaining -= take
+                if not layer[1]:
+                    layers.popleft()
+            # Stock-outs are stored negative, as inventory_service.remove_stock does
+            stock_outs.append({'inventory_id': item_id, 'transaction_type': TransactionType.STOCK_OUT, 'quantity': -qty,
+                               'unit_price': round(cost_total / qty, 2), 'total_value': -round(cost_total, 2),
+                               'reason': StockChangeReason.SOLD_TO_CUSTOMER, 'reference_id': invoice_id,
+                               'reference_type': 'invoice', 'customer_name': customer_name,
+                               'created_by': 'generate_data', 'date_created': created})
+        self.insert(StockTransaction, stock_outs)
+
+        # Write back what FIFO left in each layer
+        received = {layer_id: quantity for layer_id, (_, quantity, _, _) in zip(layer_ids, receipts)}
+        left = dict.fromkeys(layer_ids, 0)
+        for layers in open_layers.values():
+            for layer_id, remaining, _ in layers:
+                left[layer_id] = remaining
+        connection = self.session.connection()
+        layers_table = CostLayer.__table__
+        changed = [{'layer_id': layer_id, 'remaining': remaining}
+                   for layer_id, remaining in left.items() if remaining != received[layer_id]]
+        if changed:
+            connection.execute(layers_table.update().where(layers_table.c.id == bindparam('layer_id'))
+                               .values(quantity_remaining=bindparam('remaining')), changed)
+
+        on_hand = [{'inventory_id': item_id, 'quantity': sum(left for _, left, _ in layers),
+                    'total_cost': round(sum(left * cost for _, left, cost in layers), 2)}
+                   for item_id, layers in open_layers.items()]
+        self.insert(InventoryCost, on_hand)
+        items_table = Inventory.__table__
+        connection.execute(items_table.update().where(items_table.c.id == bindparam('item_id'))
+                           .values(quantity=bindparam('on_hand')),
+                           [{'item_id': row['inventory_id'], 'on_hand': row['quantity']} for row in on_hand])
+
+    def expenses(self):
+        from models import FinancialRecord, FinancialType
+
+        rng = self.rng
+        self.insert(FinancialRecord, [
+            {'type': FinancialType.EXPENSE, 'category': category, 'description': f'{category} payment',
+             'amount': round(rng.uniform(10, 1500), 2), 'date': _date(rng, self.start),
+             'receipt_number': f'R{rng.randint(10000, 99999)}', 'vendor_supplier': f'{rng.choice(TOWNS)} {category}'}
+            for category in (rng.choice(EXPENSES) for _ in range(self.counts['expenses']))
+        ])
+
+    def field_work(self):
+        from models import Activity, ActivityStatusEnum, JourneyRecord, FuelRecord, FuelType, MileageRecord
+
+        rng = self.rng
+        rows = []
+        for _ in range(self.counts['activities']):
+            when = _date(rng, self.start)
+            hours = round(rng.uniform(1, 10), 1)
+            labor, material = round(hours * 15, 2), round(rng.uniform(0, 800), 2)
+            status = rng.choice(list(ActivityStatusEnum))
+            rows.append({'customer_id': rng.choice(self.customers)[0], 'activity_type_id': rng.choice(self.activity_type_ids),
+                         'description': 'Generated job', 'status': status, 'date': when,
+                         'completed_date': when + timedelta(hours=hours) if status == ActivityStatusEnum.COMPLETED else None,
+                         'technician': _name(rng), 'labor_hours': hours, 'labor_cost': labor,
+                         'material_cost': material, 'total_cost': labor + material})
+        activity_ids = self.insert(Activity, rows, returning=True)
+
+        journeys = []
+        for _ in range(self.counts['journeys']):
+            start = _date(rng, self.start)
+            start_town, end_town = rng.sample(TOWNS, 2)
+            journeys.append({'activity_id': rng.choice(activity_ids), 'vehicle_id': f'V{rng.randint(1, 12)}',
+                             'driver': _name(rng), 'start_location': start_town, 'end_location': end_town,
+                             'start_time': start, 'end_time': start + timedelta(hours=rng.randint(1, 9)),
+                             'purpose': 'Site visit', 'status': 'COMPLETED',
+                             'total_distance': round(rng.uniform(10, 600), 1), 'total_fuel_cost': 0.0})
+        journey_ids = self.insert(JourneyRecord, journeys, returning=True)
+
+        fuel, mileage = [], []
+        odometer = defaultdict(lambda: rng.uniform(20000, 150000))
+        for journey_id, journey in zip(journey_ids, journeys):
+            start = odometer[journey['vehicle_id']]
+            odometer[journey['vehicle_id']] = start + journey['total_distance']
+            mileage.append({'journey_id': journey_id, 'vehicle_id': journey['vehicle_id'],
+                            'start_location': journey['start_location'], 'end_location': journey['end_location'],
+                            'distance_km': journey['total_distance'], 'start_odometer': round(start, 1),
+                            'end_odometer': round(start + journey['total_distance'], 1), 'date': journey['start_time']})
+            if rng.random() < 0.7:
+                litres, price = round(journey['total_distance'] / rng.uniform(7, 12), 1), round(rng.uniform(1.4, 1.7), 2)
+                fuel.append({'journey_id': journey_id, 'vehicle_id': journey['vehicle_id'],
+                             'fuel_type': rng.choice([FuelType.DIESEL, FuelType.PETROL]), 'quantity_liters': litres,
+                             'price_per_liter': price, 'total_cost': round(litres * price, 2),
+                             'fuel_station': f'{journey["start_location"]} Service Station', 'date': journey['start_time']})
+        self.insert(MileageRecord, mileage)
+        self.insert(FuelRecord, fuel)
+
+    def custom_fields(self):
+        from models import CustomField
+
+        rng = self.rng
+        entities = {'customer': [customer_id for customer_id, _ in self.customers],
+                    'inventory': [item_id for item_id, _, _ in self.items]}
+        rows, seen = [], set()
+        for _ in range(self.counts['custom_fields']):
+            entity_type = rng.choice(list(CUSTOM_FIELDS))
+            entity_id = rng.choice(entities[entity_type])
+            name, field_type, values = rng.choice(CUSTOM_FIELDS[entity_type])
+            if (entity_type, entity_id, name) in seen:
+                continue
+            seen.add((entity_type, entity_id, name))
+            rows.append({'entity_type': entity_type, 'entity_id': entity_id, 'field_name': name,
+                         'field_value': rng.choice(values), 'field_type': field_type,
+                         'date_created': _date(rng, self.start)})
+        self.insert(CustomField, rows)
+
+    def rates_and_snapshots(self):
+        """Exchange rates from the rates file, and a ledger checkpoint a year back
+        so "stock as of" queries start from a snapshot like they do in production"""
+        from currency_converter import load_rates_file
+        from stock_ledger import create_checkpoint
+
+        self.inserted['exchange_rates'] += load_rates_file(self.session)
+        self.inserted['stock_snapshots'] += create_checkpoint(self.session, self.start + timedelta(days=DAYS // 2))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Synthetic data generator')
+    parser.add_argument('--rows', type=int, default=100000, help='approximate total rows (10k-1M)')
+    parser.add_argument('--database-url', default=os.environ.get('BENCH_DATABASE_URL', DEFAULT_URL))
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--force', action='store_true', help='add to a database that already has data')
+    args = parser.parse_args()
+
+    # database.py reads DATABASE_URL at import time
+    os.environ['DATABASE_URL'] = args.database_url
+    sys.path.append(ROOT)
+    from database import db_session, init_db
+    from models import Customer
+    from cache import cache
+
+    init_db()
+    if db_session.query(Customer.id).first() is not None and not args.force:
+        sys.exit(f'{args.database_url} already has data; use --force to add to it')
+
+    print(f'Generating about {args.rows:,} rows into {args.database_url}')
+    Generator(db_session, args.rows, args.seed).run()
+    # Counts and fragments cached from the old data are stale now
+    cache.clear()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,145 @@
+"""Bulk goods-received processing for supplier deliveries.
+
+A delivery is a list of (item, quantity, unit_price) lines coming from a
+CSV/XLSX upload or a JSON body. Every line is validated before anything is
+written; if all lines are valid the whole delivery is applied in one
+transaction by inventory_service.bulk_add_stock().
+"""
+import io
+import math
+
+import pandas as pd
+
+from models import Inventory
+
+ITEM_COLUMNS = ('item_id', 'item', 'name', 'item_code')
+
+
+def read_upload(file_storage):
+    """Turn an uploaded CSV/XLSX file into a list of line dicts"""
+    filename = (file_storage.filename or '').lower()
+    data = io.BytesIO(file_storage.read())
+    if filename.endswith(('.xlsx', '.xls')):
+        frame = pd.read_excel(data)
+    elif filename.endswith('.csv'):
+        frame = pd.read_csv(data)
+    else:
+        raise ValueError('Unsupported file type. Upload a .csv or .xlsx file.')
+    frame.columns = [str(col).strip().lower().replace(' ', '_') for col in frame.columns]
+    frame = frame.astype(object).where(frame.notna(), None)
+    return frame.to_dict(orient='records')
+
+
+def read_json(payload):
+    """Accept either a bare list of lines or {"lines": [...]}"""
+    if isinstance(payload, dict):
+        payload = payload.get('lines')
+    if not isinstance(payload, list):
+        raise ValueError('Expected a list of lines or {"lines": [...]}')
+    return [{str(k).strip().lower(): v for k, v in line.items()} if isinstance(line, dict) else {}
+            for line in payload]
+
+
+def _item_reference(line):
+    for column in ITEM_COLUMNS:
+        value = line.get(column)
+        if value is not None and str(value).strip() != '':
+            return column, str(value).strip()
+    return None, None
+
+
+def _item_id(column, value):
+    """Inventory id a line refers to, or None when it names the item instead.
+    Raises ValueError when an id is not a whole number."""
+    if column != 'item_id' and not (column == 'item' and value.replace('.', '', 1).isdigit()):
+        return None
+    number = float(value)
+    if not math.isfinite(number) or number != int(number):
+        raise ValueError
+    return int(number)
+
+
+def validate_lines(session, lines):
+    """Validate every line up front.
+
+    Returns (valid, errors): ``valid`` is a list of dicts ready for
+    bulk_add_stock, ``errors`` a list of {'line', 'error'} entries. Line
+    numbers are 1-based to match the spreadsheet rows users see.
+    """
+    references = [_item_reference(line) for line in lines]
+    item_ids, bad_ids = [], set()
+    for number, (column, value) in enumerate(references, start=1):
+        try:
+            item_ids.append(_item_id(column, value))
+        except ValueError:
+            item_ids.append(None)
+            bad_ids.add(number)
+
+    # Resolve every referenced item with two queries instead of one per line
+    ids = {item_id for item_id in item_ids if item_id is not None}
+    names = {value for column, value in references if column in ('item', 'name')}
+    codes = {value for column, value in references if column == 'item_code'}
+
+    by_id = {}
+    if ids:
+        by_id = {row.id: row for row in session.query(Inventory.id, Inventory.name)
+                 .filter(Inventory.id.in_(ids))}
+    by_name, by_code = {}, {}
+    if names or codes:
+        query = session.query(Inventory.id, Inventory.name, Inventory.specifications).filter(
+            Inventory.name.in_(names) | Inventory.specifications.in_(codes))
+        for row in query:
+            by_name.setdefault(row.name, []).append(row)
+            if row.specifications:
+                by_code.setdefault(row.specifications, []).append(row)
+
+    valid, errors = [], []
+    for number, (line, (column, value), item_id) in enumerate(zip(lines, references, item_ids), start=1):
+        if column is None:
+            errors.append({'line': number, 'error': 'Missing item (item_id, item, name or item_code)'})
+            continue
+        if number in bad_ids:
+            errors.append({'line': number, 'error': f'Invalid item_id {value!r}'})
+            continue
+
+        matches = []
+        if item_id is not None:
+            row = by_id.get(item_id)
+            matches = [row] if row else []
+        elif column == 'item_code':
+            matches = by_code.get(value, [])
+        else:
+            matches = by_name.get(value, [])
+
+        if not matches:
+            errors.append({'line': number, 'error': f'Item {value!r} not found'})
+            continue
+        if len(matches) > 1:
+            errors.append({'line': number, 'error': f'Item {value!r} is ambiguous; use item_id'})
+            continue
+
+        try:
+            quantity = float(line.get('quantity'))
+            if not math.isfinite(quantity) or quantity != int(quantity) or quantity <= 0:
+                raise ValueError
+            quantity = int(quantity)
+        except (TypeError, ValueError):
+            errors.append({'line': number, 'error': f"Invalid quantity {line.get('quantity')!r}"})
+            continue
+
+        try:
+            unit_price = float(line.get('unit_price'))
+            if not math.isfinite(unit_price) or unit_price < 0:
+                raise ValueError
+        except (TypeError, ValueError):
+            errors.append({'line': number, 'error': f"Invalid unit_price {line.get('unit_price')!r}"})
+            continue
+
+        valid.append({
+            'line': number,
+            'inventory_id': matches[0].id,
+            'name': matches[0].name,
+            'quantity': quantity,
+            'unit_price': unit_price
+        })
+    return valid, errors
@@ -0,0 +1,118 @@
+"""Gunicorn settings, picked up automatically from the working directory.
+
+    gunicorn main:app
+
+Worker model (``GUNICORN_WORKER_CLASS``):
+- ``gthread`` (default): a few processes, each with a pool of threads. A slow
+  PDF or report only ties up one thread.
+- ``gevent``: one greenlet per request; needs ``pip install gevent`` (and
+  ``psycogreen`` for cooperative Postgres I/O). Falls back to gthread if
+  gevent is missing. The app is loaded in each worker, after gevent has
+  patched the standard library, rather than preloaded in the master.
+- ``sync``: gunicorn's default, one request per process at a time.
+
+The worker count is ``2 * CPUs + 1``, capped by available memory
+(``GUNICORN_WORKER_MEMORY_MB`` per worker). ``WEB_CONCURRENCY`` overrides it.
+"""
+import multiprocessing
+import os
+
+PER_WORKER_MB = int(os.environ.get('GUNICORN_WORKER_MEMORY_MB', 150))
+
+
+def _memory_limit_mb():
+    """Container memory limit (cgroup v2/v1), else total RAM; None if unknown"""
+    for path in ('/sys/fs/cgroup/memory.max', '/sys/fs/cgroup/memory/memory.limit_in_bytes'):
+        try:
+            with open(path) as f:
+                value = f.read().strip()
+            if value.isdigit() and int(value) < 1 << 60:
+                return int(value) // (1024 * 1024)
+        except OSError:
+            pass
+    try:
+        with open('/proc/meminfo') as f:
+            for line in f:
+                if line.startswith('MemTotal:'):
+                    return int(line.split()[1]) // 1024
+    except OSError:
+        pass
+    return None
+
+
+def _worker_class():
+    name = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread').lower()
+    if name == 'gevent':
+        try:
+            import gevent  # noqa: F401
+        except ImportError:
+            print("gevent is not installed; using gthread workers")
+            return 'gthread'
+    if name not in ('gthread', 'gevent', 'sync'):
+        print(f"Unknown GUNICORN_WORKER_CLASS '{name}'; using gthread workers")
+        return 'gthread'
+    return name
+
+
+def _workers():
+    if os.environ.get('WEB_CONCURRENCY'):
+        return max(1, int(os.environ['WEB_CONCURRENCY']))
+    count = multiprocessing.cpu_count() * 2 + 1
+    memory = _memory_limit_mb()
+    if memory:
+        count = min(count, memory // PER_WORKER_MB)
+    return max(1, count)
+
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+worker_class = _worker_class()
+workers = _workers()
+threads = int(os.environ.get('GUNICORN_THREADS', 4)) if worker_class == 'gthread' else 1
+worker_connections = int(os.environ.get('GUNICORN_WORKER_CONNECTIONS', 100))
+
+# Build the app (imports, table checks, rate load) once in the master, then fork.
+# Not for gevent: locks and connections created during preload would predate the
+# worker's monkey-patching and block the whole worker instead of one greenlet
+preload_app = worker_class != 'gevent'
+
+# Reuse browser connections between page, asset and chart requests
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+# PDF and report generation can take a while on the free plan
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 60))
+graceful_timeout = 30
+
+# Recycle workers now and then so slow leaks (pandas, ReportLab) never build up;
+# the jitter stops them all restarting at once
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 1000))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', 100))
+
+# Heartbeat files on tmpfs, so a slow disk can't make workers look dead
+if os.path.isdir('/dev/shm'):
+    worker_tmp_dir = '/dev/shm'
+
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG') or None
+errorlog = '-'
+
+
+def post_fork(server, worker):
+    # Connections opened by the master during preload must not be shared
+    # between processes; each worker starts with an empty pool. Without
+    # preload the worker has not imported the app yet, and must not before
+    # gevent patches it
+    if preload_app:
+        from database import engine, read_engine
+        engine.dispose(close=False)
+        if read_engine is not None:
+            read_engine.dispose(close=False)
+
+    if worker_class == 'gevent':
+        try:
+            from psycogreen.gevent import patch_psycopg
+            patch_psycopg()
+        except ImportError:
+            pass
+
+
+def when_ready(server):
+    server.log.info(f"{workers} {worker_class} workers"
+                    + (f" x {threads} threads" if worker_class == 'gthread' else ''))
@@ -0,0 +1,212 @@
+"""Inventory movement service.
+
+Every change to ``Inventory.quantity`` goes through a single conditional
+UPDATE (``quantity = quantity - :q WHERE id = :id AND quantity >= :q``) so
+concurrent gunicorn workers can never oversell or lose an update. The matching
+``StockTransaction`` is added to the same session and is committed together
+with the quantity change by the caller.
+
+Receipts open cost lots and stock-outs are costed from them (see cost_layers),
+so STOCK_OUT rows carry the cost of goods sold rather than a selling price.
+"""
+from datetime import datetime
+
+from sqlalchemy import select, update, insert, func, bindparam
+
+import cost_layers
+import low_stock
+from models import Inventory, StockTransaction, TransactionType, Currency
+from rate_history import get_rate_history
+
+
+class InsufficientStockError(Exception):
+    """Raised when a stock-out would take an item below zero."""
+
+    def __init__(self, item_name, available, requested):
+        self.item_name = item_name
+        self.available = available
+        self.requested = requested
+        super().__init__(f'Insufficient stock for {item_name}. Available: {available}, Required: {requested}')
+
+
+class ItemNotFoundError(Exception):
+    """Raised when a movement references an inventory item that does not exist."""
+
+
+def _refresh(session, inventory_id):
+    """Reload the item so the caller sees the quantity written by the UPDATE"""
+    item = session.get(Inventory, inventory_id, populate_existing=True)
+    if item is None:
+        raise ItemNotFoundError(f'Inventory item {inventory_id} not found')
+    return item
+
+
+def add_stock(session, inventory_id, quantity, unit_price=None, update_price=False, reason=None,
+              reference_id=None, reference_type=None, notes=None):
+    """Atomically add stock to an item and record a STOCK_IN transaction.
+
+    ``unit_price`` is the unit cost of the receipt; when omitted the item's
+    current average cost is used (e.g. for returns).
+    """
+    values = {'quantity': func.coalesce(Inventory.quantity, 0) + quantity}
+    if update_price and unit_price is not None:
+        values['unit_price'] = unit_price
+
+    result = session.execute(
+        update(Inventory)
+        .where(Inventory.id == inventory_id)
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount != 1:
+        raise ItemNotFoundError(f'Inventory item {inventory_id} not found')
+
+    item = _refresh(session, inventory_id)
+    fallback_cost = item.unit_price or 0.0
+    if unit_price is None:
+        unit_price = cost_layers.average_cost(session, inventory_id, fallback_cost)
+
+    stock_transaction = StockTransaction(
+        inventory_id=inventory_id,
+        transaction_type=TransactionType.STOCK_IN,
+        quantity=quantity,
+        unit_price=unit_price,
+        total_value=quantity * unit_price,
+        reason=reason,
+        reference_id=reference_id,
+        reference_type=reference_type,
+        notes=notes
+    )
+    session.add(stock_transaction)
+    cost_layers.receive(session, inventory_id, quantity, unit_price,
+                        on_hand_before=(item.quantity or 0) - quantity,
+                        fallback_cost=fallback_cost,
+                        stock_transaction=stock_transaction)
+    return item
+
+
+def remove_stock(session, inventory_id, quantity, reason=None, reference_id=None,
+                 reference_type=None, customer_name=None, notes=None):
+    """Atomically remove stock from an item and record a STOCK_OUT transaction
+    valued at its cost of goods sold.
+
+    Raises InsufficientStockError without touching the row when fewer than
+    ``quantity`` units are on hand at the moment the UPDATE runs.
+    """
+    result = session.execute(
+        update(Inventory)
+        .where(Inventory.id == inventory_id, Inventory.quantity >= quantity)
+        .values(quantity=Inventory.quantity - quantity)
+        .execution_options(synchronize_session=False)
+    )
+    item = _refresh(session, inventory_id)
+    if result.rowcount != 1:
+        raise InsufficientStockError(item.name, item.quantity or 0, quantity)
+
+    cogs = cost_layers.consume(session, inventory_id, quantity,
+                               on_hand_before=(item.quantity or 0) + quantity,
+                               fallback_cost=item.unit_price or 0.0)
+
+    session.add(StockTransaction(
+        inventory_id=inventory_id,
+        transaction_type=TransactionType.STOCK_OUT,
+        quantity=-quantity,
+        unit_price=cogs / quantity,
+        total_value=-cogs,
+        reason=reason,
+        reference_id=reference_id,
+        reference_type=reference_type,
+        customer_name=customer_name,
+        notes=notes
+    ))
+    low_stock.note_movement(session, item, (item.quantity or 0) + quantity)
+    return item
+
+
+def adjust_stock(session, inventory_id, new_quantity, notes=None):
+    """Set an item's quantity from a manual count, recording the difference as
+    an ADJUSTMENT transaction so the stock ledger stays in step"""
+    current = session.execute(
+        select(Inventory.quantity).where(Inventory.id == inventory_id).with_for_update()
+    ).scalar_one_or_none()
+    delta = new_quantity - (current or 0)
+    if delta == 0:
+        return _refresh(session, inventory_id)
+
+    session.execute(
+        update(Inventory)
+        .where(Inventory.id == inventory_id)
+        .values(quantity=func.coalesce(Inventory.quantity, 0) + delta)
+        .execution_options(synchronize_session=False)
+    )
+    item = _refresh(session, inventory_id)
+    fallback_cost = item.unit_price or 0.0
+    on_hand_before = (item.quantity or 0) - delta
+
+    stock_transaction = StockTransaction(
+        inventory_id=inventory_id,
+        transaction_type=TransactionType.ADJUSTMENT,
+        quantity=delta,
+        notes=notes
+    )
+    if delta > 0:
+        unit_cost = cost_layers.average_cost(session, inventory_id, fallback_cost)
+        cost_layers.receive(session, inventory_id, delta, unit_cost, on_hand_before, fallback_cost,
+                            stock_transaction=stock_transaction)
+        value = delta * unit_cost
+    else:
+        value = -cost_layers.consume(session, inventory_id, -delta, on_hand_before, fallback_cost)
+        low_stock.note_movement(session, item, on_hand_before)
+    stock_transaction.unit_price = value / delta
+    stock_transaction.total_value = value
+    session.add(stock_transaction)
+    return item
+
+
+def bulk_add_stock(session, lines, reference_id=None, reference_type='goods_received', notes=None,
+                   currency=None):
+    """Receive many lines at once with two executemany statements.
+
+    ``lines`` are dicts with inventory_id, quantity and unit_price. The
+    quantity increments and the STOCK_IN rows are written in the caller's
+    transaction, so a failure rolls back the whole delivery.
+
+    ``currency`` is the currency the prices are quoted in (the supplier's).
+    The STOCK_IN rows keep the quoted amounts and their currency; cost lots
+    and Inventory.unit_price get the USD cost at today's rate.
+    """
+    if not lines:
+        return 0
+
+    currency = currency or Currency.USD
+    rate = get_rate_history().rate_on(currency, datetime.utcnow())
+    quoted = lines
+    lines = [dict(line, unit_price=line['unit_price'] * rate) for line in quoted]
+
+    cost_layers.bulk_receive(session, lines)
+
+    inventory = Inventory.__table__
+    session.execute(
+        inventory.update()
+        .where(inventory.c.id == bindparam('b_id'))
+        .values(quantity=func.coalesce(inventory.c.quantity, 0) + bindparam('b_quantity'),
+                unit_price=bindparam('b_unit_price'),
+                date_updated=bindparam('b_now')),
+        [{'b_id': line['inventory_id'], 'b_quantity': line['quantity'],
+          'b_unit_price': line['unit_price'], 'b_now': datetime.utcnow()} for line in lines]
+    )
+    session.execute(
+        insert(StockTransaction.__table__),
+        [{
+            'inventory_id': line['inventory_id'],
+            'transaction_type': TransactionType.STOCK_IN,
+            'quantity': line['quantity'],
+            'unit_price': line['unit_price'],
+            'total_value': line['quantity'] * line['unit_price'],
+            'currency': currency,
+            'reference_id': reference_id,
+            'reference_type': reference_type,
+            'notes': notes
+        } for line in quoted]
+    )
+    return len(lines)
@@ -0,0 +1,227 @@
+"""Compare gunicorn worker models under concurrent load.
+
+For each mode it starts ``gunicorn -c gunicorn.conf.py main:app`` against a
+freshly seeded throwaway SQLite database, runs concurrent clients against a
+mix of pages, PDFs and reports for a fixed time, and prints throughput and
+latency percentiles.
+
+Usage:
+    python load_test.py                           # sync (gunicorn default) vs gthread
+    python load_test.py --modes sync,gthread,gevent --clients 32 --duration 30
+    python load_test.py --url http://localhost:8000   # load an already-running server
+
+Every mode runs with ``--workers`` processes (default 2) so only the worker
+model changes between runs.
+"""
+import argparse
+import http.client
+import os
+import shutil
+import signal
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import date
+from urllib.parse import urlsplit
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+TODAY = date.today()
+# Fast list pages mixed with the slow PDF and report routes that used to block everyone
+PATHS = [
+    '/',
+    '/inventory',
+    '/customers',
+    '/financial',
+    '/invoice/1',
+    '/invoice/1/pdf',
+    '/quotation/1/pdf',
+    f'/financial/generate_income_statement/{TODAY.month}/{TODAY.year}',
+]
+
+
+def seed(db_path):
+    """Fill a new database with a few customers, items, quotations and invoices"""
+    os.environ['DATABASE_URL'] = f'sqlite:///{db_path}'
+    sys.path.append(ROOT)
+    from application import create_app
+
+    client = create_app().test_client()
+
+    def post(path, data):
+        response = client.post(path, data=data)
+        assert response.status_code in (200, 302), f'seeding {path} returned {response.status_code}'
+
+    post('/suppliers/add', dict(name='Load Supplier', contact_person='a', phone='1',
+                                email='s@example.com', address='x', payment_terms='30', currency='USD'))
+    for i in range(5):
+        post('/customers/add', dict(name=f'Customer {i}', identification_number=f'LT{i}',
+                                    citizenship='ZW', address='a', phone='1', email=f'c{i}@example.com'))
+        post('/inventory/add', dict(name=f'Item {i}', brand='B', category='Solar', specifications=f'S{i}',
+                                    quantity='1000', unit_price=str(50 + i), supplier_id='1'))
+    for i in range(5):
+        lines = {'item_id[]': ['1', '2', '3'], 'quantity[]': ['2', '1', '3'],
+                 'unit_price[]': ['80', '90', '100'], 'custom_item_name[]': ['', '', ''],
+                 'customer_identification': f'LT{i}'}
+        post('/quotations/add', lines)
+        post('/invoices/add', lines)
+
+    # Form errors flash and redirect too, so check that every loaded page has its data
+    for path in PATHS:
+        status = client.get(path).status_code
+        assert status == 200, f'seeded database answers {path} with {status}'
+
+
+def wait_until_up(base, timeout=60):
+    parts = urlsplit(base)
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            connection = http.client.HTTPConnection(parts.hostname, parts.port, timeout=2)
+            connection.request('GET', '/')
+            if connection.getresponse().status < 500:
+                return True
+        except OSError:
+            time.sleep(0.3)
+    return False
+
+
+def client_loop(base, offset, deadline, results, lock):
+    parts = urlsplit(base)
+    connection = http.client.HTTPConnection(parts.hostname, parts.port, timeout=120)
+    latencies, statuses = [], {}
+    i = offset
+    while time.time() < deadline:
+        path = PATHS[i % len(PATHS)]
+        i += 1
+        started = time.perf_counter()
+        try:
+            connection.request('GET', path)
+            response = connection.getresponse()
+            response.read()
+            status = response.status
+        except (OSError, http.client.HTTPException):
+            connection.close()
+            status = 'error'
+        latencies.append(time.perf_counter() - started)
+        statuses[status] = statuses.get(status, 0) + 1
+    connection.close()
+    with lock:
+        results['latencies'].extend(latencies)
+        for status, count in statuses.items():
+            results['statuses'][status] = results['statuses'].get(status, 0) + count
+
+
+def run_load(base, clients, duration):
+    results = {'latencies': [], 'statuses': {}}
+    lock = threading.Lock()
+    deadline = time.time() + duration
+    threads = [threading.Thread(target=client_loop, args=(base, n, deadline, results, lock))
+               for n in range(clients)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    results['elapsed'] = time.perf_counter() - started
+    return results
+
+
+def summarize(label, results):
+    latencies = sorted(results['latencies'])
+    if not latencies:
+        print(f'{label:>8}: no requests completed')
+        return 0
+    quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+    rate = len(latencies) / results['elapsed']
+    statuses = ', '.join(f'{status}: {count}' for status, count in sorted(results['statuses'].items(), key=str))
+    print(f'{label:>8}: {rate:7.1f} req/s  p50 {quantiles[49] * 1000:7.0f} ms  '
+          f'p95 {quantiles[94] * 1000:7.0f} ms  p99 {quantiles[98] * 1000:7.0f} ms  ({statuses})')
+    failed = sum(count for status, count in results['statuses'].items()
+                 if status == 'error' or not 200 <= status < 400)
+    if failed:
+        # Error pages are fast; counting them as throughput would flatter the run
+        print(f'{label:>8}: FAIL - {failed} request(s) failed or returned an error status')
+        return 0
+    return rate
+
+
+def run_mode(mode, template_db, args):
+    directory = tempfile.mkdtemp(prefix=f'giebee_load_{mode}_')
+    db_path = os.path.join(directory, 'load.db')
+    # The backup API includes pages still in the seed's -wal file; a file copy would not
+    source = sqlite3.connect(template_db)
+    target = sqlite3.connect(db_path)
+    with target:
+        source.backup(target)
+    source.close()
+    target.close()
+    env = dict(os.environ, PYTHONPATH=ROOT, PORT=str(args.port),
+               DATABASE_URL=f'sqlite:///{db_path}',
+               GUNICORN_WORKER_CLASS=mode, WEB_CONCURRENCY=str(args.workers))
+    # Run from the temp dir so the SQLite startup backup lands there, not in backups/
+    server = subprocess.Popen([sys.executable, '-m', 'gunicorn', '-c', os.path.join(ROOT, 'gunicorn.conf.py'),
+                               'main:app'], cwd=directory, env=env,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    base = f'http://127.0.0.1:{args.port}'
+    try:
+        if not wait_until_up(base):
+            server.terminate()
+            print(f'{mode:>8}: server did not start\n{server.communicate()[1][-2000:]}')
+            return 0
+        return summarize(mode, run_load(base, args.clients, args.duration))
+    finally:
+        if server.poll() is None:
+            server.send_signal(signal.SIGTERM)
+            server.wait(timeout=30)
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Gunicorn worker model load test')
+    parser.add_argument('--modes', default='sync,gthread', help='comma-separated worker classes')
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=15, help='seconds per mode')
+    parser.add_argument('--workers', type=int, default=2, help='gunicorn processes per mode')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--url', help='load an already-running server instead')
+    parser.add_argument('--seed', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.seed:
+        seed(args.seed)
+        return
+
+    print(f'{args.clients} clients, {args.duration:.0f} s per run, paths: {", ".join(PATHS)}')
+    if args.url:
+        if not summarize('server', run_load(args.url.rstrip('/'), args.clients, args.duration)):
+            sys.exit(1)
+        return
+
+    # Seed once in a separate interpreter (database.py reads DATABASE_URL at import)
+    seed_dir = tempfile.mkdtemp(prefix='giebee_load_seed_')
+    template_db = os.path.join(seed_dir, 'seed.db')
+    subprocess.run([sys.executable, os.path.abspath(__file__), '--seed', template_db],
+                   cwd=seed_dir, check=True, stdout=subprocess.DEVNULL)
+
+    rates = {}
+    try:
+        for mode in [m.strip() for m in args.modes.split(',') if m.strip()]:
+            rates[mode] = run_mode(mode, template_db, args)
+    finally:
+        shutil.rmtree(seed_dir, ignore_errors=True)
+
+    if not all(rates.values()):
+        sys.exit('Not comparing throughput: a run failed (see above)')
+    baseline = next(iter(rates.values()), 0)
+    if baseline:
+        print('Throughput vs ' + next(iter(rates)) + ': '
+              + ', '.join(f'{mode} x{rate / baseline:.2f}' for mode, rate in rates.items()))
+
+
+if __name__ == '__main__':
+    main()
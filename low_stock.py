@@ -0,0 +1,72 @@
+"""Low-stock detection and reorder reporting.
+
+Queries use the same ``quantity <= minimum_stock_level`` predicate as the
+``ix_inventory_low_stock`` partial index, so they only read the items that are
+actually low. Alerts are raised incrementally: inventory_service calls
+``note_movement()`` whenever stock moves and an alert is queued only when an
+item crosses its threshold. Queued alerts survive only if the transaction
+commits.
+"""
+from sqlalchemy import event, func
+from sqlalchemy.orm import Session
+
+from models import Inventory, Supplier
+
+PENDING_KEY = 'low_stock_pending'
+COMMITTED_KEY = 'low_stock_alerts'
+
+LOW_STOCK = Inventory.quantity <= Inventory.minimum_stock_level
+
+
+def low_stock_count(session):
+    """Number of items at or below their minimum stock level"""
+    return session.query(func.count(Inventory.id)).filter(LOW_STOCK).scalar() or 0
+
+
+def reorder_report(session):
+    """Low-stock items grouped by supplier, with a suggested reorder quantity
+    that brings each item back up to twice its minimum level"""
+    rows = (
+        session.query(Inventory, Supplier)
+        .outerjoin(Supplier, Inventory.supplier_id == Supplier.id)
+        .filter(LOW_STOCK)
+        .order_by(Supplier.name, Inventory.name)
+        .all()
+    )
+    groups = {}
+    for item, supplier in rows:
+        key = supplier.id if supplier else None
+        group = groups.setdefault(key, {'supplier': supplier, 'items': [], 'estimated_cost': 0.0})
+        reorder_quantity = max((item.minimum_stock_level or 0) * 2 - (item.quantity or 0), 1)
+        group['items'].append({'item': item, 'reorder_quantity': reorder_quantity})
+        group['estimated_cost'] += reorder_quantity * (item.unit_price or 0.0)
+    # Items without a supplier are listed last
+    return sorted(groups.values(), key=lambda g: (g['supplier'] is None, g['supplier'].name if g['supplier'] else ''))
+
+
+def note_movement(session, item, quantity_before):
+    """Queue an alert if this movement took the item across its threshold"""
+    minimum = item.minimum_stock_level
+    if minimum is None or item.quantity is None:
+        return
+    was_low = quantity_before is not None and quantity_before <= minimum
+    if item.quantity <= minimum and not was_low:
+        session.info.setdefault(PENDING_KEY, []).append(
+            f'{item.name} is low on stock ({item.quantity} left, minimum {minimum})')
+
+
+def pop_alerts(session):
+    """Alerts from committed movements, cleared once read"""
+    return session.info.pop(COMMITTED_KEY, [])
+
+
+@event.listens_for(Session, 'after_commit')
+def _publish_alerts(session):
+    pending = session.info.pop(PENDING_KEY, None)
+    if pending:
+        session.info.setdefault(COMMITTED_KEY, []).extend(pending)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_alerts(session):
+    session.info.pop(PENDING_KEY, None)
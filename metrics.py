@@ -0,0 +1,182 @@
+"""In-process request metrics in Prometheus text format.
+
+``init_metrics(app)`` records, per endpoint:
+
+* ``http_request_duration_seconds``      - latency histogram
+* ``http_requests_total``                - count by method and status
+* ``http_request_db_seconds``            - SQL time per request (from query_stats)
+* ``template_render_duration_seconds``   - per template
+* ``pdf_generation_duration_seconds``    - per document type (``@observe_pdf``)
+
+plus connection pool gauges, served at ``/metrics``. Set ``METRICS_TOKEN`` to
+require ``Authorization: Bearer <token>`` on scrapes.
+
+Counters live in process memory and are lock-protected, so every gunicorn
+worker keeps its own set. Samples carry a ``pid`` label; sum across workers in
+PromQL, e.g. ``sum without (pid) (rate(http_requests_total[5m]))``.
+"""
+import os
+import threading
+import time
+from functools import wraps
+
+from flask import g, has_request_context, request, template_rendered, before_render_template
+
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(names, values, extra=()):
+    # getpid() at render time: with preload_app the module is imported before the fork
+    pairs = list(zip(names, values)) + list(extra) + [('pid', os.getpid())]
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+class Counter:
+    """Monotonic counter with labels"""
+
+    kind = 'counter'
+
+    def __init__(self, name, help, labels=()):
+        self.name, self.help, self.label_names = name, help, tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            values = dict(self._values)
+        for labels, value in sorted(values.items()):
+            yield f'{self.name}{_labels(self.label_names, labels)} {value}'
+
+
+class Histogram:
+    """Bucketed histogram with labels; observe() is O(buckets) under one lock"""
+
+    kind = 'histogram'
+
+    def __init__(self, name, help, labels=(), buckets=BUCKETS):
+        self.name, self.help, self.label_names = name, help, tuple(labels)
+        self.buckets = tuple(buckets)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        with self._lock:
+            series = self._values.get(labels)
+            if series is None:
+                series = self._values[labels] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+                    break
+            series[1] += value
+            series[2] += 1
+
+    def samples(self):
+        with self._lock:
+            values = {labels: (list(counts), total, count) for labels, (counts, total, count) in self._values.items()}
+        for labels, (counts, total, count) in sorted(values.items()):
+            cumulative = 0
+            for bound, bucket in zip(self.buckets, counts):
+                cumulative += bucket
+                yield f'{self.name}_bucket{_labels(self.label_names, labels, [("le", bound)])} {cumulative}'
+            yield f'{self.name}_bucket{_labels(self.label_names, labels, [("le", "+Inf")])} {count}'
+            yield f'{self.name}_sum{_labels(self.label_names, labels)} {total}'
+            yield f'{self.name}_count{_labels(self.label_names, labels)} {count}'
+
+
+REQUEST_DURATION = Histogram('http_request_duration_seconds', 'Request latency', ('endpoint', 'method'))
+REQUESTS = Counter('http_requests_total', 'Requests by status', ('endpoint', 'method', 'status'))
+REQUEST_DB_TIME = Histogram('http_request_db_seconds', 'SQL time per request', ('endpoint',))
+TEMPLATE_RENDER = Histogram('template_render_duration_seconds', 'Template render time', ('template',))
+PDF_GENERATION = Histogram('pdf_generation_duration_seconds', 'PDF build time', ('document',))
+
+REGISTRY = (REQUEST_DURATION, REQUESTS, REQUEST_DB_TIME, TEMPLATE_RENDER, PDF_GENERATION)
+
+
+def observe_pdf(document):
+    """Decorator timing a PDF builder into pdf_generation_duration_seconds"""
+    def decorator(build):
+        @wraps(build)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return build(*args, **kwargs)
+            finally:
+                PDF_GENERATION.observe(time.perf_counter() - started, document)
+        return wrapper
+    return decorator
+
+
+def _pool_gauges():
+    from database import engine, read_engine
+    from db_pool import pool_status
+
+    lines = []
+    gauges = (('checkedout', 'db_pool_checked_out', 'Connections in use'),
+              ('checkedin', 'db_pool_checked_in', 'Idle pooled connections'),
+              ('overflow', 'db_pool_overflow', 'Connections above pool_size'))
+    engines = [('primary', engine)] + ([('read', read_engine)] if read_engine is not None else [])
+    statuses = [(name, pool_status(e)) for name, e in engines]
+    for key, metric, help in gauges:
+        values = [(name, status[key]) for name, status in statuses if key in status]
+        if values:
+            lines += [f'# HELP {metric} {help}', f'# TYPE {metric} gauge']
+            lines += [f'{metric}{_labels(("engine",), (name,))} {value}' for name, value in values]
+    lines += ['# HELP db_pool_connects_total New DB connections opened', '# TYPE db_pool_connects_total counter']
+    lines += [f'db_pool_connects_total{_labels(("engine",), (name,))} {status.get("connects", 0)}'
+              for name, status in statuses]
+    return lines
+
+
+def render_metrics():
+    """All metrics in the Prometheus text exposition format"""
+    lines = []
+    for metric in REGISTRY:
+        lines += [f'# HELP {metric.name} {metric.help}', f'# TYPE {metric.name} {metric.kind}']
+        lines.extend(metric.samples())
+    lines.extend(_pool_gauges())
+    return '\n'.join(lines) + '\n'
+
+
+def _start_timer():
+    g.metrics_started = time.perf_counter()
+
+
+def _record_request(response):
+    started = g.get('metrics_started')
+    if started is None:
+        return response
+    endpoint = request.url_rule.endpoint if request.url_rule else 'unmatched'
+    REQUEST_DURATION.observe(time.perf_counter() - started, endpoint, request.method)
+    REQUESTS.inc(endpoint, request.method, str(response.status_code))
+    queries = g.get('queries')
+    if queries is not None:
+        REQUEST_DB_TIME.observe(queries.total, endpoint)
+    return response
+
+
+def _template_started(sender, template, context, **extra):
+    if has_request_context():
+        g.setdefault('template_starts', []).append(time.perf_counter())
+
+
+def _template_finished(sender, template, context, **extra):
+    starts = g.get('template_starts') if has_request_context() else None
+    if starts:
+        TEMPLATE_RENDER.observe(time.perf_counter() - starts.pop(), template.name or 'string')
+
+
+def init_metrics(app):
+    """Time every request and template render of the app"""
+    app.before_request(_start_timer)
+    app.after_request(_record_request)
+    before_render_template.connect(_template_started, app)
+    template_rendered.connect(_template_finished, app)
@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, ForeignKey, Boolean, Enum
+from sqlalchemy import create_engine, Column, Integer, BigInteger, String, Float, DateTime, ForeignKey, Boolean, Enum, Index
 from sqlalchemy.orm import relationship
 from database import Base
 import enum
@@ -128,6 +128,13 @@ class Inventory(Base):
     date_created = Column(DateTime, default=datetime.utcnow)
     date_updated = Column(DateTime, onupdate=datetime.utcnow)
 
+    # Partial index: low-stock lookups only touch items at or below their threshold
+    __table_args__ = (
+        Index('ix_inventory_low_stock', 'supplier_id', 'id',
+              sqlite_where=quantity <= minimum_stock_level,
+              postgresql_where=quantity <= minimum_stock_level),
+    )
+
 class ActivityType(Base):
     __tablename__ = 'activity_types'
     id = Column(Integer, primary_key=True)
@@ -201,6 +208,71 @@ class StockTransaction(Base):
     created_by = Column(String(100))
     date_created = Column(DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        Index('ix_stock_transactions_item_date', 'inventory_id', 'date_created'),
+    )
+
+class ExchangeRate(Base):
+    __tablename__ = 'exchange_rates'
+    id = Column(Integer, primary_key=True)
+    currency = Column(Enum(Currency), nullable=False)
+    rate_to_usd = Column(Float, nullable=False)  # 1 unit of currency = rate_to_usd USD
+    effective_date = Column(DateTime, nullable=False)
+    source = Column(String(100))
+    date_created = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index('ix_exchange_rates_currency_date', 'currency', 'effective_date', unique=True),
+    )
+
+# Cost lot created by each receipt; stock-outs consume lots oldest first (FIFO)
+class CostLayer(Base):
+    __tablename__ = 'cost_layers'
+    id = Column(Integer, primary_key=True)
+    inventory_id = Column(Integer, ForeignKey('inventory.id'), nullable=False)
+    inventory = relationship('Inventory')
+    stock_transaction_id = Column(Integer, ForeignKey('stock_transactions.id'))
+    stock_transaction = relationship('StockTransaction')
+    unit_cost = Column(Float, nullable=False, default=0.0)
+    quantity_received = Column(Integer, nullable=False)
+    quantity_remaining = Column(Integer, nullable=False)
+    date_received = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index('ix_cost_layers_item_open', 'inventory_id', 'id',
+              sqlite_where=quantity_remaining > 0, postgresql_where=quantity_remaining > 0),
+    )
+
+# Running cost totals per item, so valuation reads one row per item
+class InventoryCost(Base):
+    __tablename__ = 'inventory_costs'
+    inventory_id = Column(Integer, ForeignKey('inventory.id'), primary_key=True)
+    inventory = relationship('Inventory')
+    quantity = Column(Integer, nullable=False, default=0)
+    total_cost = Column(Float, nullable=False, default=0.0)
+    date_updated = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+# Ledger checkpoint: stock at a date = latest snapshot + later stock_transactions
+class StockSnapshot(Base):
+    __tablename__ = 'stock_snapshots'
+    id = Column(Integer, primary_key=True)
+    inventory_id = Column(Integer, ForeignKey('inventory.id'), nullable=False)
+    inventory = relationship('Inventory')
+    snapshot_date = Column(DateTime, nullable=False)
+    quantity = Column(Integer, nullable=False, default=0)
+    total_value = Column(Float, nullable=False, default=0.0)
+    date_created = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index('ix_stock_snapshots_item_date', 'inventory_id', 'snapshot_date'),
+    )
+
+# Per-table data version stamps (see cache.data_versions), shared by every worker
+class DataVersion(Base):
+    __tablename__ = 'data_versions'
+    table_name = Column(String(64), primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
+
 class FinancialRecord(Base):
     __tablename__ = 'financial_records'
     id = Column(Integer, primary_key=True)
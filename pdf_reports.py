@@ -0,0 +1,405 @@
+"""PDF documents: quotations, invoices, payment receipts and financial statements.
+
+ReportLab is slow to import, so routes import this module inside the view
+that needs it; requests that never build a PDF never load it.
+Each builder returns a BytesIO positioned at the start of the PDF.
+"""
+import io
+import os
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.units import inch
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, Image, HRFlowable
+
+from metrics import observe_pdf
+
+LOGO_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static', 'images', 'logo.png')
+
+
+def _document(buffer):
+    return SimpleDocTemplate(buffer, pagesize=letter, topMargin=0.5*inch, bottomMargin=0.5*inch,
+                             leftMargin=0.5*inch, rightMargin=0.5*inch)
+
+
+def _letterhead(story, styles):
+    """Logo, company name, contacts and address, followed by a red rule"""
+    logo = Image(LOGO_PATH, width=1.2*inch, height=1.2*inch, kind='proportional')
+
+    company_name_style = ParagraphStyle(
+        'company_name_style',
+        parent=styles['h1'],
+        fontSize=22,
+        textColor=colors.red,
+        alignment=0,
+        leading=26
+    )
+
+    contact_info_style = ParagraphStyle(
+        'contact_info_style',
+        parent=styles['Normal'],
+        fontSize=9,
+        leading=11
+    )
+
+    address_style = ParagraphStyle(
+        'address_style',
+        parent=styles['Normal'],
+        fontSize=9,
+        leading=11,
+        alignment=2
+    )
+
+    header_text = """
+    <b>+263 774 040 059</b><br/>
+    <b>+263 717 039 984</b><br/>
+    <b>giebeeengineering@gmail.com</b>
+    """
+    address_text = """
+    <b>108 Central Avenue</b><br/>
+    <b>Room 8, 1st Floor</b><br/>
+    <b>Harare, Zimbabwe</b>
+    """
+
+    header_table_data = [
+        [logo, Paragraph('<b>GieBee Engineering (Pvt) Ltd</b>', company_name_style), ''],
+        ['', Paragraph(header_text, contact_info_style), Paragraph(address_text, address_style)]
+    ]
+
+    header_table = Table(header_table_data, colWidths=[1.3*inch, 3.5*inch, 2.7*inch])
+    header_table.setStyle(TableStyle([
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ('ALIGN', (0, 0), (0, -1), 'LEFT'),
+        ('SPAN', (0, 0), (0, 1)), # Span logo over two rows
+        ('SPAN', (1, 0), (2, 0)), # Span company name over two columns
+        ('ALIGN', (2, 1), (2, 1), 'RIGHT'),
+    ]))
+
+    story.append(header_table)
+    story.append(Spacer(1, 0.1*inch))
+    story.append(HRFlowable(width="100%", thickness=1.5, color=colors.red))
+    story.append(Spacer(1, 0.2*inch))
+
+
+def _document_title(story, styles, name, title, number):
+    title_style = ParagraphStyle(
+        name,
+        parent=styles['h2'],
+        fontSize=16,
+        alignment=0,
+        spaceAfter=8
+    )
+    story.append(Paragraph(title, title_style))
+    story.append(Paragraph(number, styles['Normal']))
+    story.append(Spacer(1, 0.2*inch))
+
+
+def _banking_details(story, styles):
+    banking_details_style = ParagraphStyle(
+        'banking_details_style',
+        parent=styles['Normal'],
+        spaceBefore=20,
+        fontSize=10
+    )
+    story.append(Paragraph('<b>Banking Details</b>', banking_details_style))
+    banking_info = """
+    Giebee Engineering Pvt Ltd<br/>
+    Bank Transfer: ZB Bank<br/>
+    FCA: 411800483226405<br/>
+    Branch: Chisipite<br/>
+    """
+    story.append(Paragraph(banking_info, styles['Normal']))
+
+
+def _customer_date_style(styles):
+    return ParagraphStyle(
+        'customer_date_style',
+        parent=styles['Normal'],
+        fontSize=12,
+        alignment=0,  # Left alignment
+        spaceAfter=10
+    )
+
+
+@observe_pdf('quotation')
+def quotation_pdf(quotation_obj, quotation_items, inventory_by_id):
+    """Quotation with line items; inventory_by_id maps stock items referenced by the lines"""
+    buffer = io.BytesIO()
+    doc = _document(buffer)
+    styles = getSampleStyleSheet()
+    story = []
+
+    _letterhead(story, styles)
+    _document_title(story, styles, 'quotation_style', 'Quotation', f'SAL-QTN-2025-{quotation_obj.id:05d}')
+
+    # Customer Name and Date aligned
+    customer_date_style = _customer_date_style(styles)
+    story.append(Paragraph(f"<b>Customer:</b> {quotation_obj.customer.name}", customer_date_style))
+    story.append(Paragraph(f"<b>Date:</b> {quotation_obj.date_created.strftime('%d-%m-%Y')}", customer_date_style))
+    story.append(Spacer(1, 0.2*inch))
+
+    # Items Table
+    items_data = [['Sr', 'Item Code', 'Description', 'Quantity', 'Price', 'Total Amount']]
+    total_quantity = 0
+    for i, item in enumerate(quotation_items):
+        if item.inventory_id:
+            inventory = inventory_by_id.get(item.inventory_id)
+            item_name = inventory.name if inventory else "Unknown Item"
+            item_code = inventory.specifications if inventory else "N/A"
+        else:
+            item_name = item.description or "Custom Item"
+            item_code = "Custom"
+        quantity = item.quantity
+        total_quantity += quantity
+        price = item.unit_price
+        amount = quantity * price
+        items_data.append([
+            str(i + 1),
+            item_code,
+            item_name,
+            str(quantity),
+            f"${price:,.2f}",
+            f"${amount:,.2f}"
+        ])
+
+    items_table = Table(items_data, colWidths=[0.4*inch, 1*inch, 3.1*inch, 0.7*inch, 1*inch, 1.3*inch])
+    items_table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.black),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('ALIGN', (3, 0), (-1, -1), 'RIGHT'),
+        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('TOPPADDING', (0, 0), (-1, 0), 12),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.whitesmoke),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black),
+        ('FONTSIZE', (0, 0), (-1, -1), 10),
+        ('LEFTPADDING', (0, 0), (-1, -1), 6),
+        ('RIGHTPADDING', (0, 0), (-1, -1), 6),
+    ]))
+    story.append(items_table)
+    story.append(Spacer(1, 0.2*inch))
+    # Total
+    total_data = [
+        ['', '', '', '', '', f"Net Price ${quotation_obj.total_amount:,.2f}"]
+    ]
+    total_table = Table(total_data, colWidths=[0.4*inch, 1*inch, 3.1*inch, 0.7*inch, 1*inch, 1.3*inch])
+    total_table.setStyle(TableStyle([
+        ('ALIGN', (5, 0), (5, 0), 'RIGHT'),
+        ('FONTNAME', (5, 0), (5, 0), 'Helvetica-Bold'),
+    ]))
+    story.append(total_table)
+    story.append(Spacer(1, 0.4*inch))
+
+    _banking_details(story, styles)
+
+    doc.build(story)
+    buffer.seek(0)
+    return buffer
+
+
+@observe_pdf('invoice')
+def invoice_pdf(invoice):
+    """Tax invoice with line items, totals and balance due"""
+    buffer = io.BytesIO()
+    doc = _document(buffer)
+    styles = getSampleStyleSheet()
+    story = []
+
+    _letterhead(story, styles)
+    _document_title(story, styles, 'invoice_style', 'Tax Invoice', f'INV-{invoice.id:05d}')
+
+    # Customer Name and Date
+    customer_date_style = _customer_date_style(styles)
+    story.append(Paragraph(f"<b>Customer:</b> {invoice.customer.name}", customer_date_style))
+    story.append(Paragraph(f"<b>Date:</b> {invoice.date_created.strftime('%d-%m-%Y')}", customer_date_style))
+    story.append(Paragraph(f"<b>Status:</b> {invoice.status.value}", customer_date_style))
+    story.append(Spacer(1, 0.2*inch))
+
+    # Items Table
+    items_data = [['Sr', 'Item Code', 'Description', 'Quantity', 'Price', 'Total Amount']]
+
+    for i, item in enumerate(invoice.items):
+        item_code = item.item_code or "N/A"
+        item_text = item.description
+        items_data.append([
+            str(i + 1),
+            Paragraph(item_code, styles['Normal']),
+            Paragraph(item_text, styles['Normal']),
+            str(item.quantity),
+            f"${item.unit_price:,.2f}",
+            f"${item.amount:,.2f}"
+        ])
+
+    items_table = Table(items_data, colWidths=[0.4*inch, 1.2*inch, 2.9*inch, 0.7*inch, 1*inch, 1.3*inch])
+    items_table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.black),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('ALIGN', (3, 0), (-1, -1), 'RIGHT'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('TOPPADDING', (0, 0), (-1, 0), 12),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.whitesmoke),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black),
+        ('FONTSIZE', (0, 0), (-1, -1), 10),
+        ('LEFTPADDING', (0, 0), (-1, -1), 6),
+        ('RIGHTPADDING', (0, 0), (-1, -1), 6),
+        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+    ]))
+    story.append(items_table)
+    story.append(Spacer(1, 0.2*inch))
+
+    # Total
+    total_data = [
+        ['', '', '', '', 'Total:', f"${invoice.total_amount:,.2f}"],
+        ['', '', '', '', 'Paid:', f"${invoice.paid_amount:,.2f}"],
+        ['', '', '', '', 'Balance:', f"${invoice.balance_due:,.2f}"]
+    ]
+    total_table = Table(total_data, colWidths=[0.4*inch, 1.2*inch, 2.9*inch, 0.7*inch, 1*inch, 1.3*inch])
+    total_table.setStyle(TableStyle([
+        ('ALIGN', (4, 0), (-1, -1), 'RIGHT'),
+        ('FONTNAME', (4, 0), (-1, -1), 'Helvetica-Bold'),
+        ('LINEABOVE', (4, 2), (-1, 2), 1, colors.black), # Line above Balance
+    ]))
+    story.append(total_table)
+    story.append(Spacer(1, 0.4*inch))
+
+    _banking_details(story, styles)
+
+    doc.build(story)
+    buffer.seek(0)
+    return buffer
+
+
+@observe_pdf('payment_receipt')
+def payment_receipt_pdf(payment):
+    """Receipt for one payment against an invoice"""
+    buffer = io.BytesIO()
+    doc = _document(buffer)
+    styles = getSampleStyleSheet()
+    story = []
+
+    _letterhead(story, styles)
+    _document_title(story, styles, 'receipt_style', 'Payment Receipt', f'RCPT-{payment.id:05d}')
+
+    # Payment Details
+    details_style = ParagraphStyle(
+        'details_style',
+        parent=styles['Normal'],
+        fontSize=12,
+        alignment=0,
+        spaceAfter=10,
+        leading=16
+    )
+
+    invoice = payment.invoice
+    customer = invoice.customer
+
+    story.append(Paragraph(f"<b>Received From:</b> {customer.name}", details_style))
+    story.append(Paragraph(f"<b>Date:</b> {payment.payment_date.strftime('%d-%m-%Y')}", details_style))
+    story.append(Paragraph(f"<b>Payment Method:</b> {payment.payment_method.value}", details_style))
+    if payment.reference_number:
+        story.append(Paragraph(f"<b>Reference:</b> {payment.reference_number}", details_style))
+
+    story.append(Spacer(1, 0.2*inch))
+
+    story.append(Paragraph(f"<b>Payment For:</b> Invoice #{invoice.id}", details_style))
+
+    story.append(Spacer(1, 0.2*inch))
+
+    # Amount Box
+    amount_data = [
+        ['Amount Received', f"${payment.amount:,.2f}"]
+    ]
+    amount_table = Table(amount_data, colWidths=[2*inch, 2*inch])
+    amount_table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, -1), colors.lightgrey),
+        ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
+        ('ALIGN', (0, 0), (0, 0), 'LEFT'),
+        ('ALIGN', (1, 0), (1, 0), 'RIGHT'),
+        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, -1), 14),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
+        ('TOPPADDING', (0, 0), (-1, -1), 12),
+        ('BOX', (0, 0), (-1, -1), 1, colors.black),
+    ]))
+    story.append(amount_table)
+
+    story.append(Spacer(1, 0.4*inch))
+    story.append(Paragraph("Thank you for your business!", styles['Normal']))
+
+    doc.build(story)
+    buffer.seek(0)
+    return buffer
+
+
+def _statement_pdf(title, data):
+    """Single-table financial statement"""
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=letter)
+    styles = getSampleStyleSheet()
+
+    # Title style
+    title_style = ParagraphStyle(
+        'CustomTitle',
+        parent=styles['Heading1'],
+        fontSize=16,
+        spaceAfter=30,
+        alignment=1  # Center alignment
+    )
+
+    story = [Paragraph(title, title_style), Spacer(1, 12)]
+
+    table = Table(data, colWidths=[200, 100, 100])
+    table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('ALIGN', (1, 0), (-1, -1), 'RIGHT'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, -1), 10),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black)
+    ]))
+    story.append(table)
+
+    doc.build(story)
+    buffer.seek(0)
+    return buffer
+
+
+@observe_pdf('income_statement')
+def income_statement_pdf(start_date, total_sales, total_income, total_expenses, cogs):
+    total_revenue = total_sales + total_income
+    gross_profit = total_revenue - abs(cogs)
+    return _statement_pdf(f"Income Statement - {start_date.strftime('%B %Y')}", [
+        ['Revenue', '', ''],
+        ['Sales', f"${total_sales:,.2f}", ''],
+        ['Other Income', f"${total_income:,.2f}", ''],
+        ['Total Revenue', f"${total_revenue:,.2f}", ''],
+        ['', '', ''],
+        ['Cost of Goods Sold', f"${abs(cogs):,.2f}", ''],
+        ['Gross Profit', f"${gross_profit:,.2f}", ''],
+        ['', '', ''],
+        ['Operating Expenses', f"${total_expenses:,.2f}", ''],
+        ['Net Profit', f"${gross_profit - total_expenses:,.2f}", '']
+    ])
+
+
+@observe_pdf('balance_sheet')
+def balance_sheet_pdf(start_date, total_assets, total_liabilities):
+    total_equity = total_assets - total_liabilities
+    return _statement_pdf(f"Balance Sheet - {start_date.strftime('%B %Y')}", [
+        ['Assets', '', ''],
+        ['Current Assets', '', ''],
+        ['Inventory', f"${total_assets:,.2f}", ''],
+        ['Total Assets', f"${total_assets:,.2f}", ''],
+        ['', '', ''],
+        ['Liabilities & Equity', '', ''],
+        ['Current Liabilities', f"${total_liabilities:,.2f}", ''],
+        ['Equity', f"${total_equity:,.2f}", ''],
+        ['Total Liabilities & Equity', f"${total_liabilities + total_equity:,.2f}", '']
+    ])
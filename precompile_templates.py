@@ -0,0 +1,33 @@
+"""Precompile all Jinja templates into the bytecode cache.
+
+Usage:
+    python precompile_templates.py
+
+Run as part of the build (see render.yaml). It builds the app with
+``create_app(startup=False)``, so it needs no database connection.
+"""
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(ROOT)
+
+from application import create_app
+from template_cache import cache_directory, precompile_templates
+
+
+def main():
+    app = create_app(startup=False)
+
+    started = time.perf_counter()
+    compiled, errors = precompile_templates(app)
+    elapsed = (time.perf_counter() - started) * 1000
+    print(f'Compiled {len(compiled)} templates into {cache_directory(app)} in {elapsed:.0f} ms')
+    # Broken templates only fail when rendered, so report them without failing the build
+    for name, error in errors.items():
+        print(f'Warning: {name} not compiled ({error})')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,183 @@
+"""Opt-in request profiling.
+
+A request is profiled when either:
+
+* a random draw falls under ``PROFILE_SAMPLE_RATE`` (0 to 1, default 0), or
+* it carries ``X-Profile: <PROFILE_TOKEN>`` or ``?profile=<PROFILE_TOKEN>``
+  (any value works in debug mode).
+
+``PROFILE_MODE`` picks the profiler:
+
+* ``cprofile`` (default) - deterministic, writes ``.pstats`` files
+  (open with ``python -m pstats`` or snakeviz)
+* ``sample``             - samples the request thread's stack every
+  ``PROFILE_INTERVAL_MS`` (default 5) with less overhead, and writes
+  ``.speedscope.json`` files for https://www.speedscope.app
+
+Files go to ``instance/profiles/`` (``PROFILE_DIR``); only the newest
+``PROFILE_KEEP`` (default 50) are kept. They are listed at /admin/profiles.
+"""
+import cProfile
+import hmac
+import json
+import os
+import random
+import sys
+import threading
+import time
+from datetime import datetime
+
+from flask import current_app, g, request
+
+SAMPLE_RATE = float(os.environ.get('PROFILE_SAMPLE_RATE', 0))
+MODE = os.environ.get('PROFILE_MODE', 'cprofile').strip().lower()
+INTERVAL = float(os.environ.get('PROFILE_INTERVAL_MS', 5)) / 1000
+KEEP = int(os.environ.get('PROFILE_KEEP', 50))
+EXTENSIONS = ('.pstats', '.speedscope.json')
+
+
+def profile_directory(app):
+    return os.environ.get('PROFILE_DIR') or os.path.join(app.instance_path, 'profiles')
+
+
+def token_matches(value):
+    """True if value is the PROFILE_TOKEN (or anything, in debug mode)"""
+    if current_app.debug:
+        return bool(value)
+    token = os.environ.get('PROFILE_TOKEN')
+    return bool(token and value and hmac.compare_digest(value, token))
+
+
+def _wants_profile():
+    if SAMPLE_RATE > 0 and random.random() < SAMPLE_RATE:
+        return True
+    flag = request.headers.get('X-Profile') or request.args.get('profile')
+    return bool(flag) and token_matches(flag)
+
+
+class StackSampler:
+    """Samples one thread's Python stack on a background thread"""
+
+    def __init__(self, thread_id, interval=INTERVAL):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.frames = {}
+        self.samples = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _frame_index(self, code, line):
+        key = (code.co_name, code.co_filename, line)
+        if key not in self.frames:
+            self.frames[key] = len(self.frames)
+        return self.frames[key]
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(self._frame_index(frame.f_code, frame.f_code.co_firstlineno))
+                frame = frame.f_back
+            if stack:
+                self.samples.append(stack[::-1])
+
+    def start(self):
+        self.started = time.perf_counter()
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self.elapsed = time.perf_counter() - self.started
+
+    def speedscope(self, name):
+        frames = [{'name': fn, 'file': file, 'line': line}
+                  for (fn, file, line), _ in sorted(self.frames.items(), key=lambda item: item[1])]
+        weight = self.interval * 1000
+        return {
+            '$schema': 'https://www.speedscope.app/file-format-schema.json',
+            'shared': {'frames': frames},
+            'profiles': [{
+                'type': 'sampled', 'name': name, 'unit': 'milliseconds',
+                'startValue': 0, 'endValue': self.elapsed * 1000,
+                'samples': self.samples, 'weights': [weight] * len(self.samples),
+            }],
+            'name': name,
+            'exporter': 'giebee-erp profiling.py',
+        }
+
+
+def _start_profile():
+    if not _wants_profile():
+        return
+    if MODE == 'sample':
+        profiler = StackSampler(threading.get_ident())
+        profiler.start()
+    else:
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another profiler is already active on this thread
+            return
+    g.profiler = profiler
+    g.profile_started = time.perf_counter()
+
+
+def _file_stem(response, elapsed):
+    endpoint = (request.url_rule.endpoint if request.url_rule else 'unmatched').replace('.', '-')
+    stamp = datetime.now().strftime('%Y%m%d-%H%M%S-%f')
+    return f'{stamp}_{endpoint}_{response.status_code}_{elapsed * 1000:.0f}ms'
+
+
+def _prune(directory):
+    profiles = sorted(name for name in os.listdir(directory) if name.endswith(EXTENSIONS))
+    for name in profiles[:-KEEP] if KEEP > 0 else []:
+        try:
+            os.remove(os.path.join(directory, name))
+        except OSError:
+            pass
+
+
+def _finish_profile(response):
+    profiler = g.pop('profiler', None)
+    if profiler is None:
+        return response
+    if isinstance(profiler, StackSampler):
+        profiler.stop()
+    else:
+        profiler.disable()
+    elapsed = time.perf_counter() - g.pop('profile_started')
+    directory = profile_directory(current_app)
+    stem = _file_stem(response, elapsed)
+    try:
+        os.makedirs(directory, exist_ok=True)
+        if isinstance(profiler, StackSampler):
+            with open(os.path.join(directory, stem + '.speedscope.json'), 'w') as f:
+                json.dump(profiler.speedscope(f'{request.method} {request.full_path.rstrip("?")}'), f)
+        else:
+            profiler.dump_stats(os.path.join(directory, stem + '.pstats'))
+        _prune(directory)
+    except OSError as e:
+        print(f"Profile write warning: {e}")
+    return response
+
+
+def list_profiles(app):
+    """[(name, size in bytes, modified datetime)], newest first"""
+    directory = profile_directory(app)
+    if not os.path.isdir(directory):
+        return []
+    profiles = []
+    for name in os.listdir(directory):
+        if name.endswith(EXTENSIONS):
+            stat = os.stat(os.path.join(directory, name))
+            profiles.append((name, stat.st_size, datetime.fromtimestamp(stat.st_mtime)))
+    return sorted(profiles, key=lambda profile: profile[0], reverse=True)
+
+
+def init_profiling(app):
+    """Profile sampled or flagged requests of the app"""
+    app.before_request(_start_profile)
+    app.after_request(_finish_profile)
@@ -0,0 +1,137 @@
+"""Per-request SQL instrumentation.
+
+``init_query_stats(app, *engines)`` hooks ``before_cursor_execute`` /
+``after_cursor_execute`` on the engines and, for every request, records the
+number of statements, the total database time and the slowest statements.
+A statement run ``N_PLUS_ONE_THRESHOLD`` (default 5) or more times with
+different parameters is flagged as a likely N+1 query.
+
+Every response gets a ``Server-Timing`` header (``db`` and ``app``), which
+browser dev tools show in the network timing tab. Requests slower than
+``SLOW_REQUEST_MS`` (default 500) are printed with their query summary. With
+``QUERY_DEBUG=1`` (or in debug mode) HTML pages also get a small summary panel.
+"""
+import os
+import time
+
+from flask import current_app, g, has_request_context, request
+from markupsafe import escape
+from sqlalchemy import event
+
+SLOW_REQUEST_MS = float(os.environ.get('SLOW_REQUEST_MS', 500))
+N_PLUS_ONE_THRESHOLD = int(os.environ.get('N_PLUS_ONE_THRESHOLD', 5))
+SLOWEST_KEPT = 5
+
+
+class RequestQueries:
+    """SQL statements executed while handling one request"""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.slowest = []
+        self.statements = {}
+
+    def record(self, statement, parameters, elapsed):
+        self.count += 1
+        self.total += elapsed
+        runs = self.statements.setdefault(statement, [0, set()])
+        runs[0] += 1
+        if len(runs[1]) < N_PLUS_ONE_THRESHOLD:
+            runs[1].add(repr(parameters)[:200])
+        if len(self.slowest) < SLOWEST_KEPT or elapsed > self.slowest[-1][0]:
+            self.slowest.append((elapsed, statement))
+            self.slowest.sort(key=lambda entry: -entry[0])
+            del self.slowest[SLOWEST_KEPT:]
+
+    def repeated(self):
+        """[(statement, times run)] for statements that look like N+1 queries"""
+        return [(statement, runs[0]) for statement, runs in self.statements.items()
+                if runs[0] >= N_PLUS_ONE_THRESHOLD and len(runs[1]) > 1]
+
+    def summary(self):
+        lines = [f'{self.count} queries in {self.total * 1000:.1f} ms']
+        for elapsed, statement in self.slowest:
+            lines.append(f'  {elapsed * 1000:7.1f} ms  {_shorten(statement)}')
+        for statement, times in self.repeated():
+            lines.append(f'  N+1? {times}x  {_shorten(statement)}')
+        return '\n'.join(lines)
+
+
+def _shorten(statement, length=160):
+    statement = ' '.join(statement.split())
+    return statement if len(statement) <= length else statement[:length - 3] + '...'
+
+
+def _before_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+
+def _after_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info['query_started'].pop()
+    if has_request_context():
+        queries = g.get('queries')
+        if queries is not None:
+            queries.record(statement, parameters, time.perf_counter() - started)
+
+
+def _execute_failed(exception_context):
+    if exception_context.connection is not None:
+        started = exception_context.connection.info.get('query_started')
+        if started:
+            started.pop()
+
+
+def _start_request():
+    g.queries = RequestQueries()
+    g.request_started = time.perf_counter()
+
+
+def _debug_panel(queries, elapsed):
+    rows = ''.join(f'<li>{elapsed_s * 1000:.1f} ms &mdash; <code>{escape(_shorten(statement, 300))}</code></li>'
+                   for elapsed_s, statement in queries.slowest)
+    repeated = ''.join(f'<li class="text-danger">N+1? {times}&times; &mdash; '
+                       f'<code>{escape(_shorten(statement, 300))}</code></li>'
+                       for statement, times in queries.repeated())
+    return (f'<details id="query-stats" style="position:fixed;bottom:0;right:0;z-index:2000;max-width:50%;'
+            f'max-height:50%;overflow:auto;background:#fff;border:1px solid #ccc;padding:4px 8px;font-size:12px">'
+            f'<summary>{queries.count} queries, {queries.total * 1000:.1f} ms SQL, '
+            f'{elapsed * 1000:.0f} ms total</summary><ol>{rows}</ol><ul>{repeated}</ul></details>')
+
+
+def _debug_panel_enabled():
+    return current_app.debug or os.environ.get('QUERY_DEBUG', '').lower() in ('1', 'true', 'yes')
+
+
+def _finish_request(response):
+    queries = g.get('queries')
+    started = g.get('request_started')
+    if queries is None or started is None:
+        return response
+    elapsed = time.perf_counter() - started
+
+    response.headers.add('Server-Timing', f'db;dur={queries.total * 1000:.1f};desc="{queries.count} queries"')
+    response.headers.add('Server-Timing', f'app;dur={elapsed * 1000:.1f}')
+
+    if elapsed * 1000 >= SLOW_REQUEST_MS:
+        print(f"Slow request: {request.method} {request.full_path.rstrip('?')} "
+              f"{response.status_code} {elapsed * 1000:.0f} ms\n{queries.summary()}")
+
+    if (response.mimetype == 'text/html' and not response.direct_passthrough
+            and not response.is_streamed and _debug_panel_enabled()):
+        body = response.get_data(as_text=True)
+        if '</body>' in body:
+            response.set_data(body.replace('</body>', _debug_panel(queries, elapsed) + '</body>', 1))
+    return response
+
+
+def init_query_stats(app, *engines):
+    """Record per-request SQL statistics for queries on ``engines``"""
+    for engine in engines:
+        if not event.contains(engine, 'before_cursor_execute', _before_execute):
+            event.listen(engine, 'before_cursor_execute', _before_execute)
+            event.listen(engine, 'after_cursor_execute', _after_execute)
+            event.listen(engine, 'handle_error', _execute_failed)
+
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
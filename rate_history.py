@@ -0,0 +1,85 @@
+"""Historical exchange rates for as-of-date conversion.
+
+Amounts must be converted with the rate that was valid on the transaction
+date, not today's. The ``exchange_rates`` table is keyed by
+(currency, effective_date); this module offers two ways to read it:
+
+* ``RateHistory.rate_on()`` - in-memory per-currency sorted arrays searched
+  with bisect, so each lookup is O(log n). The index is cached in the
+  application cache and rebuilt when rates change.
+* ``usd_amount_as_of()`` - a SQL expression doing the as-of join per row,
+  for use inside aggregates, served by the (currency, effective_date) index.
+
+Both use the same rule: the latest rate effective on or before the date;
+dates before a currency's first rate use its earliest rate; currencies with
+no rates use ``DEFAULT_RATES``; a NULL currency is USD.
+"""
+from bisect import bisect_right
+from datetime import date, datetime
+
+from sqlalchemy import select, func
+
+from cache import get_or_set, invalidate_on
+from currency_converter import DEFAULT_RATES, usd_amount, _code
+from models import ExchangeRate
+
+HISTORY_CACHE_KEY = 'fx:history'
+
+
+class RateHistory:
+    """Per-currency sorted effective dates and rates"""
+
+    def __init__(self, rows=()):
+        self._dates = {}
+        self._rates = {}
+        for currency, effective_date, rate in sorted(rows, key=lambda r: (_code(r[0]), r[1])):
+            code = _code(currency)
+            self._dates.setdefault(code, []).append(effective_date)
+            self._rates.setdefault(code, []).append(rate)
+
+    def rate_on(self, currency, as_of):
+        """Rate valid on as_of (see the module docstring for the fallbacks)"""
+        code = _code(currency) or 'USD'
+        dates = self._dates.get(code)
+        if not dates:
+            return DEFAULT_RATES.get(code, 1.0)
+        if isinstance(as_of, date) and not isinstance(as_of, datetime):
+            as_of = datetime.combine(as_of, datetime.max.time())
+        position = bisect_right(dates, as_of) - 1
+        return self._rates[code][max(position, 0)]
+
+    def to_usd(self, value, currency, as_of):
+        return (value or 0) * self.rate_on(currency, as_of)
+
+
+def _load_history():
+    from database import db_session
+    rows = db_session.query(ExchangeRate.currency, ExchangeRate.effective_date, ExchangeRate.rate_to_usd).all()
+    return RateHistory([tuple(row) for row in rows])
+
+
+def get_rate_history():
+    """Cached RateHistory built from the rate table"""
+    return get_or_set(HISTORY_CACHE_KEY, _load_history)
+
+
+def usd_amount_as_of(amount_column, currency_column, date_column):
+    """SQL expression converting amount_column to USD at the rate valid on
+    date_column, with the same fallbacks as RateHistory.rate_on()"""
+    def rate(*criteria, order):
+        return (
+            select(ExchangeRate.rate_to_usd)
+            .where(ExchangeRate.currency == currency_column, *criteria)
+            .order_by(order)
+            .limit(1)
+            .correlate_except(ExchangeRate)
+            .scalar_subquery()
+        )
+
+    rate_then = rate(ExchangeRate.effective_date <= date_column, order=ExchangeRate.effective_date.desc())
+    earliest = rate(order=ExchangeRate.effective_date.asc())
+    return func.coalesce(amount_column * rate_then, amount_column * earliest,
+                         usd_amount(amount_column, currency_column, DEFAULT_RATES))
+
+
+invalidate_on([ExchangeRate], HISTORY_CACHE_KEY)
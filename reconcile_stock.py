@@ -0,0 +1,78 @@
+"""Reconcile inventory counters against the stock ledger.
+
+Usage:
+    python reconcile_stock.py                # report drift only
+    python reconcile_stock.py --checkpoint   # also write a snapshot checkpoint
+    python reconcile_stock.py --as-of 2026-01-31 --item 12
+    python reconcile_stock.py --opening-balances   # one-off, after upgrading
+    python reconcile_stock.py --restate-stock-outs # one-off, after upgrading
+
+Run with --checkpoint on a schedule (e.g. a nightly cron job) so point-in-time
+queries only ever replay a short tail of stock_transactions.
+
+Stock that was on hand before the ledger existed shows up as drift. Run
+--opening-balances once to record it as opening ADJUSTMENT rows.
+
+Stock-outs recorded before cost tracking carry selling prices, not costs.
+Run --restate-stock-outs once so COGS and stock values use one basis.
+"""
+import argparse
+import os
+import sys
+from datetime import datetime
+
+sys.path.append(os.getcwd())
+
+from database import db_session, init_db
+from stock_ledger import (reconcile, create_checkpoint, stock_at, valuation_at, record_opening_balances,
+                          restate_legacy_stock_outs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Stock ledger reconciliation')
+    parser.add_argument('--checkpoint', action='store_true', help='write a snapshot for every item')
+    parser.add_argument('--opening-balances', action='store_true',
+                        help='record stock held before the ledger began as opening adjustments')
+    parser.add_argument('--restate-stock-outs', action='store_true',
+                        help='revalue stock-outs recorded before cost tracking at cost')
+    parser.add_argument('--as-of', help='date (YYYY-MM-DD) for --item / valuation queries')
+    parser.add_argument('--item', type=int, help='inventory id to report stock for')
+    args = parser.parse_args()
+
+    init_db()
+    as_of = datetime.strptime(args.as_of, '%Y-%m-%d') if args.as_of else None
+
+    if args.opening_balances:
+        opened = record_opening_balances(db_session)
+        db_session.commit()
+        print(f"Recorded {len(opened)} opening balance(s).")
+
+    if args.restate_stock_outs:
+        restated, change = restate_legacy_stock_outs(db_session)
+        db_session.commit()
+        print(f"Restated {restated} stock-out(s) at cost ({change:+,.2f} in stock value).")
+
+    if args.item:
+        print(f"Stock of item {args.item} as of {args.as_of or 'now'}: {stock_at(db_session, args.item, as_of)}")
+    print(f"Stock valuation as of {args.as_of or 'now'}: ${valuation_at(db_session, as_of):,.2f}")
+
+    drift = reconcile(db_session)
+    if drift:
+        print(f"{len(drift)} item(s) drifted from the ledger:")
+        for row in drift:
+            print(f"  #{row['inventory_id']} {row['name']}: inventory={row['inventory_quantity']} "
+                  f"ledger={row['ledger_quantity']} difference={row['difference']:+d}")
+    else:
+        print("Inventory quantities match the stock ledger.")
+
+    if args.checkpoint:
+        written = create_checkpoint(db_session)
+        db_session.commit()
+        print(f"Wrote {written} snapshot(s).")
+
+    db_session.remove()
+    return 1 if drift else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,54 @@
+"""Cached reference data for dropdowns and filters.
+
+Add/edit forms render the same supplier, customer and activity-type lists on
+every request. These lookups go through the application cache as plain dicts
+(templates read them exactly like model objects), and they are invalidated
+whenever the underlying rows change.
+"""
+from cache import get_or_set, invalidate_on
+from models import Supplier, Customer, ActivityType, Inventory
+
+SUPPLIERS_KEY = 'ref:suppliers'
+CUSTOMERS_KEY = 'ref:customers'
+ACTIVITY_TYPES_KEY = 'ref:activity_types'
+CATEGORIES_KEY = 'ref:inventory_categories'
+
+
+def supplier_options(session):
+    """[{'id', 'name'}] for supplier dropdowns"""
+    return get_or_set(SUPPLIERS_KEY, lambda: [
+        {'id': row.id, 'name': row.name}
+        for row in session.query(Supplier.id, Supplier.name).order_by(Supplier.id)
+    ])
+
+
+def customer_options(session):
+    """[{'id', 'name', 'identification_number', 'address'}] for customer dropdowns"""
+    return get_or_set(CUSTOMERS_KEY, lambda: [
+        {'id': row.id, 'name': row.name, 'identification_number': row.identification_number,
+         'address': row.address}
+        for row in session.query(Customer.id, Customer.name, Customer.identification_number, Customer.address)
+        .order_by(Customer.id)
+    ])
+
+
+def activity_type_options(session):
+    """Active activity types as [{'id', 'name'}]"""
+    return get_or_set(ACTIVITY_TYPES_KEY, lambda: [
+        {'id': row.id, 'name': row.name}
+        for row in session.query(ActivityType.id, ActivityType.name)
+        .filter_by(is_active=True).order_by(ActivityType.id)
+    ])
+
+
+def inventory_categories(session):
+    """Distinct non-empty inventory categories"""
+    return get_or_set(CATEGORIES_KEY, lambda: [
+        row[0] for row in session.query(Inventory.category).distinct() if row[0]
+    ])
+
+
+invalidate_on([Supplier], SUPPLIERS_KEY)
+invalidate_on([Customer], CUSTOMERS_KEY)
+invalidate_on([ActivityType], ACTIVITY_TYPES_KEY)
+invalidate_on([Inventory], CATEGORIES_KEY)
@@ -0,0 +1,81 @@
+"""SQLite performance settings for the local and desktop deployments.
+
+``tune_sqlite(engine)`` applies these pragmas to every new connection:
+
+* ``journal_mode=WAL``     - readers no longer block the writer (and vice versa)
+* ``synchronous=NORMAL``   - fsync at checkpoints rather than on every commit;
+  safe in WAL mode (a power cut can only lose the last commits, never corrupt)
+* ``cache_size``           - ``SQLITE_CACHE_SIZE_KB`` of page cache (default 64 MB)
+* ``mmap_size``            - ``SQLITE_MMAP_SIZE_MB`` of memory-mapped I/O (default 256 MB)
+* ``temp_store=MEMORY``    - sorts and temp tables stay in RAM
+* ``busy_timeout``         - wait ``SQLITE_BUSY_TIMEOUT_MS`` (default 10 s) for a lock
+
+``enable_single_writer()`` makes ORM sessions take a process-wide writer lock
+before their first write and hold it until commit or rollback. Writers then
+queue up in the app instead of failing with "database is locked".
+It is turned on with ``SQLITE_SINGLE_WRITER=1`` (desktop_app.py sets it).
+"""
+import os
+import threading
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+CACHE_SIZE_KB = int(os.environ.get('SQLITE_CACHE_SIZE_KB', 64 * 1024))
+MMAP_SIZE_MB = int(os.environ.get('SQLITE_MMAP_SIZE_MB', 256))
+BUSY_TIMEOUT_MS = int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 10000))
+WRITER_TIMEOUT = float(os.environ.get('SQLITE_WRITER_TIMEOUT', 30))
+
+
+def _set_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute('PRAGMA journal_mode=WAL')
+    except Exception as e:
+        # e.g. the file is on a filesystem without shared memory support
+        print(f"SQLite WAL warning: {e}")
+    cursor.execute('PRAGMA synchronous=NORMAL')
+    cursor.execute(f'PRAGMA cache_size=-{CACHE_SIZE_KB}')
+    cursor.execute(f'PRAGMA mmap_size={MMAP_SIZE_MB * 1024 * 1024}')
+    cursor.execute('PRAGMA temp_store=MEMORY')
+    cursor.execute(f'PRAGMA busy_timeout={BUSY_TIMEOUT_MS}')
+    cursor.close()
+
+
+def tune_sqlite(engine):
+    """Apply the pragmas above to every connection the engine opens"""
+    event.listen(engine, 'connect', _set_pragmas)
+
+
+_writer_lock = threading.RLock()
+
+
+def _acquire_writer(session):
+    if session.info.get('sqlite_writer'):
+        return
+    if not _writer_lock.acquire(timeout=WRITER_TIMEOUT):
+        raise TimeoutError(f'Waited more than {WRITER_TIMEOUT:.0f}s for the SQLite writer lock')
+    session.info['sqlite_writer'] = True
+
+
+def _release_writer(session, transaction):
+    # Only the outermost transaction ends the write; savepoints keep the lock
+    if transaction.parent is None and session.info.pop('sqlite_writer', False):
+        _writer_lock.release()
+
+
+def _writer_before_flush(session, flush_context, instances):
+    if session.new or session.dirty or session.deleted:
+        _acquire_writer(session)
+
+
+def _writer_before_execute(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        _acquire_writer(orm_execute_state.session)
+
+
+def enable_single_writer():
+    """Serialize ORM write transactions within this process"""
+    event.listen(Session, 'before_flush', _writer_before_flush)
+    event.listen(Session, 'do_orm_execute', _writer_before_execute)
+    event.listen(Session, 'after_transaction_end', _release_writer)
@@ -1,9 +1,65 @@
 // @ts-nocheck
-document.addEventListener('DOMContentLoaded', function () {
-    const ctx = document.getElementById('locationChart').getContext('2d');
-    new Chart(ctx, {
-        type: 'pie',
-        data: chartData,
-        options: chartOptions
+// Renders every <canvas data-chart-url="..."> on the page. Each dataset is
+// fetched from its /api/v1/charts endpoint in parallel, so the page itself
+// does not wait for chart queries.
+(function () {
+    const palette = ['#36A2EB', '#FF6384', '#FFCE56', '#4BC0C0', '#9966FF', '#FF9F40', '#C9CBCF'];
+    const lineColors = [['#36A2EB', 'rgba(54, 162, 235, 0.2)'], ['#FF6384', 'rgba(255, 99, 132, 0.2)']];
+
+    function showMessage(canvas, message) {
+        const ctx = canvas.getContext('2d');
+        ctx.font = '16px Poppins';
+        ctx.fillStyle = '#6c757d';
+        ctx.textAlign = 'center';
+        ctx.fillText(message, canvas.width / 2, canvas.height / 2);
+    }
+
+    function styleDatasets(type, datasets) {
+        return datasets.map(function (dataset, i) {
+            if (type === 'line') {
+                const colors = lineColors[i % lineColors.length];
+                return Object.assign({ borderColor: colors[0], backgroundColor: colors[1], fill: true }, dataset);
+            }
+            return Object.assign({
+                backgroundColor: datasets.length > 1 ? palette[i % palette.length] : palette,
+                borderRadius: 6
+            }, dataset);
+        });
+    }
+
+    function renderChart(canvas, payload) {
+        const hasData = payload.labels.length > 0 && payload.datasets.some(function (d) { return d.data.length > 0; });
+        if (!hasData) {
+            showMessage(canvas, canvas.dataset.emptyMessage || 'No data for this period');
+            return;
+        }
+        const type = canvas.dataset.chartType || 'bar';
+        new Chart(canvas.getContext('2d'), {
+            type: type,
+            data: { labels: payload.labels, datasets: styleDatasets(type, payload.datasets) },
+            options: {
+                responsive: true,
+                maintainAspectRatio: canvas.parentElement.style.height === '',
+                plugins: { legend: { display: payload.datasets.length > 1 } },
+                scales: { y: { beginAtZero: true } }
+            }
+        });
+    }
+
+    document.addEventListener('DOMContentLoaded', function () {
+        Chart.defaults.font.family = "'Poppins', sans-serif";
+        Chart.defaults.color = '#6c757d';
+
+        document.querySelectorAll('canvas[data-chart-url]').forEach(function (canvas) {
+            fetch(canvas.dataset.chartUrl, { headers: { Accept: 'application/json' } })
+                .then(function (response) {
+                    if (!response.ok) {
+                        throw new Error(response.status);
+                    }
+                    return response.json();
+                })
+                .then(function (payload) { renderChart(canvas, payload); })
+                .catch(function () { showMessage(canvas, 'Chart data could not be loaded'); });
+        });
     });
-});
+})();
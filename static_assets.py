@@ -0,0 +1,50 @@
+"""Static file serving with fingerprinted, precompressed assets.
+
+``python build_static.py`` copies everything under ``static/`` into
+``static/dist/`` with a content hash in each filename, optimizes the logo
+images, writes gzip and Brotli variants next to them and records the names
+in ``static/dist/manifest.json``.
+
+Templates link assets with ``asset_url('css/custom.css')``, which resolves
+through the manifest. Hashed files are served with a one-year
+``Cache-Control: immutable``, and WhiteNoise picks the .br/.gz variant the
+browser accepts. Without a build, ``asset_url`` falls back to the original
+files.
+"""
+import json
+import os
+import re
+
+from flask import url_for
+from whitenoise import WhiteNoise
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
+BUILD_DIR = 'dist'
+MANIFEST_PATH = os.path.join(STATIC_DIR, BUILD_DIR, 'manifest.json')
+
+# name.<12 hex digits>.ext, as written by build_static.py
+HASHED_NAME = re.compile(r'\.[0-9a-f]{12}\.\w+$')
+
+
+def load_manifest(path=MANIFEST_PATH):
+    """{'css/custom.css': 'dist/css/custom.<hash>.css', ...}; empty before the first build"""
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def _is_immutable(path, url):
+    return bool(HASHED_NAME.search(url))
+
+
+def init_static(app):
+    """Serve static/ through WhiteNoise and register the asset_url() template global"""
+    app.wsgi_app = WhiteNoise(app.wsgi_app, root=STATIC_DIR, prefix='static/',
+                              immutable_file_test=_is_immutable)
+    manifest = load_manifest()
+
+    @app.template_global()
+    def asset_url(filename):
+        return url_for('static', filename=manifest.get(filename, filename))
@@ -0,0 +1,215 @@
+"""Stock ledger.
+
+``stock_transactions`` is the source of truth for stock; ``Inventory.quantity``
+is only a running counter kept in step by inventory_service. Point-in-time
+stock and valuation are answered from the latest ``StockSnapshot`` at or before
+the requested date plus the transactions recorded after it, so a query only
+reads one snapshot row and the recent delta per item instead of the whole
+history.
+
+Stock counted in before the ledger existed has no transactions behind it;
+``record_opening_balances`` writes it once as a dated opening ADJUSTMENT.
+Stock-outs recorded before cost lots existed carry a selling price rather
+than a cost; ``restate_legacy_stock_outs`` revalues them once at cost.
+"""
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, update, func, and_, or_
+
+from rate_history import usd_amount_as_of
+from models import (Inventory, StockTransaction, StockSnapshot, TransactionType, StockChangeReason, CostLayer,
+                    Currency)
+
+
+def _latest_snapshots(as_of):
+    """Subquery with each item's most recent snapshot taken at or before as_of"""
+    latest = (
+        select(StockSnapshot.inventory_id, func.max(StockSnapshot.snapshot_date).label('snapshot_date'))
+        .where(StockSnapshot.snapshot_date <= as_of)
+        .group_by(StockSnapshot.inventory_id)
+        .subquery()
+    )
+    return (
+        select(StockSnapshot.inventory_id, StockSnapshot.snapshot_date,
+               StockSnapshot.quantity, StockSnapshot.total_value)
+        .join(latest, and_(StockSnapshot.inventory_id == latest.c.inventory_id,
+                           StockSnapshot.snapshot_date == latest.c.snapshot_date))
+        .subquery()
+    )
+
+
+def stock_levels_at(session, as_of=None, inventory_ids=None):
+    """Return {inventory_id: (quantity, value)} as of the given datetime.
+
+    ``as_of=None`` means "now", i.e. every transaction recorded so far.
+    Values are in USD at the rate in effect on each transaction's date.
+    """
+    as_of = as_of or datetime.utcnow()
+    snapshots = _latest_snapshots(as_of)
+
+    snapshot_query = select(snapshots.c.inventory_id, snapshots.c.quantity, snapshots.c.total_value)
+    delta_query = (
+        select(StockTransaction.inventory_id,
+               func.coalesce(func.sum(StockTransaction.quantity), 0),
+               func.coalesce(func.sum(usd_amount_as_of(StockTransaction.total_value, StockTransaction.currency,
+                                                       StockTransaction.date_created)), 0.0))
+        .outerjoin(snapshots, snapshots.c.inventory_id == StockTransaction.inventory_id)
+        .where(StockTransaction.inventory_id.isnot(None),
+               StockTransaction.date_created <= as_of,
+               or_(snapshots.c.snapshot_date.is_(None),
+                   StockTransaction.date_created > snapshots.c.snapshot_date))
+        .group_by(StockTransaction.inventory_id)
+    )
+    if inventory_ids is not None:
+        snapshot_query = snapshot_query.where(snapshots.c.inventory_id.in_(inventory_ids))
+        delta_query = delta_query.where(StockTransaction.inventory_id.in_(inventory_ids))
+
+    levels = {}
+    for inventory_id, quantity, value in session.execute(snapshot_query):
+        levels[inventory_id] = (quantity or 0, value or 0.0)
+    for inventory_id, quantity, value in session.execute(delta_query):
+        base_quantity, base_value = levels.get(inventory_id, (0, 0.0))
+        levels[inventory_id] = (base_quantity + int(quantity), base_value + float(value))
+    return levels
+
+
+def stock_at(session, inventory_id, as_of=None):
+    """Quantity of one item on hand at the given datetime"""
+    return stock_levels_at(session, as_of, [inventory_id]).get(inventory_id, (0, 0.0))[0]
+
+
+def valuation_at(session, as_of=None):
+    """Total stock value across all items at the given datetime"""
+    return sum(value for _, value in stock_levels_at(session, as_of).values())
+
+
+def create_checkpoint(session, as_of=None):
+    """Write a snapshot row for every item with ledger activity up to as_of.
+
+    The caller commits. Returns the number of snapshots written.
+    """
+    as_of = as_of or datetime.utcnow()
+    levels = stock_levels_at(session, as_of)
+    for inventory_id, (quantity, value) in levels.items():
+        session.add(StockSnapshot(
+            inventory_id=inventory_id,
+            snapshot_date=as_of,
+            quantity=quantity,
+            total_value=value
+        ))
+    return len(levels)
+
+
+def reconcile(session):
+    """Compare Inventory.quantity with the ledger and return the items that drifted"""
+    levels = stock_levels_at(session)
+    drift = []
+    for item_id, name, counter in session.query(Inventory.id, Inventory.name, Inventory.quantity):
+        ledger_quantity = levels.get(item_id, (0, 0.0))[0]
+        counter = counter or 0
+        if counter != ledger_quantity:
+            drift.append({
+                'inventory_id': item_id,
+                'name': name,
+                'inventory_quantity': counter,
+                'ledger_quantity': ledger_quantity,
+                'difference': counter - ledger_quantity
+            })
+    return drift
+
+
+def record_opening_balances(session):
+    """Write an opening ADJUSTMENT for every item whose counter is above its ledger.
+
+    The opening row is dated just before the item's first ledger movement
+    (its creation date when it has none), so stock as of any earlier date
+    includes it too. Snapshots taken since then are raised by the same amount.
+    Items below their ledger are left alone: that drift is not missing opening
+    stock. The caller commits. Returns the opening rows written.
+    """
+    first_movements = dict(session.execute(
+        select(StockTransaction.inventory_id, func.min(StockTransaction.date_created))
+        .where(StockTransaction.inventory_id.isnot(None))
+        .group_by(StockTransaction.inventory_id)
+    ).all())
+    written = []
+    for row in reconcile(session):
+        if row['difference'] <= 0:
+            continue
+        item = session.get(Inventory, row['inventory_id'])
+        first = first_movements.get(item.id)
+        opened_at = first - timedelta(seconds=1) if first else (item.date_created or datetime.utcnow())
+        quantity = row['difference']
+        # Same basis as the opening cost lot cost_layers opens on an item's first movement
+        unit_cost = item.unit_price or 0.0
+        opening = StockTransaction(
+            inventory_id=item.id,
+            transaction_type=TransactionType.ADJUSTMENT,
+            quantity=quantity,
+            unit_price=unit_cost,
+            total_value=quantity * unit_cost,
+            reason=StockChangeReason.ADJUSTMENT,
+            reference_type='opening_balance',
+            notes='Opening balance (stock held before the ledger began)',
+            date_created=opened_at
+        )
+        session.add(opening)
+        _shift_snapshots(session, item.id, opened_at, quantity, quantity * unit_cost)
+        written.append(opening)
+    return written
+
+
+def _shift_snapshots(session, inventory_id, since, quantity=0, value=0.0):
+    """Add a correction to every snapshot of an item taken at or after since"""
+    session.execute(
+        update(StockSnapshot)
+        .where(StockSnapshot.inventory_id == inventory_id, StockSnapshot.snapshot_date >= since)
+        .values(quantity=StockSnapshot.quantity + quantity,
+                total_value=StockSnapshot.total_value + value)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def restate_legacy_stock_outs(session):
+    """Revalue STOCK_OUT rows written before cost tracking at cost.
+
+    Those rows carry the selling price (invoices) or the unit price, while
+    later ones carry COGS from the cost lots. A row is legacy when it is older
+    than its item's first cost lot; it is restated at that lot's unit cost,
+    or at the item's unit price when the item has no lots yet. Invoice lines
+    still hold the selling prices. Snapshots taken since are corrected by the
+    same amount, and a second run changes nothing. The caller commits.
+    Returns (rows restated, total change in value).
+    """
+    first_ids = (
+        select(func.min(CostLayer.id).label('id'))
+        .group_by(CostLayer.inventory_id)
+        .subquery()
+    )
+    first_lots = (
+        select(CostLayer.inventory_id, CostLayer.date_received, CostLayer.unit_cost)
+        .join(first_ids, CostLayer.id == first_ids.c.id)
+        .subquery()
+    )
+    legacy = session.execute(
+        select(StockTransaction, func.coalesce(first_lots.c.unit_cost, Inventory.unit_price, 0.0))
+        .join(Inventory, Inventory.id == StockTransaction.inventory_id)
+        .outerjoin(first_lots, first_lots.c.inventory_id == StockTransaction.inventory_id)
+        .where(StockTransaction.transaction_type == TransactionType.STOCK_OUT,
+               or_(first_lots.c.date_received.is_(None),
+                   StockTransaction.date_created < first_lots.c.date_received))
+    ).all()
+
+    restated, change = 0, 0.0
+    for row, unit_cost in legacy:
+        value = row.quantity * unit_cost
+        difference = value - (row.total_value or 0.0)
+        if abs(difference) < 1e-9 and row.currency in (None, Currency.USD):
+            continue
+        row.unit_price = unit_cost
+        row.total_value = value
+        row.currency = Currency.USD
+        _shift_snapshots(session, row.inventory_id, row.date_created, value=difference)
+        restated += 1
+        change += difference
+    return restated, change
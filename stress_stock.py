@@ -0,0 +1,136 @@
+"""Concurrency stress test for inventory_service.
+
+Runs many threads selling the same item at once and checks that stock never
+goes negative and that every successful sale has exactly one STOCK_OUT row.
+Then sells the item on several lines of one invoice and checks that the cost
+tracking quantity still equals Inventory.quantity.
+
+Usage:
+    python stress_stock.py [--threads 16] [--sales 50] [--stock 500]
+
+Uses a throwaway SQLite file unless DATABASE_URL is already set (point it at
+a scratch Postgres database to exercise row locking there).
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+
+if not os.environ.get('DATABASE_URL'):
+    _tmp_dir = tempfile.mkdtemp(prefix='giebee_stress_')
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(_tmp_dir, 'stress.db')}"
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import func
+from sqlalchemy.orm import sessionmaker
+
+from database import engine, init_db, db_session
+from models import Inventory, InventoryCost, StockTransaction, TransactionType
+from inventory_service import add_stock, remove_stock, InsufficientStockError
+
+Session = sessionmaker(bind=engine)
+
+
+def seed(initial_stock):
+    session = Session()
+    item = Inventory(name='Stress Test Panel', quantity=initial_stock, unit_price=10.0)
+    session.add(item)
+    session.commit()
+    item_id = item.id
+    session.close()
+    return item_id
+
+
+def worker(item_id, sales, results, lock):
+    session = Session()
+    sold = failed = errors = 0
+    for _ in range(sales):
+        try:
+            remove_stock(session, item_id, 1, reference_type='stress_test')
+            session.commit()
+            sold += 1
+        except InsufficientStockError:
+            session.rollback()
+            failed += 1
+        except Exception as e:
+            # e.g. "database is locked" on SQLite under heavy contention
+            session.rollback()
+            errors += 1
+            print(f"Worker error: {e}")
+    session.close()
+    with lock:
+        results['sold'] += sold
+        results['rejected'] += failed
+        results['errors'] += errors
+
+
+def multi_line_sale(item_id, lines=(2, 3)):
+    """Sell the item on several lines of one transaction, as an invoice does,
+    through db_session (autoflush off, like the views). Returns (inventory
+    quantity, tracked cost quantity) afterwards."""
+    try:
+        for quantity in lines:
+            remove_stock(db_session, item_id, quantity, reference_type='stress_test')
+        db_session.commit()
+    except InsufficientStockError:
+        db_session.rollback()
+    finally:
+        db_session.remove()
+    session = Session()
+    quantities = (session.get(Inventory, item_id).quantity, session.get(InventoryCost, item_id).quantity)
+    session.close()
+    return quantities
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Concurrent stock-out stress test')
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--sales', type=int, default=50, help='stock-out attempts per thread')
+    parser.add_argument('--stock', type=int, default=500, help='initial quantity (less than threads * sales to force contention)')
+    args = parser.parse_args()
+
+    init_db()
+    item_id = seed(args.stock)
+
+    results = {'sold': 0, 'rejected': 0, 'errors': 0}
+    lock = threading.Lock()
+    threads = [threading.Thread(target=worker, args=(item_id, args.sales, results, lock))
+               for _ in range(args.threads)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    session = Session()
+    final_quantity = session.get(Inventory, item_id).quantity
+    recorded = session.query(func.count(StockTransaction.id)).filter(
+        StockTransaction.inventory_id == item_id,
+        StockTransaction.transaction_type == TransactionType.STOCK_OUT
+    ).scalar()
+    session.close()
+
+    print(f"Database: {engine.url}")
+    print(f"Attempts: {args.threads * args.sales}, sold: {results['sold']}, "
+          f"rejected: {results['rejected']}, errors: {results['errors']}")
+    print(f"Initial stock: {args.stock}, final stock: {final_quantity}, STOCK_OUT rows: {recorded}")
+
+    # Restock, then sell on two lines of one invoice
+    session = Session()
+    add_stock(session, item_id, 10, unit_price=10.0)
+    session.commit()
+    session.close()
+    on_hand, tracked = multi_line_sale(item_id)
+    print(f"After a two-line sale: stock {on_hand}, tracked cost quantity {tracked}")
+
+    ok = (final_quantity >= 0
+          and final_quantity == args.stock - results['sold']
+          and recorded == results['sold']
+          and on_hand == tracked)
+    print('PASS' if ok else 'FAIL: stock, transaction log and cost tracking disagree')
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,99 @@
+"""Jinja environment setup and compiled-template cache.
+
+Templates are compiled to Python bytecode once, at build time
+(``python precompile_templates.py``), into ``instance/jinja_cache``.
+Gunicorn workers and serverless cold starts then load the compiled code
+instead of parsing every template on its first request. Override the
+directory with ``TEMPLATE_CACHE_DIR``.
+
+``{% cache %}`` caches rendered fragments keyed on table data versions::
+
+    {% cache 'dashboard:cards', 300, 'suppliers', 'customers' %}
+        ...
+    {% endcache %}
+
+The fragment is re-rendered once the TTL expires or any listed table is
+written to. Add anything else the fragment depends on (e.g. the selected
+period) to the key. Caching is skipped while templates auto-reload (debug).
+"""
+import os
+
+from jinja2 import FileSystemBytecodeCache, TemplateSyntaxError, nodes
+from jinja2.ext import Extension
+from markupsafe import Markup
+
+
+class BuildBytecodeCache(FileSystemBytecodeCache):
+    """FileSystemBytecodeCache that survives read-only and relocated deploys"""
+
+    def get_cache_key(self, name, filename=None):
+        # The stock key includes the absolute template path, which differs
+        # between the build directory and the runtime one on some hosts.
+        # Template names are unique, and the source checksum stored with the
+        # bytecode still catches edited templates.
+        return super().get_cache_key(name)
+
+    def dump_bytecode(self, bucket):
+        try:
+            super().dump_bytecode(bucket)
+        except OSError:
+            # Read-only filesystem: keep serving from the compiled template in memory
+            pass
+
+
+class FragmentCacheExtension(Extension):
+    """{% cache key, ttl, *tables %} ... {% endcache %}"""
+
+    tags = {'cache'}
+
+    def parse(self, parser):
+        token = next(parser.stream)
+        args = [parser.parse_expression()]
+        while parser.stream.skip_if('comma'):
+            args.append(parser.parse_expression())
+        body = parser.parse_statements(('name:endcache',), drop_needle=True)
+        # Template name and line keep identical keys in different places apart
+        location = nodes.Const(f'{parser.name}:{token.lineno}')
+        return nodes.CallBlock(self.call_method('_render', [location, nodes.List(args)]),
+                               [], [], body).set_lineno(token.lineno)
+
+    def _render(self, location, args, caller):
+        if self.environment.auto_reload:
+            return caller()
+
+        from cache import get_or_set_versioned
+
+        key, ttl, *tables = args
+        return Markup(get_or_set_versioned(f'fragment:{location}:{key}', tables, lambda: str(caller()), ttl))
+
+
+def cache_directory(app):
+    return os.environ.get('TEMPLATE_CACHE_DIR') or os.path.join(app.instance_path, 'jinja_cache')
+
+
+def configure_templates(app):
+    """Apply the app's Jinja options. Must run before app.jinja_env is first used,
+    and is shared with the build script so precompiled bytecode matches."""
+    directory = cache_directory(app)
+    try:
+        os.makedirs(directory, exist_ok=True)
+    except OSError:
+        pass
+    app.jinja_options = {
+        **app.jinja_options,
+        'bytecode_cache': BuildBytecodeCache(directory),
+        'extensions': [*app.jinja_options.get('extensions', ()), FragmentCacheExtension],
+    }
+
+
+def precompile_templates(app):
+    """Compile every template into the bytecode cache.
+    Returns (compiled names, {name: error} for templates that fail to compile)."""
+    compiled, errors = [], {}
+    for name in app.jinja_env.list_templates(extensions=['html']):
+        try:
+            app.jinja_env.get_template(name)
+            compiled.append(name)
+        except TemplateSyntaxError as e:
+            errors[name] = f'line {e.lineno}: {e.message}'
+    return compiled, errors
@@ -0,0 +1,11 @@
+"""Route blueprints, one per business area. Registered by application.create_app()."""
+from views.dashboard import bp as dashboard
+from views.inventory import bp as inventory
+from views.sales import bp as sales
+from views.activities import bp as activities
+from views.finance import bp as finance
+from views.fleet import bp as fleet
+from views.locations import bp as locations
+from views.monitoring import bp as monitoring
+
+BLUEPRINTS = (dashboard, inventory, sales, activities, finance, fleet, locations, monitoring)
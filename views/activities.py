@@ -0,0 +1,116 @@
+"""Company activity and activity type routes"""
+from datetime import datetime
+
+from flask import Blueprint, render_template, request, redirect, url_for, flash
+
+from models import Activity, ActivityType
+from database import db_session
+from db_routing import read_only
+from reference_data import customer_options, activity_type_options
+
+bp = Blueprint('activities', __name__)
+
+
+@bp.route('/activities')
+@read_only
+def activities():
+    """List company activities"""
+    from rate_history import get_rate_history
+
+    activities = db_session.query(Activity).order_by(Activity.date.desc()).all()
+    # Costs in USD at the rate in effect on each activity's date
+    history = get_rate_history()
+    usd_costs = {activity.id: history.to_usd(activity.total_cost, activity.currency, activity.date)
+                 for activity in activities}
+    return render_template('activities.html', activities=activities, usd_costs=usd_costs)
+
+@bp.route('/activities/add', methods=['GET', 'POST'])
+def add_activity():
+    """Add new activity"""
+    if request.method == 'POST':
+        from models import ActivityStatusEnum, Currency
+        activity = Activity(
+            customer_id=int(request.form['customer_id']),
+            activity_type_id=int(request.form['activity_type_id']),
+            description=request.form['description'],
+            status=ActivityStatusEnum(request.form['status']),
+            date=datetime.strptime(request.form['date'], '%Y-%m-%d').date(),
+            currency=Currency.USD
+        )
+        db_session.add(activity)
+        db_session.commit()
+        flash('Activity added successfully!', 'success')
+        return redirect(url_for('activities.activities'))
+
+    customers = customer_options(db_session)
+    activity_types = activity_type_options(db_session)
+    return render_template('add_activity.html', customers=customers, activity_types=activity_types)
+
+@bp.route('/activity_types')
+@read_only
+def activity_types():
+    """List all activity types"""
+    activity_types = db_session.query(ActivityType).all()
+    return render_template('activity_types.html', activity_types=activity_types)
+
+@bp.route('/activity_types/add', methods=['GET', 'POST'])
+def add_activity_type():
+    """Add new activity type"""
+    if request.method == 'POST':
+        activity_type = ActivityType(
+            name=request.form['name'],
+            description=request.form['description'],
+            is_active=True
+        )
+        db_session.add(activity_type)
+        db_session.commit()
+        flash('Activity type added successfully!', 'success')
+        return redirect(url_for('activities.activity_types'))
+    return render_template('add_activity_type.html')
+
+@bp.route('/activities/edit/<int:activity_id>', methods=['GET', 'POST'])
+def edit_activity(activity_id):
+    """Edit activity"""
+    activity = db_session.query(Activity).get(activity_id)
+    if not activity:
+        flash('Activity not found!', 'error')
+        return redirect(url_for('activities.activities'))
+
+    if request.method == 'POST':
+        from models import ActivityStatusEnum
+        activity.customer_id = int(request.form['customer_id'])
+        activity.activity_type_id = int(request.form['activity_type_id'])
+        activity.description = request.form['description']
+        activity.status = ActivityStatusEnum(request.form['status'])
+        activity.date = datetime.strptime(request.form['date'], '%Y-%m-%d').date()
+        db_session.commit()
+        flash('Activity updated successfully!', 'success')
+        return redirect(url_for('activities.activities'))
+
+    customers = customer_options(db_session)
+    activity_types = activity_type_options(db_session)
+    return render_template('edit_activity.html', activity=activity, customers=customers, activity_types=activity_types)
+
+@bp.route('/activities/delete/<int:activity_id>', methods=['POST'])
+def delete_activity(activity_id):
+    """Delete activity"""
+    activity = db_session.query(Activity).get(activity_id)
+    if activity:
+        db_session.delete(activity)
+        db_session.commit()
+        flash('Activity deleted successfully!', 'success')
+    else:
+        flash('Activity not found!', 'error')
+    return redirect(url_for('activities.activities'))
+
+@bp.route('/activity_types/delete/<int:type_id>', methods=['POST'])
+def delete_activity_type(type_id):
+    """Delete activity type"""
+    activity_type = db_session.query(ActivityType).get(type_id)
+    if activity_type:
+        db_session.delete(activity_type)
+        db_session.commit()
+        flash('Activity type deleted successfully!', 'success')
+    else:
+        flash('Activity type not found!', 'error')
+    return redirect(url_for('activities.activity_types'))
@@ -0,0 +1,25 @@
+"""Dashboard route"""
+from flask import Blueprint, render_template
+
+from database import db_session
+from db_routing import read_only
+from dashboard_counters import dashboard_counts
+
+bp = Blueprint('dashboard', __name__)
+
+
+@bp.route('/')
+@read_only
+def index():
+    """Dashboard showing overview of activities and key metrics"""
+    from low_stock import low_stock_count
+
+    # Get counts for dashboard (cached, invalidated on insert/delete)
+    counts = dashboard_counts(db_session)
+
+    reorder_count = low_stock_count(db_session)
+
+    # The location chart loads from /api/v1/charts/locations
+    return render_template('dashboard.html',
+                         reorder_count=reorder_count,
+                         **counts)
@@ -0,0 +1,225 @@
+"""Financial dashboard, records, statements and chart data routes"""
+from datetime import datetime
+
+import sqlalchemy as db
+from flask import Blueprint, render_template, request, jsonify, redirect, url_for, flash, send_file, abort
+
+from models import FinancialRecord, FinancialCategory, FuelRecord, FinancialType
+from database import db_session
+from db_routing import read_only
+import chart_data
+from chart_data import month_range, period_totals
+from conditional import conditional
+
+bp = Blueprint('finance', __name__)
+
+# Years the reports and charts accept; anything else is a bad request, not a 500
+REPORT_YEARS = range(1970, 2101)
+
+
+def check_period(year, month):
+    """Abort with 400 unless year and month (either may be None) are in range"""
+    if (year is not None and year not in REPORT_YEARS) or (month is not None and not 1 <= month <= 12):
+        abort(400)
+
+
+@bp.route('/financial')
+@read_only
+def financial():
+    """Financial dashboard"""
+    # Get month and year from query parameters
+    selected_year, selected_month = chart_period()
+
+    # Calculate totals for selected period; chart series load from /api/v1/charts
+    start_date, end_date = month_range(selected_year, selected_month)
+    totals = period_totals(db_session, start_date, end_date)
+    total_sales = totals['total_sales']
+    total_income = totals['total_income']
+    total_expenses = totals['total_expenses']
+    cogs = totals['cogs']
+
+    inventory_losses = db_session.query(db.func.sum(FinancialRecord.amount)).filter(
+        FinancialRecord.category == 'Inventory Loss',
+        FinancialRecord.date >= start_date,
+        FinancialRecord.date < end_date
+    ).scalar() or 0
+
+    total_fuel_cost = db_session.query(db.func.sum(FuelRecord.total_cost)).filter(
+        FuelRecord.date >= start_date,
+        FuelRecord.date < end_date
+    ).scalar() or 0
+
+    profit = (total_sales + total_income) - (total_expenses + abs(cogs))
+
+    # Recent transactions
+    recent_transactions = db_session.query(FinancialRecord).filter(
+        FinancialRecord.date >= start_date,
+        FinancialRecord.date < end_date
+    ).order_by(FinancialRecord.date.desc()).limit(10).all()
+
+    # Inventory turnover (COGS / Inventory value at cost)
+    from cost_layers import inventory_valuation
+    inventory_value = inventory_valuation(db_session)
+    inventory_turnover = abs(cogs) / inventory_value if inventory_value > 0 else 0
+
+    return render_template('financial.html',
+                         total_sales=total_sales,
+                         total_expenses=total_expenses,
+                         total_income=total_income,
+                         profit=profit,
+                         recent_transactions=recent_transactions,
+                         selected_month=selected_month,
+                         selected_year=selected_year,
+                         cogs=cogs,
+                         inventory_losses=inventory_losses,
+                         total_fuel_cost=total_fuel_cost,
+                         inventory_turnover=inventory_turnover)
+
+def chart_period(default_to_now=True):
+    """(year, month) from the query string, defaulting to the current month.
+    Aborts with 400 when either is out of range."""
+    now = datetime.now()
+    year = request.args.get('year', now.year if default_to_now else None, type=int)
+    month = request.args.get('month', now.month if default_to_now else None, type=int)
+    check_period(year, month)
+    return year, month
+
+@bp.route('/api/v1/charts/locations')
+@conditional(*chart_data.LOCATION_TABLES)
+@read_only
+def chart_locations():
+    """Top locations; all time unless year and month are given"""
+    return jsonify(chart_data.location_chart(db_session, *chart_period(default_to_now=False)))
+
+@bp.route('/api/v1/charts/monthly')
+@conditional(*chart_data.MONTHLY_TABLES)
+@read_only
+def chart_monthly():
+    """Revenue and expenses per month of a year"""
+    return jsonify(chart_data.monthly_chart(db_session, chart_period()[0]))
+
+@bp.route('/api/v1/charts/item-profits')
+@conditional(*chart_data.ITEM_PROFIT_TABLES)
+@read_only
+def chart_item_profits():
+    """Top items by profit for a month"""
+    return jsonify(chart_data.item_profit_chart(db_session, *chart_period()))
+
+@bp.route('/api/v1/charts/profit-breakdown')
+@conditional(*chart_data.BREAKDOWN_TABLES)
+@read_only
+def chart_profit_breakdown():
+    """Profit/loss components for a month"""
+    return jsonify(chart_data.profit_breakdown_chart(db_session, *chart_period()))
+
+@bp.route('/financial/add', methods=['GET', 'POST'])
+def add_financial_record():
+    """Add financial record"""
+    if request.method == 'POST':
+        from models import FinancialType
+        record = FinancialRecord(
+            type=FinancialType(request.form['type']),
+            category=request.form['category'],
+            description=request.form['description'],
+            amount=float(request.form['amount']),
+            date=datetime.strptime(request.form['date'], '%Y-%m-%d').date()
+        )
+        db_session.add(record)
+        db_session.commit()
+        flash('Financial record added successfully!', 'success')
+        return redirect(url_for('finance.financial'))
+    return render_template('add_financial_record.html')
+
+@bp.route('/financial/categories')
+@read_only
+def financial_categories():
+    """Financial categories management"""
+    categories = db_session.query(FinancialCategory).all()
+    return render_template('financial_categories.html', categories=categories)
+
+@bp.route('/financial/categories/add', methods=['GET', 'POST'])
+def add_financial_category():
+    """Add financial category"""
+    if request.method == 'POST':
+        category = FinancialCategory(
+            name=request.form['name'],
+            type=request.form['type'],
+            description=request.form['description']
+        )
+        db_session.add(category)
+        db_session.commit()
+        flash('Financial category added successfully!', 'success')
+        return redirect(url_for('finance.financial_categories'))
+    return render_template('add_financial_category.html')
+
+@bp.route('/financial/generate_income_statement/<int:month>/<int:year>')
+@conditional('payments', 'financial_records', 'stock_transactions', 'exchange_rates')
+@read_only
+def generate_income_statement(month, year):
+    """Generate income statement PDF"""
+    from pdf_reports import income_statement_pdf
+
+    check_period(year, month)
+    start_date, end_date = month_range(year, month)
+    totals = period_totals(db_session, start_date, end_date)
+    buffer = income_statement_pdf(start_date, **totals)
+
+    return send_file(
+        buffer,
+        as_attachment=True,
+        download_name=f'income_statement_{month}_{year}.pdf',
+        mimetype='application/pdf'
+    )
+
+@bp.route('/financial/generate_balance_sheet/<int:month>/<int:year>')
+@conditional('financial_records', 'inventory', 'inventory_costs')
+@read_only
+def generate_balance_sheet(month, year):
+    """Generate balance sheet PDF"""
+    from cost_layers import inventory_valuation
+    from pdf_reports import balance_sheet_pdf
+
+    check_period(year, month)
+    start_date, end_date = month_range(year, month)
+
+    # Inventory valued at cost from the cost layers
+    total_assets = inventory_valuation(db_session)
+
+    total_liabilities = db_session.query(db.func.sum(FinancialRecord.amount)).filter(
+        FinancialRecord.type == FinancialType.EXPENSE,
+        FinancialRecord.category.in_(['Loan', 'Credit', 'Liability']),
+        FinancialRecord.date <= end_date
+    ).scalar() or 0
+
+    buffer = balance_sheet_pdf(start_date, total_assets, total_liabilities)
+
+    return send_file(
+        buffer,
+        as_attachment=True,
+        download_name=f'balance_sheet_{month}_{year}.pdf',
+        mimetype='application/pdf'
+    )
+
+@bp.route('/financial/delete/<int:record_id>', methods=['POST'])
+def delete_financial_record(record_id):
+    """Delete financial record"""
+    record = db_session.query(FinancialRecord).get(record_id)
+    if record:
+        db_session.delete(record)
+        db_session.commit()
+        flash('Financial record deleted successfully!', 'success')
+    else:
+        flash('Record not found!', 'error')
+    return redirect(url_for('finance.financial'))
+
+@bp.route('/financial/categories/delete/<int:category_id>', methods=['POST'])
+def delete_financial_category(category_id):
+    """Delete financial category"""
+    category = db_session.query(FinancialCategory).get(category_id)
+    if category:
+        db_session.delete(category)
+        db_session.commit()
+        flash('Financial category deleted successfully!', 'success')
+    else:
+        flash('Financial category not found!', 'error')
+    return redirect(url_for('finance.financial_categories'))
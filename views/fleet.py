@@ -0,0 +1,133 @@
+"""Fuel, mileage and journey tracking routes"""
+from datetime import datetime
+
+from flask import Blueprint, render_template, request, redirect, url_for, flash
+
+from models import FuelRecord, MileageRecord, JourneyRecord
+from database import db_session
+from db_routing import read_only
+
+bp = Blueprint('fleet', __name__)
+
+
+@bp.route('/fuel_tracking')
+@read_only
+def fuel_tracking():
+    """Fuel tracking dashboard"""
+    fuel_records = db_session.query(FuelRecord).order_by(FuelRecord.date.desc()).all()
+
+    # Calculate totals
+    total_fuel_cost = sum(record.total_cost for record in fuel_records) if fuel_records else 0
+    total_liters = sum(record.quantity_liters for record in fuel_records) if fuel_records else 0
+
+    return render_template('fuel_tracking.html', fuel_records=fuel_records, total_fuel_cost=total_fuel_cost, total_liters=total_liters)
+
+@bp.route('/mileage_tracking')
+@read_only
+def mileage_tracking():
+    """Mileage tracking dashboard"""
+    mileage_records = db_session.query(MileageRecord).order_by(MileageRecord.date.desc()).all()
+    total_distance = sum(record.distance_km for record in mileage_records) if mileage_records else 0
+    return render_template('mileage_tracking.html', mileage_records=mileage_records, total_distance=total_distance)
+
+@bp.route('/journey_tracking')
+@read_only
+def journey_tracking():
+    """Journey tracking dashboard"""
+    journey_records = db_session.query(JourneyRecord).order_by(JourneyRecord.start_time.desc()).all()
+    return render_template('journey_tracking.html', journey_records=journey_records)
+
+@bp.route('/fuel_tracking/add', methods=['GET', 'POST'])
+def add_fuel_record():
+    """Add new fuel record"""
+    if request.method == 'POST':
+        fuel_record = FuelRecord(
+            date=datetime.strptime(request.form['date'], '%Y-%m-%d').date(),
+            fuel_type=request.form['fuel_type'],
+            quantity_liters=float(request.form['quantity']),
+            price_per_liter=float(request.form['cost']),
+            total_cost=float(request.form['quantity']) * float(request.form['cost']),
+            vehicle_id=request.form['vehicle'],
+            fuel_station=request.form.get('location', ''),
+            notes=request.form.get('notes', '')
+        )
+        db_session.add(fuel_record)
+        db_session.commit()
+        flash('Fuel record added successfully!', 'success')
+        return redirect(url_for('fleet.fuel_tracking'))
+    return render_template('add_fuel_record.html')
+
+@bp.route('/fuel_tracking/delete/<int:fuel_record_id>', methods=['POST'])
+def delete_fuel_record(fuel_record_id):
+    """Delete fuel record"""
+    record = db_session.query(FuelRecord).get(fuel_record_id)
+    if record:
+        db_session.delete(record)
+        db_session.commit()
+        flash('Fuel record deleted successfully!', 'success')
+    else:
+        flash('Fuel record not found!', 'error')
+    return redirect(url_for('fleet.fuel_tracking'))
+
+@bp.route('/mileage_tracking/add', methods=['GET', 'POST'])
+def add_mileage_record():
+    """Add new mileage record"""
+    if request.method == 'POST':
+        mileage_record = MileageRecord(
+            date=datetime.strptime(request.form['date'], '%Y-%m-%d').date(),
+            vehicle_id=request.form['vehicle'],
+            start_odometer=float(request.form['start_mileage']),
+            end_odometer=float(request.form['end_mileage']),
+            distance_km=float(request.form['distance']),
+            notes=request.form.get('notes', '')
+        )
+        db_session.add(mileage_record)
+        db_session.commit()
+        flash('Mileage record added successfully!', 'success')
+        return redirect(url_for('fleet.mileage_tracking'))
+    return render_template('add_mileage_record.html')
+
+@bp.route('/mileage_tracking/delete/<int:mileage_record_id>', methods=['POST'])
+def delete_mileage_record(mileage_record_id):
+    """Delete mileage record"""
+    record = db_session.query(MileageRecord).get(mileage_record_id)
+    if record:
+        db_session.delete(record)
+        db_session.commit()
+        flash('Mileage record deleted successfully!', 'success')
+    else:
+        flash('Mileage record not found!', 'error')
+    return redirect(url_for('fleet.mileage_tracking'))
+
+@bp.route('/journey_tracking/add', methods=['GET', 'POST'])
+def add_journey_record():
+    """Add new journey record"""
+    if request.method == 'POST':
+        journey_record = JourneyRecord(
+            start_time=datetime.strptime(request.form['start_time'], '%Y-%m-%dT%H:%M'),
+            end_time=datetime.strptime(request.form['end_time'], '%Y-%m-%dT%H:%M') if request.form['end_time'] else None,
+            start_location=request.form['start_location'],
+            end_location=request.form['end_location'],
+            total_distance=float(request.form['distance']),
+            vehicle_id=request.form['vehicle'],
+            driver=request.form['driver'],
+            purpose=request.form['purpose'],
+            notes=request.form.get('notes', '')
+        )
+        db_session.add(journey_record)
+        db_session.commit()
+        flash('Journey record added successfully!', 'success')
+        return redirect(url_for('fleet.journey_tracking'))
+    return render_template('add_journey_record.html')
+
+@bp.route('/journey_tracking/delete/<int:journey_record_id>', methods=['POST'])
+def delete_journey_record(journey_record_id):
+    """Delete journey record"""
+    record = db_session.query(JourneyRecord).get(journey_record_id)
+    if record:
+        db_session.delete(record)
+        db_session.commit()
+        flash('Journey record deleted successfully!', 'success')
+    else:
+        flash('Journey record not found!', 'error')
+    return redirect(url_for('fleet.journey_tracking'))
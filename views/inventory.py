@@ -0,0 +1,265 @@
+"""Inventory, supplier and stock movement routes"""
+import sqlalchemy as db
+from flask import Blueprint, render_template, request, jsonify, redirect, url_for, flash
+
+from models import Supplier, Inventory
+from database import db_session
+from db_routing import read_only
+from reference_data import supplier_options, inventory_categories
+from inventory_service import (add_stock, remove_stock, adjust_stock, bulk_add_stock,
+                               InsufficientStockError, ItemNotFoundError)
+from conditional import conditional
+
+bp = Blueprint('inventory', __name__)
+
+
+@bp.route('/suppliers')
+@read_only
+def suppliers():
+    """List all suppliers"""
+    suppliers = db_session.query(Supplier).all()
+    return render_template('suppliers.html', suppliers=suppliers)
+
+@bp.route('/inventory')
+@conditional('inventory', 'suppliers')
+@read_only
+def inventory():
+    """View inventory with search and filter"""
+    search = request.args.get('search', '')
+    category = request.args.get('category', '')
+
+    query = db_session.query(Inventory)
+
+    if search:
+        query = query.filter(
+            db.or_(
+                Inventory.name.contains(search),
+                Inventory.brand.contains(search),
+                Inventory.specifications.contains(search)
+            )
+        )
+
+    if category:
+        query = query.filter(Inventory.category == category)
+
+    items = query.all()
+    categories = inventory_categories(db_session)
+    suppliers = supplier_options(db_session)
+
+    return render_template('inventory.html', items=items, categories=categories, 
+                           search=search, selected_category=category, suppliers=suppliers)
+
+@bp.route('/inventory/reorder')
+@read_only
+def reorder_report():
+    """Low-stock items grouped by supplier"""
+    from low_stock import reorder_report as build_reorder_report
+    groups = build_reorder_report(db_session)
+    return render_template('reorder.html', groups=groups)
+
+@bp.route('/suppliers/add', methods=['GET', 'POST'])
+def add_supplier():
+    """Add new supplier"""
+    if request.method == 'POST':
+        from models import Currency
+        supplier = Supplier(
+            name=request.form['name'],
+            contact_person=request.form['contact_person'],
+            phone=request.form['phone'],
+            email=request.form['email'],
+            address=request.form['address'],
+            payment_terms=request.form['payment_terms'],
+            currency=Currency(request.form['currency']) if request.form['currency'] else Currency.USD
+        )
+        db_session.add(supplier)
+        db_session.commit()
+        flash('Supplier added successfully!', 'success')
+        return redirect(url_for('inventory.suppliers'))
+    return render_template('add_supplier.html')
+
+@bp.route('/inventory/add', methods=['GET', 'POST'])
+def add_inventory():
+    """Add new inventory item"""
+    if request.method == 'POST':
+        item = Inventory(
+            name=request.form['name'],
+            brand=request.form['brand'],
+            category=request.form['category'],
+            specifications=request.form['specifications'],
+            quantity=0,
+            unit_price=float(request.form['unit_price']),
+            supplier_id=int(request.form['supplier_id']) if request.form['supplier_id'] else None
+        )
+        db_session.add(item)
+        db_session.flush()
+
+        # Initial stock goes through the ledger so it opens a cost lot
+        quantity = int(request.form['quantity'])
+        if quantity:
+            add_stock(db_session, item.id, quantity, unit_price=item.unit_price,
+                      notes=f'Initial stock for {item.name}')
+        db_session.commit()
+
+        flash('Inventory item added successfully!', 'success')
+        return redirect(url_for('inventory.inventory'))
+    suppliers = supplier_options(db_session)
+    return render_template('add_inventory.html', suppliers=suppliers)
+
+@bp.route('/inventory/edit/<int:inventory_id>', methods=['GET', 'POST'])
+def edit_inventory(inventory_id):
+    """Edit inventory item"""
+    item = db_session.query(Inventory).get(inventory_id)
+    if not item:
+        flash('Inventory item not found!', 'error')
+        return redirect(url_for('inventory.inventory'))
+    
+    if request.method == 'POST':
+        # Quantity changes go through the ledger before the other fields are edited
+        adjust_stock(db_session, item.id, int(request.form['quantity']),
+                     notes=f'Manual adjustment of {item.name}')
+        item.name = request.form['name']
+        item.brand = request.form['brand']
+        item.category = request.form['category']
+        item.specifications = request.form['specifications']
+        item.unit_price = float(request.form['unit_price'])
+        item.supplier_id = int(request.form['supplier_id']) if request.form['supplier_id'] else None
+        
+        db_session.commit()
+        flash('Inventory item updated successfully!', 'success')
+        return redirect(url_for('inventory.inventory'))
+    
+    suppliers = supplier_options(db_session)
+    return render_template('edit_inventory.html', item=item, suppliers=suppliers)
+
+@bp.route('/inventory/stock_in', methods=['POST'])
+def stock_in():
+    """Add stock to inventory item"""
+    item_id = int(request.form['item_id'])
+
+    try:
+        quantity = int(request.form['quantity'])
+        unit_price = float(request.form['unit_price'])
+        notes = request.form.get('notes', '')
+
+        # Atomic quantity update + stock transaction
+        item = add_stock(db_session, item_id, quantity, unit_price=unit_price, update_price=True, notes=notes)
+        db_session.commit()
+
+        flash(f'Stock added successfully! New quantity: {item.quantity}', 'success')
+    except ItemNotFoundError:
+        db_session.rollback()
+        flash('Item not found!', 'error')
+    except Exception as e:
+        db_session.rollback()
+        flash(f'Error adding stock: {str(e)}', 'error')
+
+    return redirect(url_for('inventory.inventory'))
+
+@bp.route('/inventory/stock_out', methods=['POST'])
+def stock_out():
+    """Remove stock from inventory item"""
+    item_id = int(request.form['item_id'])
+
+    try:
+        quantity = int(request.form['quantity'])
+        reason = request.form['reason']
+        customer_name = request.form.get('customer_name', '')
+        notes = request.form.get('notes', '')
+
+        # Atomic conditional decrement + stock transaction
+        from models import StockChangeReason
+        item = remove_stock(db_session, item_id, quantity,
+                            reason=StockChangeReason(reason),
+                            customer_name=customer_name,
+                            notes=notes)
+        db_session.commit()
+
+        flash(f'Stock removed successfully! New quantity: {item.quantity}', 'success')
+    except ItemNotFoundError:
+        db_session.rollback()
+        flash('Item not found!', 'error')
+    except InsufficientStockError as e:
+        db_session.rollback()
+        flash(f'Insufficient stock! Available: {e.available}', 'error')
+    except Exception as e:
+        db_session.rollback()
+        flash(f'Error removing stock: {str(e)}', 'error')
+
+    return redirect(url_for('inventory.inventory'))
+
+@bp.route('/inventory/receive', methods=['POST'])
+def receive_goods():
+    """Receive a whole supplier delivery from a CSV/XLSX upload or a JSON list of lines"""
+    from goods_received import read_upload, read_json, validate_lines
+
+    wants_json = request.is_json or request.accept_mimetypes.best == 'application/json'
+
+    def respond(body, status):
+        if wants_json:
+            return jsonify(body), status
+        if body.get('errors'):
+            details = '; '.join(f"line {e['line']}: {e['error']}" if e.get('line') else e['error']
+                                for e in body['errors'][:5])
+            more = f" (+{len(body['errors']) - 5} more)" if len(body['errors']) > 5 else ''
+            flash(f'Delivery not received. {details}{more}', 'error')
+        else:
+            flash(f"Delivery received: {body['received']} line(s) added to stock.", 'success')
+        return redirect(url_for('inventory.inventory'))
+
+    try:
+        if request.is_json:
+            payload = request.get_json()
+            lines = read_json(payload)
+            options = payload if isinstance(payload, dict) else {}
+        else:
+            upload = request.files.get('file')
+            if not upload or not upload.filename:
+                raise ValueError('No delivery file uploaded')
+            lines = read_upload(upload)
+            options = request.form
+        supplier_id = int(options['supplier_id']) if options.get('supplier_id') else None
+        notes = options.get('notes') or 'Goods received'
+    except ValueError as e:
+        return respond({'received': 0, 'errors': [{'line': None, 'error': str(e)}]}, 400)
+
+    if not lines:
+        return respond({'received': 0, 'errors': [{'line': None, 'error': 'Delivery has no lines'}]}, 400)
+
+    valid, errors = validate_lines(db_session, lines)
+    if errors:
+        return respond({'received': 0, 'errors': errors}, 422)
+
+    try:
+        supplier = db_session.query(Supplier).get(supplier_id) if supplier_id else None
+        received = bulk_add_stock(db_session, valid, reference_id=supplier_id, notes=notes,
+                                  currency=supplier.currency if supplier else None)
+        db_session.commit()
+    except Exception as e:
+        db_session.rollback()
+        return respond({'received': 0, 'errors': [{'line': None, 'error': str(e)}]}, 500)
+
+    return respond({'received': received, 'lines': valid, 'errors': []}, 200)
+
+@bp.route('/suppliers/delete/<int:supplier_id>', methods=['POST'])
+def delete_supplier(supplier_id):
+    """Delete supplier"""
+    supplier = db_session.query(Supplier).get(supplier_id)
+    if supplier:
+        db_session.delete(supplier)
+        db_session.commit()
+        flash('Supplier deleted successfully!', 'success')
+    else:
+        flash('Supplier not found!', 'error')
+    return redirect(url_for('inventory.suppliers'))
+
+@bp.route('/inventory/delete/<int:inventory_id>', methods=['POST'])
+def delete_inventory(inventory_id):
+    """Delete inventory item"""
+    item = db_session.query(Inventory).get(inventory_id)
+    if item:
+        db_session.delete(item)
+        db_session.commit()
+        flash('Inventory item deleted successfully!', 'success')
+    else:
+        flash('Inventory item not found!', 'error')
+    return redirect(url_for('inventory.inventory'))
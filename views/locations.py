@@ -0,0 +1,86 @@
+"""Location and pricing routes"""
+from datetime import datetime
+
+from flask import Blueprint, render_template, request, redirect, url_for, flash
+
+from models import Location, Pricing
+from database import db_session
+from db_routing import read_only
+
+bp = Blueprint('locations', __name__)
+
+
+@bp.route('/locations')
+@read_only
+def locations():
+    """List all locations"""
+    locations = db_session.query(Location).all()
+    return render_template('locations.html', locations=locations)
+
+@bp.route('/pricing')
+@read_only
+def pricing():
+    """Pricing dashboard"""
+    pricing_records = db_session.query(Pricing).all()
+    return render_template('pricing.html', pricing_records=pricing_records)
+
+@bp.route('/locations/add', methods=['GET', 'POST'])
+def add_location():
+    """Add new location"""
+    if request.method == 'POST':
+        location = Location(
+            name=request.form['name'],
+            address=request.form['address'],
+            latitude=float(request.form['latitude']) if request.form['latitude'] else None,
+            longitude=float(request.form['longitude']) if request.form['longitude'] else None,
+            notes=request.form.get('notes', '')
+        )
+        db_session.add(location)
+        db_session.commit()
+        flash('Location added successfully!', 'success')
+        return redirect(url_for('locations.locations'))
+    return render_template('add_location.html')
+
+@bp.route('/locations/delete/<int:location_id>', methods=['POST'])
+def delete_location(location_id):
+    """Delete location"""
+    location = db_session.query(Location).get(location_id)
+    if location:
+        db_session.delete(location)
+        db_session.commit()
+        flash('Location deleted successfully!', 'success')
+    else:
+        flash('Location not found!', 'error')
+    return redirect(url_for('locations.locations'))
+
+@bp.route('/pricing/add', methods=['GET', 'POST'])
+def add_pricing():
+    """Add new pricing record"""
+    if request.method == 'POST':
+        from models import Currency
+        pricing = Pricing(
+            service_name=request.form['service_name'],
+            description=request.form['description'],
+            price=float(request.form['price']),
+            currency=Currency(request.form['currency']) if request.form['currency'] else Currency.USD,
+            unit=request.form['unit'],
+            effective_date=datetime.strptime(request.form['effective_date'], '%Y-%m-%d').date(),
+            notes=request.form.get('notes', '')
+        )
+        db_session.add(pricing)
+        db_session.commit()
+        flash('Pricing record added successfully!', 'success')
+        return redirect(url_for('locations.pricing'))
+    return render_template('add_pricing.html')
+
+@bp.route('/pricing/delete/<int:pricing_id>', methods=['POST'])
+def delete_pricing(pricing_id):
+    """Delete pricing record"""
+    pricing = db_session.query(Pricing).get(pricing_id)
+    if pricing:
+        db_session.delete(pricing)
+        db_session.commit()
+        flash('Pricing record deleted successfully!', 'success')
+    else:
+        flash('Pricing record not found!', 'error')
+    return redirect(url_for('locations.pricing'))
@@ -0,0 +1,61 @@
+"""Monitoring endpoints"""
+import hmac
+import os
+
+from flask import Blueprint, Response, abort, current_app, jsonify, render_template, request, send_from_directory
+from sqlalchemy import text
+
+from database import engine, read_engine
+from db_pool import pool_status
+from metrics import render_metrics
+from profiling import list_profiles, profile_directory, token_matches, EXTENSIONS
+
+bp = Blueprint('monitoring', __name__)
+
+
+@bp.route('/api/v1/health/db')
+def db_health():
+    """Database reachability and connection pool usage"""
+    status = pool_status(engine)
+    try:
+        with engine.connect() as conn:
+            conn.execute(text('SELECT 1'))
+        status['ok'] = True
+    except Exception as e:
+        status['ok'] = False
+        status['error'] = str(e)
+    if read_engine is not None:
+        status['read'] = pool_status(read_engine)
+    return jsonify(status), 200 if status['ok'] else 503
+
+
+@bp.route('/metrics')
+def metrics():
+    """Prometheus scrape endpoint"""
+    token = os.environ.get('METRICS_TOKEN')
+    if token and not hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        abort(401)
+    return Response(render_metrics(), mimetype='text/plain; version=0.0.4')
+
+
+def _profile_token():
+    token = request.args.get('token') or request.headers.get('X-Profile')
+    if not token_matches(token):
+        abort(404)
+    return token
+
+
+@bp.route('/admin/profiles')
+def profiles():
+    """Saved request profiles (needs PROFILE_TOKEN, or debug mode)"""
+    token = _profile_token()
+    return render_template('profiles.html', profiles=list_profiles(current_app), token=token)
+
+
+@bp.route('/admin/profiles/<name>')
+def download_profile(name):
+    """Download one profile file"""
+    _profile_token()
+    if not name.endswith(EXTENSIONS):
+        abort(404)
+    return send_from_directory(profile_directory(current_app), name, as_attachment=True)
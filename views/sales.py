@@ -0,0 +1,665 @@
+"""Customer, quotation, invoice and payment routes"""
+from datetime import datetime
+
+from flask import Blueprint, render_template, request, redirect, url_for, flash, send_file
+
+from models import (Customer, Inventory, quotation, quotationItem, StockTransaction, FinancialRecord, Invoice,
+                    InvoiceItem, Payment, InvoiceStatus)
+from database import db_session
+from db_routing import read_only
+from reference_data import customer_options
+from inventory_service import add_stock, remove_stock, InsufficientStockError
+from conditional import conditional
+
+bp = Blueprint('sales', __name__)
+
+
+@bp.route('/customers')
+@read_only
+def customers():
+    """List all customers"""
+    customers = db_session.query(Customer).all()
+    return render_template('customers.html', customers=customers)
+
+@bp.route('/quotations')
+@read_only
+def quotations():
+    """List all quotations"""
+    quotations = db_session.query(quotation).order_by(quotation.date_created.desc()).all()
+    return render_template('quotations.html', quotations=quotations)
+
+@bp.route('/customers/add', methods=['GET', 'POST'])
+def add_customer():
+    """Add new customer"""
+    if request.method == 'POST':
+        customer = Customer(
+            name=request.form['name'],
+            identification_number=request.form['identification_number'],
+            citizenship=request.form['citizenship'],
+            address=request.form['address'],
+            phone=request.form['phone'],
+            email=request.form['email']
+        )
+        db_session.add(customer)
+        db_session.commit()
+        flash('Customer added successfully!', 'success')
+        return redirect(url_for('sales.customers'))
+    return render_template('add_customer.html')
+
+@bp.route('/quotations/add', methods=['GET', 'POST'])
+def add_quotation():
+    """Create new quotation"""
+    if request.method == 'POST':
+        pass
+
+        # Begin transaction
+        try:
+            # Process and validate quotation items first
+            item_ids = request.form.getlist('item_id[]')
+            quantities = request.form.getlist('quantity[]')
+            unit_prices = request.form.getlist('unit_price[]')
+            custom_item_names = request.form.getlist('custom_item_name[]')
+
+            calculated_total = 0
+            quotation_items_data = []
+
+            # Validate all items and calculate total
+            for i, item_id in enumerate(item_ids):
+                if item_id:
+                    if item_id == 'custom':
+                        # Handle custom item
+                        custom_name = custom_item_names[i] if i < len(custom_item_names) else ''
+                        if not custom_name:
+                            flash('Custom item name is required', 'error')
+                            return redirect(url_for('sales.add_quotation'))
+
+                        qty = int(quantities[i])
+                        unit_price = float(unit_prices[i])
+                        item_total = qty * unit_price
+                        calculated_total += item_total
+
+                        quotation_items_data.append({
+                            'inventory_id': None,  # No inventory item for custom
+                            'custom_name': custom_name,
+                            'quantity': qty,
+                            'unit_price': unit_price,
+                            'item_total': item_total
+                        })
+                    elif item_id:
+                        # Handle regular inventory item
+                        inventory_item = db_session.query(Inventory).get(int(item_id))
+                        if not inventory_item:
+                            flash(f'Item not found', 'error')
+                            return redirect(url_for('sales.add_quotation'))
+
+                        qty = int(quantities[i])
+                        if inventory_item.quantity < qty:
+                            flash(f'Insufficient stock for {inventory_item.name}. Available: {inventory_item.quantity}', 'error')
+                            return redirect(url_for('sales.add_quotation'))
+
+                        unit_price = float(unit_prices[i])
+                        item_total = qty * unit_price
+                        calculated_total += item_total
+
+                        quotation_items_data.append({
+                            'inventory_id': int(item_id),
+                            'inventory_item': inventory_item,
+                            'quantity': qty,
+                            'unit_price': unit_price,
+                            'item_total': item_total
+                        })
+                    elif item_id:
+                        # Handle regular inventory item
+                        inventory_item = db_session.query(Inventory).get(int(item_id))
+                        if not inventory_item:
+                            flash(f'Item not found', 'error')
+                            return redirect(url_for('sales.add_quotation'))
+
+                        qty = int(quantities[i])
+                        if inventory_item.quantity < qty:
+                            flash(f'Insufficient stock for {inventory_item.name}. Available: {inventory_item.quantity}', 'error')
+                            return redirect(url_for('sales.add_quotation'))
+
+                        unit_price = float(unit_prices[i])
+                        item_total = qty * unit_price
+                        calculated_total += item_total
+
+                        quotation_items_data.append({
+                            'inventory_id': int(item_id),
+                            'inventory_item': inventory_item,
+                            'quantity': qty,
+                            'unit_price': unit_price,
+                            'item_total': item_total
+                        })
+
+            # Find customer by identification number
+            customer_identification = request.form['customer_identification']
+            customer = db_session.query(Customer).filter_by(identification_number=customer_identification).first()
+            if not customer:
+                flash(f'Customer with identification number {customer_identification} not found. Please add the customer first.', 'error')
+                return redirect(url_for('sales.add_quotation'))
+
+
+            # Create quotation with calculated total
+            new_quotation = quotation(
+                customer_id=customer.id,
+                total_amount=calculated_total,
+                status='PENDING'
+            )
+            db_session.add(new_quotation)
+            db_session.flush()  # Get quotation ID without committing
+
+            # Create quotation items (Stock deduction MOVED to Invoice creation)
+            for item_data in quotation_items_data:
+                if item_data['inventory_id'] is None:
+                    # Custom item
+                    # Generate Custom Item Code
+                    timestamp_code = datetime.now().strftime('%Y%m%d%H%M%S')
+                    custom_code = f"CUST-{timestamp_code}"
+
+                    quotation_item = quotationItem(
+                        quotation_id=new_quotation.id,
+                        inventory_id=None,
+                        quantity=item_data['quantity'],
+                        unit_price=item_data['unit_price'],
+                        description=item_data['custom_name'],
+                        item_code=custom_code
+                    )
+                    db_session.add(quotation_item)
+                else:
+                    # Regular inventory item
+                    quotation_item = quotationItem(
+                        quotation_id=new_quotation.id,
+                        inventory_id=item_data['inventory_id'],
+                        quantity=item_data['quantity'],
+                        unit_price=item_data['unit_price'],
+                        item_code=item_data['inventory_item'].specifications or "INV-ITM" # Use specs or fallback
+                    )
+                    db_session.add(quotation_item)
+
+                    # NOTE: Stock is NOT deducted here anymore. It will be deducted when converting to Invoice.
+
+
+            # Commit all changes
+            db_session.commit()
+            flash('quotation created successfully!', 'success')
+            return redirect(url_for('sales.quotations'))
+
+        except Exception as e:
+            db_session.rollback()
+            flash(f'Error creating quotation: {str(e)}', 'error')
+            return redirect(url_for('sales.add_quotation'))
+
+    customers = customer_options(db_session)
+    inventory_items = db_session.query(Inventory).filter(Inventory.quantity > 0).all()
+    return render_template('add_quotation.html', customers=customers, inventory_items=inventory_items)
+
+@bp.route('/customers/delete/<int:customer_id>', methods=['POST'])
+def delete_customer(customer_id):
+    """Delete customer"""
+    customer = db_session.query(Customer).get(customer_id)
+    if customer:
+        db_session.delete(customer)
+        db_session.commit()
+        flash('Customer deleted successfully!', 'success')
+    else:
+        flash('Customer not found!', 'error')
+    return redirect(url_for('sales.customers'))
+
+@bp.route('/quotations/delete/<int:quotation_id>', methods=['POST'])
+def delete_quotation(quotation_id):
+    """Delete quotation"""
+    quotation_obj = db_session.query(quotation).get(quotation_id)
+    if quotation_obj:
+        # Note: Quotations do NOT deduct stock, so we do NOT restore stock here.
+        db_session.delete(quotation_obj)
+        db_session.commit()
+        flash('quotation deleted successfully!', 'success')
+    else:
+        flash('quotation not found!', 'error')
+    return redirect(url_for('sales.quotations'))
+
+@bp.route('/invoices/delete/<int:invoice_id>', methods=['POST'])
+def delete_invoice(invoice_id):
+    """Delete invoice and restore stock"""
+    invoice = db_session.query(Invoice).get(invoice_id)
+    if not invoice:
+        flash('Invoice not found!', 'error')
+        return redirect(url_for('sales.invoices'))
+
+    try:
+        # Restore inventory quantities
+        for item in invoice.items:
+            if item.inventory_id and item.inventory:
+                # Add stock back atomically at the cost it was sold at
+                from models import StockChangeReason
+                sale = db_session.query(StockTransaction).filter_by(
+                    inventory_id=item.inventory_id,
+                    reference_id=invoice.id,
+                    reference_type='invoice'
+                ).first()
+                add_stock(db_session, item.inventory_id, item.quantity,
+                          unit_price=sale.unit_price if sale else None,
+                          reason=StockChangeReason.RETURNED,
+                          reference_id=invoice.id,
+                          reference_type='invoice_deletion',
+                          notes=f'Restored from deleted Invoice #{invoice.id}')
+
+        # Delete associated payments (cascade manually if needed, but relationship cascade might handle rows, logic should handle stats)
+        # SQLAlchemy relationship cascade options could handle this, but explicit is safe.
+        for payment in invoice.payments:
+             db_session.delete(payment)
+        
+        # Delete invoice items (cascade usually handles this, but explicit loop needed for stock above)
+        for item in invoice.items:
+             db_session.delete(item)
+
+        db_session.delete(invoice)
+        db_session.commit()
+        flash('Invoice deleted successfully and stock restored!', 'success')
+
+    except Exception as e:
+        db_session.rollback()
+        flash(f'Error deleting invoice: {str(e)}', 'error')
+
+    return redirect(url_for('sales.invoices'))
+
+@bp.route('/payments/delete/<int:payment_id>', methods=['POST'])
+def delete_payment(payment_id):
+    """Delete payment and update invoice balance"""
+    payment = db_session.query(Payment).get(payment_id)
+    if not payment:
+        flash('Payment not found!', 'error')
+        return redirect(url_for('sales.payments'))
+
+    try:
+        invoice = payment.invoice
+        if invoice:
+            # Revert invoice stats
+            invoice.paid_amount -= payment.amount
+            invoice.balance_due += payment.amount
+            
+            from models import InvoiceStatus
+            if invoice.balance_due == invoice.total_amount:
+                invoice.status = InvoiceStatus.SENT # Or DRAFT
+            elif invoice.balance_due > 0:
+                invoice.status = InvoiceStatus.PARTIAL
+            else:
+                invoice.status = InvoiceStatus.PAID # Should not happen if we are adding balance
+
+        db_session.delete(payment)
+        db_session.commit()
+        flash('Payment deleted successfully!', 'success')
+    
+    except Exception as e:
+        db_session.rollback()
+        flash(f'Error deleting payment: {str(e)}', 'error')
+
+    return redirect(url_for('sales.payments'))
+
+@bp.route('/quotation/<int:quotation_id>')
+@read_only
+def view_quotation(quotation_id):
+    """View an quotation as an HTML page"""
+    quotation_obj = db_session.query(quotation).get(quotation_id)
+    if not quotation_obj:
+        from flask import abort
+        abort(404)
+    quotation_items = db_session.query(quotationItem).filter_by(quotation_id=quotation_id).all()
+    
+    total_quantity = 0
+    for item in quotation_items:
+        total_quantity += item.quantity
+
+    return render_template('view_quotation.html', quotation=quotation_obj, quotation_items=quotation_items, total_quantity=total_quantity)
+
+@bp.route('/quotation/<int:quotation_id>/pdf')
+@conditional('quotations', 'quotation_items', 'customers', 'inventory')
+@read_only
+def generate_quotation_pdf(quotation_id):
+    """Generate PDF quotation"""
+    from pdf_reports import quotation_pdf
+
+    quotation_obj = db_session.query(quotation).get(quotation_id)
+    if not quotation_obj:
+        from flask import abort
+        abort(404)
+    quotation_items = db_session.query(quotationItem).filter_by(quotation_id=quotation_id).all()
+    inventory_ids = {item.inventory_id for item in quotation_items if item.inventory_id}
+    inventory_by_id = {inv.id: inv for inv in db_session.query(Inventory).filter(Inventory.id.in_(inventory_ids))}
+
+    buffer = quotation_pdf(quotation_obj, quotation_items, inventory_by_id)
+
+    return send_file(buffer, as_attachment=True, download_name=f'quotation_{quotation_obj.id}.pdf', mimetype='application/pdf')
+
+@bp.route('/invoices')
+@conditional('invoices', 'invoice_items', 'customers', 'payments')
+@read_only
+def invoices():
+    """List all invoices"""
+    invoices = db_session.query(Invoice).order_by(Invoice.date_created.desc()).all()
+    return render_template('invoices.html', invoices=invoices)
+
+@bp.route('/invoices/add', methods=['GET', 'POST'])
+def add_invoice():
+    """Create new invoice"""
+    if request.method == 'POST':
+        from models import InvoiceStatus
+
+        try:
+            # Process and validate invoice items
+            item_ids = request.form.getlist('item_id[]')
+            quantities = request.form.getlist('quantity[]')
+            unit_prices = request.form.getlist('unit_price[]')
+            custom_item_names = request.form.getlist('custom_item_name[]')
+
+            calculated_total = 0
+            invoice_items_data = []
+
+            for i, item_id in enumerate(item_ids):
+                if item_id:
+                    if item_id == 'custom':
+                        custom_name = custom_item_names[i] if i < len(custom_item_names) else ''
+                        if not custom_name:
+                            flash('Custom item name is required', 'error')
+                            return redirect(url_for('sales.add_invoice'))
+
+                        qty = int(quantities[i])
+                        unit_price = float(unit_prices[i])
+                        item_total = qty * unit_price
+                        calculated_total += item_total
+
+                        # Generate Custom Code
+                        timestamp_code = datetime.now().strftime('%Y%m%d%H%M%S')
+                        custom_code = f"CUST-{timestamp_code}-{i}"
+
+                        invoice_items_data.append({
+                            'inventory_id': None,
+                            'custom_name': custom_name,
+                            'item_code': custom_code,
+                            'quantity': qty,
+                            'unit_price': unit_price,
+                            'item_total': item_total
+                        })
+                    else:
+                        inventory_item = db_session.query(Inventory).get(int(item_id))
+                        if not inventory_item:
+                            flash(f'Item not found', 'error')
+                            return redirect(url_for('sales.add_invoice'))
+
+                        qty = int(quantities[i])
+                        if inventory_item.quantity < qty:
+                            flash(f'Insufficient stock for {inventory_item.name}. Available: {inventory_item.quantity}', 'error')
+                            return redirect(url_for('sales.add_invoice'))
+
+                        unit_price = float(unit_prices[i])
+                        item_total = qty * unit_price
+                        calculated_total += item_total
+
+                        invoice_items_data.append({
+                            'inventory_id': int(item_id),
+                            'inventory_item': inventory_item,
+                            'item_code': inventory_item.specifications or "INV-ITM",
+                            'quantity': qty,
+                            'unit_price': unit_price,
+                            'item_total': item_total
+                        })
+
+            customer_identification = request.form['customer_identification']
+            customer = db_session.query(Customer).filter_by(identification_number=customer_identification).first()
+            if not customer:
+                flash(f'Customer not found', 'error')
+                return redirect(url_for('sales.add_invoice'))
+
+            invoice = Invoice(
+                customer_id=customer.id,
+                total_amount=calculated_total,
+                balance_due=calculated_total,
+                status=InvoiceStatus.DRAFT,
+                due_date=datetime.now() # Default immediate
+            )
+            db_session.add(invoice)
+            db_session.flush()
+
+            for item_data in invoice_items_data:
+                inv_item = InvoiceItem(
+                    invoice_id=invoice.id,
+                    inventory_id=item_data['inventory_id'],
+                    item_code=item_data['item_code'],
+                    description=item_data.get('custom_name') or item_data['inventory_item'].name,
+                    quantity=item_data['quantity'],
+                    unit_price=item_data['unit_price'],
+                    amount=item_data['item_total']
+                )
+                db_session.add(inv_item)
+
+                if item_data['inventory_id']:
+                    # Deduct Stock (conditional UPDATE, fails instead of overselling)
+                    remove_stock(db_session, item_data['inventory_id'], item_data['quantity'],
+                                 reference_id=invoice.id,
+                                 reference_type='invoice',
+                                 notes=f'Sold via Invoice #{invoice.id}')
+
+            db_session.commit()
+            flash('Invoice created successfully!', 'success')
+            return redirect(url_for('sales.invoices'))
+
+        except InsufficientStockError as e:
+            db_session.rollback()
+            flash(f'Insufficient stock for {e.item_name}. Available: {e.available}', 'error')
+            return redirect(url_for('sales.add_invoice'))
+        except Exception as e:
+            db_session.rollback()
+            flash(f'Error creating invoice: {str(e)}', 'error')
+            return redirect(url_for('sales.add_invoice'))
+
+    customers = customer_options(db_session)
+    inventory_items = db_session.query(Inventory).filter(Inventory.quantity > 0).all()
+    quotations = db_session.query(quotation).all()
+    return render_template('add_invoice.html', customers=customers, inventory_items=inventory_items, quotations=quotations)
+
+@bp.route('/quotations/<int:quotation_id>/convert', methods=['POST'])
+def convert_to_invoice(quotation_id):
+    """Convert quotation to invoice"""
+    try:
+        quotation_obj = db_session.query(quotation).get(quotation_id)
+        if not quotation_obj:
+            flash('Quotation not found', 'error')
+            return redirect(url_for('sales.quotations'))
+
+        # Stock availability is enforced by remove_stock() below; any shortfall
+        # rolls back the whole conversion.
+        invoice = Invoice(
+            customer_id=quotation_obj.customer_id,
+            quotation_id=quotation_obj.id,
+            total_amount=quotation_obj.total_amount,
+            balance_due=quotation_obj.total_amount,
+            status=InvoiceStatus.DRAFT,
+            due_date=datetime.now()
+        )
+        db_session.add(invoice)
+        db_session.flush()
+
+        for q_item in quotation_obj.items:
+            # Generate code if missing (for legacy items)
+            code = q_item.item_code
+            if not code:
+                if q_item.inventory_id:
+                    code = q_item.inventory.specifications or "INV-ITM"
+                else:
+                    code = f"CUST-LEGACY-{q_item.id}"
+
+            inv_item = InvoiceItem(
+                invoice_id=invoice.id,
+                inventory_id=q_item.inventory_id,
+                item_code=code,
+                description=q_item.description or (q_item.inventory.name if q_item.inventory else "Item"),
+                quantity=q_item.quantity,
+                unit_price=q_item.unit_price,
+                amount=q_item.quantity * q_item.unit_price
+            )
+            db_session.add(inv_item)
+
+            if q_item.inventory_id:
+                # Deduct Stock
+                remove_stock(db_session, q_item.inventory_id, q_item.quantity,
+                             reference_id=invoice.id,
+                             reference_type='invoice',
+                             notes=f'Converted from Quotation #{quotation_obj.id} to Invoice #{invoice.id}')
+
+        quotation_obj.status = 'PROCESSED' # Or some status indicating it's done
+        db_session.commit()
+        flash(f'Successfully converted Quotation #{quotation_id} to Invoice #{invoice.id}', 'success')
+        return redirect(url_for('sales.view_invoice', invoice_id=invoice.id))
+
+    except InsufficientStockError as e:
+        db_session.rollback()
+        flash(f'Insufficient stock for {e.item_name} to convert quotation. Available: {e.available}, Required: {e.requested}', 'error')
+        return redirect(url_for('sales.quotations'))
+    except Exception as e:
+        db_session.rollback()
+        flash(f'Error converting quotation: {str(e)}', 'error')
+        return redirect(url_for('sales.quotations'))
+
+@bp.route('/invoice/<int:invoice_id>')
+@conditional('invoices', 'invoice_items', 'customers', 'payments', 'inventory')
+@read_only
+def view_invoice(invoice_id):
+    """View an invoice as an HTML page"""
+    invoice = db_session.query(Invoice).get(invoice_id)
+    if not invoice:
+        # Check if we should render 404
+        from flask import abort
+        abort(404)
+    
+    invoice_items = invoice.items
+    total_quantity = sum(item.quantity for item in invoice_items)
+
+    return render_template('view_invoice.html', invoice=invoice, invoice_items=invoice_items, total_quantity=total_quantity)
+
+@bp.route('/invoice/<int:invoice_id>/pdf')
+@conditional('invoices', 'invoice_items', 'customers', 'payments', 'inventory')
+@read_only
+def generate_invoice_pdf(invoice_id):
+    """Generate PDF invoice"""
+    from pdf_reports import invoice_pdf
+
+    invoice = db_session.query(Invoice).get(invoice_id)
+    if not invoice:
+        from flask import abort
+        abort(404)
+
+    buffer = invoice_pdf(invoice)
+
+    # Sanitize filename
+    safe_name = "".join([c for c in invoice.customer.name if c.isalpha() or c.isdigit() or c==' ']).rstrip().replace(" ", "_")
+    filename = f'Invoice_{invoice.id}_{safe_name}.pdf'
+
+    return send_file(buffer, as_attachment=True, download_name=filename, mimetype='application/pdf')
+
+@bp.route('/payments')
+@conditional('payments', 'invoices', 'customers')
+@read_only
+def payments():
+    """List all payments"""
+    payments = db_session.query(Payment).order_by(Payment.payment_date.desc()).all()
+    return render_template('payments.html', payments=payments)
+
+@bp.route('/invoice/<int:invoice_id>/add_payment', methods=['GET', 'POST'])
+def add_payment(invoice_id):
+    """Add payment to an invoice"""
+    invoice = db_session.query(Invoice).get(invoice_id)
+    if not invoice:
+        flash('Invoice not found', 'error')
+        return redirect(url_for('sales.invoices'))
+
+    if request.method == 'POST':
+
+        try:
+            amount = float(request.form['amount'])
+            payment_method = request.form['payment_method']
+            payer_name = request.form.get('payer_name', '')
+            reference = request.form.get('reference', '')
+            notes = request.form.get('notes', '')
+
+            if amount > invoice.balance_due:
+                flash(f'Payment amount (${amount}) cannot exceed balance due (${invoice.balance_due})', 'error')
+                return redirect(url_for('sales.add_payment', invoice_id=invoice_id))
+
+            # Create Payment Record
+            from models import PaymentType, InvoiceStatus
+            payment = Payment(
+                invoice_id=invoice.id,
+                amount=amount,
+                payment_method=PaymentType(payment_method),
+                payer_name=payer_name,
+                reference_number=reference,
+                notes=notes,
+                payment_date=datetime.now()
+            )
+            db_session.add(payment)
+
+            # Update Invoice Stats (conditional UPDATE, so concurrent payments neither
+            # overwrite each other nor overpay)
+            from sqlalchemy import update, func
+            result = db_session.execute(
+                update(Invoice)
+                .where(Invoice.id == invoice.id, Invoice.balance_due >= amount - 0.005)
+                .values(paid_amount=func.coalesce(Invoice.paid_amount, 0) + amount,
+                        balance_due=Invoice.balance_due - amount)
+                .execution_options(synchronize_session=False)
+            )
+            db_session.refresh(invoice)
+            if result.rowcount != 1:
+                db_session.rollback()
+                flash(f'Payment amount (${amount}) cannot exceed balance due (${invoice.balance_due})', 'error')
+                return redirect(url_for('sales.add_payment', invoice_id=invoice_id))
+
+            if invoice.balance_due <= 0:
+                invoice.status = InvoiceStatus.PAID
+            else:
+                invoice.status = InvoiceStatus.PARTIAL
+            
+            # Create Financial Record (Income)
+            from models import FinancialType
+            fin_record = FinancialRecord(
+                type=FinancialType.INCOME,
+                category="Sales",
+                description=f"Payment for Invoice #{invoice.id}",
+                amount=amount,
+                date=datetime.now(),
+                reference_id=invoice.id,
+                notes=f"Payer: {payer_name} | Method: {payment_method} | Ref: {reference}"
+            )
+            db_session.add(fin_record)
+
+            db_session.commit()
+            flash('Payment recorded successfully!', 'success')
+            return redirect(url_for('sales.view_invoice', invoice_id=invoice.id))
+
+        except Exception as e:
+            db_session.rollback()
+            flash(f'Error recording payment: {str(e)}', 'error')
+            return redirect(url_for('sales.add_payment', invoice_id=invoice_id))
+
+    return render_template('add_payment.html', invoice=invoice)
+
+@bp.route('/payment/<int:payment_id>/pdf')
+@conditional('payments', 'invoices', 'invoice_items', 'customers')
+@read_only
+def generate_payment_pdf(payment_id):
+    """Generate PDF receipt for payment"""
+    from pdf_reports import payment_receipt_pdf
+
+    payment = db_session.query(Payment).get(payment_id)
+    if not payment:
+        from flask import abort
+        abort(404)
+
+    buffer = payment_receipt_pdf(payment)
+
+    # Sanitize filename
+    safe_name = "".join([c for c in payment.invoice.customer.name if c.isalpha() or c.isdigit() or c==' ']).rstrip().replace(" ", "_")
+    filename = f'Payment_{payment.id}_{safe_name}.pdf'
+
+    return send_file(buffer, as_attachment=True, download_name=filename, mimetype='application/pdf')